@@ -1,13 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
-import requests
-import json
+import queue
 import time
+from bisect import bisect_left
 from datetime import datetime
-import hashlib
-import hmac
-import base64
+
+from arb_scanner import SmarketsMatchbookScanner
+from scan_logging import configure_logging
 
 class ArbitrageScannerGUI:
     def __init__(self, root):
@@ -18,8 +18,24 @@ class ArbitrageScannerGUI:
         
         self.scanner = SmarketsMatchbookScanner()
         self.scanning = False
+        self.stop_event = threading.Event()
+        
+        # Opportunities streamed by the running scan, drained on the Tk thread
+        self.opportunity_queue = queue.Queue()
+        self.streamed = []
+        
+        # Rows on show: row ID -> (opportunity, column values, order entry),
+        # with the order entries (-profit margin, row ID) kept sorted
+        self.rows = {}
+        self.row_order = []
+        # What the details pane and status line show, so refreshes only rewrite them
+        # on a change: a row ID, 'prompt' or 'no results' (row IDs always contain '|'),
+        # and (rows counted, scan in progress); None when something else was written
+        self.details_shown = None
+        self.status_shown = None
         
         self.setup_ui()
+        self.refresh_metrics()
     
     def setup_ui(self):
         """Create the user interface"""
@@ -161,6 +177,10 @@ class ArbitrageScannerGUI:
         clear_button = ttk.Button(control_frame, text="Clear Results", command=self.clear_results)
         clear_button.pack(side=tk.LEFT, padx=(0, 10))
         
+        # Continuous mode keeps re-polling matched markets until stopped
+        self.continuous_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="🔁 Continuous", variable=self.continuous_var).pack(side=tk.LEFT, padx=(0, 10))
+        
         # Status label
         self.status_var = tk.StringVar(value="Ready to scan - Enter Matchbook credentials to begin")
         self.status_label = ttk.Label(control_frame, textvariable=self.status_var)
@@ -172,20 +192,53 @@ class ArbitrageScannerGUI:
         results_frame.columnconfigure(0, weight=1)
         results_frame.rowconfigure(0, weight=1)
         
-        # Results display
+        # One table row per opportunity, best first; Tk only draws the visible rows
+        panes = ttk.PanedWindow(results_frame, orient=tk.VERTICAL)
+        panes.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        table_frame = ttk.Frame(panes)
+        table_frame.columnconfigure(0, weight=1)
+        table_frame.rowconfigure(0, weight=1)
+        
+        columns = (('sport', "Sport", 90), ('event', "Event", 300), ('market', "Market", 200),
+                   ('margin', "Profit %", 80), ('roi', "ROI %", 80), ('stake', "Stake £", 90),
+                   ('profit', "Profit £", 90), ('bets', "Bets", 160))
+        self.results_table = ttk.Treeview(table_frame, columns=[name for name, _, _ in columns],
+                                          show='headings', selectmode='browse', height=12)
+        for name, heading, width in columns:
+            anchor = tk.W if name in ('sport', 'event', 'market', 'bets') else tk.E
+            self.results_table.heading(name, text=heading, anchor=anchor)
+            self.results_table.column(name, width=width, anchor=anchor, stretch=name in ('event', 'market'))
+        table_scroll = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.results_table.yview)
+        self.results_table.configure(yscrollcommand=table_scroll.set)
+        self.results_table.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        table_scroll.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.results_table.bind('<<TreeviewSelect>>', lambda event: self.show_details())
+        panes.add(table_frame, weight=3)
+        
+        # Full details of the selected opportunity only
         self.results_text = scrolledtext.ScrolledText(results_frame, wrap=tk.WORD, 
-                                                     width=100, height=25, 
+                                                     width=100, height=12, 
                                                      font=('Courier', 9))
-        self.results_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        panes.add(self.results_text, weight=2)
         
         # Progress bar
         self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
         self.progress.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
         
+        # Request, latency and quote-age metrics
+        self.metrics_var = tk.StringVar(value="")
+        ttk.Label(main_frame, textvariable=self.metrics_var, foreground='gray').grid(
+            row=6, column=0, columnspan=3, sticky=tk.W, pady=(5, 0))
+        
         # Style configuration
         style = ttk.Style()
         style.configure('Accent.TButton', font=('Arial', 14, 'bold'), padding=(20, 10))
     
+    def refresh_metrics(self):
+        """Show the scanner's metrics summary, refreshed every two seconds"""
+        self.metrics_var.set(f"📊 {self.scanner.metrics.summary()}")
+        self.root.after(2000, self.refresh_metrics)
+    
     def update_threshold_display(self, value=None):
         """Update the threshold display"""
         current_value = self.threshold_var.get()
@@ -288,8 +341,11 @@ class ArbitrageScannerGUI:
         thread.start()
     
     def start_scan(self):
-        """Start the arbitrage scan"""
+        """Start the arbitrage scan, or stop a running continuous scan"""
         if self.scanning:
+            if self.continuous_var.get():
+                self.stop_event.set()
+                self.scan_button.config(text="⏳ STOPPING...", state='disabled')
             return
         
         username = self.mb_username.get()
@@ -300,30 +356,45 @@ class ArbitrageScannerGUI:
             return
         
         self.scanning = True
-        self.scan_button.config(text="⏳ SCANNING...", state='disabled')
         self.progress.start(10)
         self.status_var.set("Scanning real-time data from both exchanges...")
+        self.details_shown = self.status_shown = None
         
-        scan_thread = threading.Thread(target=self.run_scan)
+        if self.continuous_var.get():
+            self.stop_event.clear()
+            self.scan_button.config(text="⏹ STOP CONTINUOUS SCAN", state='normal')
+            target = self.run_continuous_scan
+        else:
+            self.scan_button.config(text="⏳ SCANNING...", state='disabled')
+            self.opportunity_queue = queue.Queue()
+            self.streamed = []
+            self.root.after(100, self.drain_opportunities, self.opportunity_queue)
+            target = self.run_scan
+        
+        scan_thread = threading.Thread(target=target)
         scan_thread.daemon = True
         scan_thread.start()
     
+    def apply_settings(self):
+        """Copy the UI settings onto the scanner and return the market filters"""
+        # Update scanner settings - no Smarkets token needed
+        self.scanner.matchbook_username = self.mb_username.get()
+        self.scanner.matchbook_password = self.mb_password.get()
+        self.scanner.min_implied_prob_threshold = self.threshold_var.get()
+        self.scanner.min_liquidity = self.min_liquidity_var.get()
+        
+        return {
+            'tennis': self.tennis_var.get(),
+            'football': self.football_var.get(),
+            'basketball': self.basketball_var.get()
+        }
+    
     def run_scan(self):
         """Run the actual scan"""
         try:
-            # Update scanner settings - no Smarkets token needed
-            self.scanner.matchbook_username = self.mb_username.get()
-            self.scanner.matchbook_password = self.mb_password.get()
-            self.scanner.min_implied_prob_threshold = self.threshold_var.get()
-            self.scanner.min_liquidity = self.min_liquidity_var.get()
-            
-            market_filters = {
-                'tennis': self.tennis_var.get(),
-                'football': self.football_var.get(),
-                'basketball': self.basketball_var.get()
-            }
-            
-            opportunities = self.scanner.find_real_arbitrage_opportunities(market_filters)
+            market_filters = self.apply_settings()
+            opportunities = self.scanner.find_real_arbitrage_opportunities(market_filters,
+                                                                           results=self.opportunity_queue)
             self.root.after(0, self.display_results, opportunities)
             
         except Exception as e:
@@ -332,53 +403,136 @@ class ArbitrageScannerGUI:
         finally:
             self.root.after(0, self.scan_complete)
     
-    def display_results(self, opportunities):
-        """Display the scan results"""
-        self.results_text.delete(1.0, tk.END)
-        
-        header = f"""
-╔═══════════════════════════════════════════════════════════════════════════════════════╗
-║                    REAL-TIME SMARKETS vs MATCHBOOK ARBITRAGE RESULTS                  ║
-║  Scan Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}                                                    ║
-║  Threshold: {self.threshold_var.get():.3f} max implied probability                                     ║
-║  Min Liquidity: £{self.min_liquidity_var.get()}                                                         ║
-║  Data Source: LIVE MARKET DATA                                                        ║
-╚═══════════════════════════════════════════════════════════════════════════════════════╝
-
-"""
-        self.results_text.insert(tk.END, header)
-        
-        if not opportunities:
-            no_results = """
-❌ NO REAL-TIME ARBITRAGE OPPORTUNITIES FOUND
-
-Analysis complete - current market conditions:
-• Real-time odds analyzed from both exchanges
-• Markets are currently efficient between platforms
-• No opportunities meet your threshold criteria
-
-Recommendations:
-• Lower your threshold slightly to see near-arbitrage situations
-• Try different sports or time periods
-• Markets change rapidly - scan again in a few minutes
-• Consider that real arbitrage opportunities are rare and short-lived
-
-Note: This scan used LIVE market data, not simulated data.
-"""
-            self.results_text.insert(tk.END, no_results)
-            self.status_var.set(f"Real-time scan complete - No opportunities found")
-        else:
-            summary = f"✅ FOUND {len(opportunities)} REAL ARBITRAGE OPPORTUNITIES!\n\n"
-            self.results_text.insert(tk.END, summary)
-            
-            for i, opp in enumerate(opportunities, 1):
-                opportunity_text = f"""
-🎯 REAL ARBITRAGE OPPORTUNITY #{i}
+    def drain_opportunities(self, results):
+        """Show opportunities as the running scan finds them, polling every 100ms"""
+        if results is not self.opportunity_queue or not self.scanning:
+            return
+        found = []
+        while True:
+            try:
+                found.append(results.get_nowait())
+            except queue.Empty:
+                break
+        if found:
+            self.streamed.extend(found)
+            self.display_results(self.streamed, in_progress=True)
+        self.root.after(100, self.drain_opportunities, results)
+    
+    def run_continuous_scan(self):
+        """Run the continuous scan until stopped"""
+        try:
+            market_filters = self.apply_settings()
+            self.scanner.run_continuous(
+                market_filters, self.stop_event,
+                lambda opportunities, stats: self.root.after(0, self.display_cycle, opportunities, stats))
+        except Exception as e:
+            error_msg = f"Error during continuous scan: {str(e)}"
+            self.root.after(0, self.show_error, error_msg)
+        finally:
+            self.root.after(0, self.scan_complete)
+    
+    def display_cycle(self, opportunities, stats):
+        """Show the latest continuous-scan results with quote freshness"""
+        if not self.scanning:
+            return
+        self.display_results(opportunities)
+        cycle = "discovery" if stats['discovery'] else f"{stats['polled']} polled, {stats['unchanged']} unchanged"
+        self.status_var.set(f"🔁 Live: {len(opportunities)} opportunities | {stats['markets']} markets ({cycle}) | "
+                            f"oldest quote {stats['max_age']:.1f}s, {stats['stale']} stale")
+        self.status_shown = None
+    
+    def display_results(self, opportunities, in_progress=False):
+        """Bring the results table in line with opportunities.
+        
+        Rows are keyed by market, so only opportunities that appeared,
+        changed or went away touch the table. The details pane is rewritten
+        only when the selected row is one of them, and the status line only
+        when the number of rows changes.
+        """
+        current = {}
+        for opp in opportunities:
+            current[self.row_id(opp)] = opp
+        
+        removed = [row_id for row_id in self.rows if row_id not in current]
+        if removed:
+            self.results_table.delete(*removed)
+            for row_id in removed:
+                _, _, entry = self.rows.pop(row_id)
+                del self.row_order[bisect_left(self.row_order, entry)]
+        
+        changed = set(removed)
+        for row_id, opp in current.items():
+            values = self.row_values(opp)
+            shown = self.rows.get(row_id)
+            if shown is None or shown[0] != opp:
+                changed.add(row_id)
+            if shown is None:
+                entry = (-opp['profit_margin'], row_id)
+                self.results_table.insert('', self.place_row(entry), iid=row_id, values=values)
+            elif shown[1] != values:
+                del self.row_order[bisect_left(self.row_order, shown[2])]
+                entry = (-opp['profit_margin'], row_id)
+                # Detached first, so the index counts only the other rows
+                self.results_table.detach(row_id)
+                self.results_table.move(row_id, '', self.place_row(entry))
+                self.results_table.item(row_id, values=values)
+            else:
+                entry = shown[2]
+            self.rows[row_id] = (opp, values, entry)
+        
+        # Deleting a row also drops it from the selection
+        selected = self.results_table.selection()
+        if selected and selected[0] in self.rows:
+            if selected[0] in changed or self.details_shown != selected[0]:
+                self.show_details()
+        elif not self.rows:
+            if self.details_shown != 'no results':
+                self.show_no_results()
+        elif self.details_shown != 'prompt':
+            self.results_text.delete(1.0, tk.END)
+            self.results_text.insert(tk.END, "Select an opportunity to see its bets and execution details.")
+            self.details_shown = 'prompt'
+        
+        status = (len(self.rows), in_progress)
+        if status != self.status_shown:
+            self.status_shown = status
+            if in_progress:
+                self.status_var.set(f"Scanning... {len(self.rows)} opportunities found so far")
+            elif self.rows:
+                self.status_var.set(f"✅ Found {len(self.rows)} real arbitrage opportunities!")
+            else:
+                self.status_var.set(f"Real-time scan complete - No opportunities found")
+    
+    def row_id(self, opp):
+        """Table row ID for an opportunity: its market, which stays the same across updates"""
+        if 'market_key' in opp:
+            return '|'.join(f"{exchange}:{market_id}" for exchange, market_id in opp['market_key'])
+        return f"{opp['event_name']}|{opp['market_name']}"
+    
+    def row_values(self, opp):
+        return (opp['sport'], opp['event_name'], opp['market_name'],
+                f"{opp['profit_margin']:.2f}", f"{opp['roi']:.2f}", f"{opp['total_stake']:.2f}",
+                f"{opp['guaranteed_profit']:.2f}", " / ".join(leg['exchange'].upper() for leg in opp['legs']))
+    
+    def place_row(self, entry):
+        """Record a row's place in the best-first order and return its index"""
+        position = bisect_left(self.row_order, entry)
+        self.row_order.insert(position, entry)
+        return position
+    
+    def show_details(self):
+        """Show the full breakdown of the selected opportunity"""
+        selected = self.results_table.selection()
+        if not selected or selected[0] not in self.rows:
+            return
+        opp = self.rows[selected[0]][0]
+        details = f"""🎯 REAL ARBITRAGE OPPORTUNITY
 {'='*80}
 📋 EVENT: {opp['event_name']}
 • Sport: {opp['sport']}
 • Market: {opp['market_name']}
 • Event Time: {opp.get('event_time', 'TBD')}
+• Quote Age: {f"{opp['quote_age']}s" if 'quote_age' in opp else 'fresh'}
 
 💰 PROFIT ANALYSIS:
 • Total Implied Probability: {opp['total_implied_prob']:.4f}
@@ -387,23 +541,11 @@ Note: This scan used LIVE market data, not simulated data.
 
 📊 BETTING STRATEGY:
 ┌─────────────────────────────────────────────────────────────────────┐
-│ BET 1: {opp['bet1_selection']:<50}    │
-│ ├─ Exchange: {opp['bet1_exchange'].upper():<25}                         │
-│ ├─ Odds: {opp['bet1_odds']:<15} (Decimal)                            │
-│ ├─ Stake: £{opp['bet1_stake']:<12}                                   │
-│ ├─ Available: £{opp['bet1_liquidity']:<10}                          │
-│ └─ Potential Return: £{opp['bet1_return']:<8}                       │
-│                                                                     │
-│ BET 2: {opp['bet2_selection']:<50}    │
-│ ├─ Exchange: {opp['bet2_exchange'].upper():<25}                         │
-│ ├─ Odds: {opp['bet2_odds']:<15} (Decimal)                            │
-│ ├─ Stake: £{opp['bet2_stake']:<12}                                   │
-│ ├─ Available: £{opp['bet2_liquidity']:<10}                          │
-│ └─ Potential Return: £{opp['bet2_return']:<8}                       │
+{self.format_legs(opp['legs'])}
 └─────────────────────────────────────────────────────────────────────┘
 
 💡 EXECUTION DETAILS:
-• Total Investment: £{opp['total_stake']:.2f}
+• Total Investment: £{opp['total_stake']:.2f} (max profitable: £{opp['max_profitable_stake']:.2f})
 • Guaranteed Profit: £{opp['guaranteed_profit']:.2f}
 • Time Sensitivity: HIGH - Execute immediately!
 
@@ -416,19 +558,55 @@ Note: This scan used LIVE market data, not simulated data.
 • This is REAL market data from live exchanges
 • Opportunities may disappear within seconds/minutes
 • Always double-check calculations before betting
-
 """
-                self.results_text.insert(tk.END, opportunity_text)
-            
-            self.status_var.set(f"✅ Found {len(opportunities)} real arbitrage opportunities!")
-        
-        self.results_text.see(1.0)
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(tk.END, details)
+        self.details_shown = selected[0]
+    
+    def show_no_results(self):
+        """Explain an empty results table"""
+        self.details_shown = 'no results'
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(tk.END, f"""❌ NO REAL-TIME ARBITRAGE OPPORTUNITIES FOUND
+Scan Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Threshold: {self.threshold_var.get():.3f} max implied probability | Min Liquidity: £{self.min_liquidity_var.get()}
+
+Analysis complete - current market conditions:
+• Real-time odds analyzed from both exchanges
+• Markets are currently efficient between platforms
+• No opportunities meet your threshold criteria
+
+Recommendations:
+• Lower your threshold slightly to see near-arbitrage situations
+• Try different sports or time periods
+• Markets change rapidly - scan again in a few minutes
+• Consider that real arbitrage opportunities are rare and short-lived
+
+Note: This scan used LIVE market data, not simulated data.
+""")
+    
+    def format_legs(self, legs):
+        """Box lines for every leg of an opportunity"""
+        lines = []
+        for number, leg in enumerate(legs, 1):
+            if number > 1:
+                lines.append("")
+            lines.extend([
+                f" BET {number}: {leg['selection']}",
+                f" ├─ Exchange: {leg['exchange'].upper()}",
+                f" ├─ Odds: {leg['odds']:<15} (Decimal, VWAP {leg['vwap_odds']})",
+                f" ├─ Stake: £{leg['stake']}",
+                f" ├─ Ladder Depth: £{leg['liquidity']}",
+                f" └─ Potential Return: £{leg['return']}",
+            ])
+        return "\n".join(f"│{line:<69}│" for line in lines)
     
     def show_error(self, error_message):
         """Show error message"""
+        self.results_table.selection_remove(self.results_table.selection())
         self.results_text.delete(1.0, tk.END)
         self.results_text.insert(tk.END, f"❌ SCAN ERROR: {error_message}\n\nTroubleshooting:\n• Check API credentials\n• Verify internet connection\n• Ensure exchanges are accessible\n• Try scanning again")
         self.status_var.set("Scan failed - Check error details")
+        self.details_shown = self.status_shown = None
         messagebox.showerror("Scan Error", error_message)
     
     def scan_complete(self):
@@ -439,672 +617,17 @@ Note: This scan used LIVE market data, not simulated data.
     
     def clear_results(self):
         """Clear the results display"""
+        self.results_table.delete(*self.rows)
+        self.rows.clear()
+        self.row_order.clear()
         self.results_text.delete(1.0, tk.END)
         self.status_var.set("Results cleared - Ready to scan")
-
-
-class SmarketsMatchbookScanner:
-    """Real-time cross-exchange arbitrage scanner"""
-    def __init__(self):
-        # API endpoints
-        self.smarkets_base_url = "https://api.smarkets.com/v3"
-        self.matchbook_base_url = "https://www.matchbook.com/bpapi/rest"
-        
-        # Credentials (Matchbook only - Smarkets uses public API)
-        self.matchbook_username = ""
-        self.matchbook_password = ""
-        self.matchbook_session_token = None
-        
-        # Settings
-        self.min_implied_prob_threshold = 0.98
-        self.min_liquidity = 100
-        
-        # Session
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'ArbitrageScanner/1.0',
-            'Accept': 'application/json',
-            'Content-Type': 'application/json'
-        })
-    
-    def test_smarkets_connection(self):
-        """Test Smarkets public API connection (no auth needed)"""
-        try:
-            url = f"{self.smarkets_base_url}/events/"
-            response = self.session.get(url, timeout=10)
-            print(f"Smarkets test: Status {response.status_code}")
-            
-            if response.status_code == 200:
-                print("Smarkets public API connection successful")
-                return True
-            else:
-                print(f"Smarkets public API error: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            print(f"Smarkets connection error: {e}")
-            return False
-    
-    def test_matchbook_connection(self):
-        """Test Matchbook API connection"""
-        try:
-            return self.matchbook_login()
-        except Exception as e:
-            print(f"Matchbook connection error: {e}")
-            return False
-    
-    def matchbook_login(self):
-        """Login to Matchbook API"""
-        try:
-            url = f"{self.matchbook_base_url}/security/session"
-            
-            payload = {
-                "username": self.matchbook_username,
-                "password": self.matchbook_password
-            }
-            
-            response = self.session.post(url, json=payload, timeout=15)
-            print(f"Matchbook login: Status {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                self.matchbook_session_token = data.get('session-token')
-                # Update session headers with token
-                self.session.headers.update({
-                    'session-token': self.matchbook_session_token
-                })
-                print("Matchbook login successful")
-                return True
-            else:
-                print(f"Matchbook login failed: {response.text}")
-                return False
-                
-        except Exception as e:
-            print(f"Matchbook login error: {e}")
-            return False
-    
-    def find_real_arbitrage_opportunities(self, market_filters):
-        """Find real arbitrage opportunities between exchanges using live data"""
-        opportunities = []
-        
-        try:
-            print(f"Starting REAL-TIME arbitrage scan...")
-            print(f"Threshold: {self.min_implied_prob_threshold}")
-            print(f"Min liquidity: £{self.min_liquidity}")
-            
-            # Get live events from both exchanges
-            all_events = []
-            
-            for sport, enabled in market_filters.items():
-                if enabled:
-                    print(f"Fetching live {sport} events...")
-                    
-                    # Get Smarkets events
-                    sm_events = self.get_smarkets_events(sport)
-                    all_events.extend(sm_events)
-                    
-                    # Get Matchbook events  
-                    mb_events = self.get_matchbook_events(sport)
-                    all_events.extend(mb_events)
-            
-            print(f"Total live events found: {len(all_events)}")
-            
-            if not all_events:
-                print("No live events found - may be outside trading hours")
-                return opportunities
-            
-            # Group events by similarity (cross-exchange matching)
-            event_groups = self.group_similar_events(all_events)
-            print(f"Found {len(event_groups)} event groups for comparison")
-            
-            # Analyze each group for arbitrage opportunities
-            for group in event_groups:
-                if len(group) >= 2:  # Need events from both exchanges
-                    arb_opps = self.analyze_event_group_for_arbitrage(group)
-                    opportunities.extend(arb_opps)
-            
-            print(f"Found {len(opportunities)} real arbitrage opportunities")
-            
-        except Exception as e:
-            print(f"Error in real arbitrage scan: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        return opportunities
-    
-    def get_smarkets_events(self, sport_filter=None):
-        """Get real live events from Smarkets public API"""
-        events = []
-        try:
-            url = f"{self.smarkets_base_url}/events/"
-            params = {'state': 'live', 'limit': 50}
-            
-            if sport_filter:
-                sport_ids = {
-                    'tennis': 'tennis',
-                    'football': 'football', 
-                    'basketball': 'basketball'
-                }
-                if sport_filter in sport_ids:
-                    params['sport_id'] = sport_ids[sport_filter]
-            
-            response = self.session.get(url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                for event in data.get('events', []):
-                    events.append({
-                        'id': event.get('id'),
-                        'name': event.get('name'),
-                        'sport': event.get('sport_id', 'unknown'),
-                        'start_time': event.get('start_datetime'),
-                        'state': event.get('state'),
-                        'exchange': 'smarkets'
-                    })
-            else:
-                print(f"Smarkets API error: {response.status_code}")
-            
-            print(f"Smarkets: Found {len(events)} live events")
-                    
-        except Exception as e:
-            print(f"Error fetching Smarkets events: {e}")
-        
-        return events
-    
-    def get_smarkets_markets(self, event_id):
-        """Get real markets for a Smarkets event"""
-        markets = []
-        try:
-            url = f"{self.smarkets_base_url}/events/{event_id}/markets/"
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                for market in data.get('markets', []):
-                    if market.get('state') == 'live':
-                        markets.append({
-                            'id': market.get('id'),
-                            'name': market.get('name'),
-                            'event_id': event_id,
-                            'exchange': 'smarkets'
-                        })
-                        
-        except Exception as e:
-            print(f"Error fetching Smarkets markets for event {event_id}: {e}")
-        
-        return markets
-    
-    def get_smarkets_odds(self, market_id):
-        """Get real live odds for a Smarkets market"""
-        odds = []
-        try:
-            url = f"{self.smarkets_base_url}/markets/{market_id}/contracts/"
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                for contract in data.get('contracts', []):
-                    # Get current live prices
-                    prices_url = f"{self.smarkets_base_url}/contracts/{contract.get('id')}/prices/"
-                    prices_response = self.session.get(prices_url, timeout=5)
-                    
-                    if prices_response.status_code == 200:
-                        prices_data = prices_response.json()
-                        buys = prices_data.get('buys', [])
-                        
-                        if buys:
-                            best_buy = buys[0]  # Best available price
-                            decimal_odds = float(best_buy.get('odds', 0)) / 100
-                            available_liquidity = float(best_buy.get('quantity', 0)) / 100
-                            
-                            if decimal_odds > 1 and available_liquidity >= self.min_liquidity:
-                                odds.append({
-                                    'selection': contract.get('name'),
-                                    'odds': decimal_odds,
-                                    'available': available_liquidity,
-                                    'contract_id': contract.get('id'),
-                                    'exchange': 'smarkets'
-                                })
-                            
-        except Exception as e:
-            print(f"Error fetching Smarkets odds for market {market_id}: {e}")
-        
-        return odds
-    
-    def get_matchbook_events(self, sport_filter=None):
-        """Get real live events from Matchbook API"""
-        events = []
-        try:
-            if not self.matchbook_session_token:
-                if not self.matchbook_login():
-                    return events
-            
-            url = f"{self.matchbook_base_url}/lookups/events"
-            params = {'status': 'open', 'offset': 0, 'per-page': 50}
-            
-            if sport_filter:
-                sport_ids = {
-                    'tennis': 325,
-                    'football': 11,
-                    'basketball': 18
-                }
-                if sport_filter in sport_ids:
-                    params['sport-ids'] = sport_ids[sport_filter]
-            
-            response = self.session.get(url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                for event in data.get('events', []):
-                    if event.get('in-running-flag'):  # Live events only
-                        events.append({
-                            'id': event.get('id'),
-                            'name': event.get('name'),
-                            'sport': event.get('sport-id'),
-                            'start_time': event.get('start'),
-                            'exchange': 'matchbook'
-                        })
-            elif response.status_code == 401:
-                print("Matchbook: Session expired, trying to re-login...")
-                if self.matchbook_login():
-                    return self.get_matchbook_events(sport_filter)
-            else:
-                print(f"Matchbook API error: {response.status_code}")
-            
-            print(f"Matchbook: Found {len(events)} live events")
-                    
-        except Exception as e:
-            print(f"Error fetching Matchbook events: {e}")
-        
-        return events
-    
-    def get_matchbook_markets(self, event_id):
-        """Get real markets for a Matchbook event"""
-        markets = []
-        try:
-            url = f"{self.matchbook_base_url}/events/{event_id}/markets"
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                for market in data.get('markets', []):
-                    if market.get('status') == 'open':
-                        markets.append({
-                            'id': market.get('id'),
-                            'name': market.get('name'),
-                            'event_id': event_id,
-                            'exchange': 'matchbook'
-                        })
-                        
-        except Exception as e:
-            print(f"Error fetching Matchbook markets for event {event_id}: {e}")
-        
-        return markets
-    
-    def get_matchbook_odds(self, market_id):
-        """Get real live odds for a Matchbook market"""
-        odds = []
-        try:
-            url = f"{self.matchbook_base_url}/markets/{market_id}/runners"
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                for runner in data.get('runners', []):
-                    if runner.get('status') == 'open':
-                        prices = runner.get('prices', [])
-                        
-                        # Find best back price
-                        best_back = None
-                        for price in prices:
-                            if (price.get('side') == 'back' and 
-                                price.get('odds') and 
-                                price.get('available-amount', 0) >= self.min_liquidity):
-                                
-                                if not best_back or price.get('odds') > best_back.get('odds'):
-                                    best_back = price
-                        
-                        if best_back:
-                            odds.append({
-                                'selection': runner.get('name'),
-                                'odds': float(best_back.get('odds')),
-                                'available': float(best_back.get('available-amount', 0)),
-                                'runner_id': runner.get('id'),
-                                'exchange': 'matchbook'
-                            })
-                                
-        except Exception as e:
-            print(f"Error fetching Matchbook odds for market {market_id}: {e}")
-        
-        return odds
-    
-    def group_similar_events(self, events):
-        """Group events that are likely the same across exchanges"""
-        groups = []
-        processed = set()
-        
-        for i, event1 in enumerate(events):
-            if i in processed:
-                continue
-                
-            group = [event1]
-            processed.add(i)
-            
-            for j, event2 in enumerate(events):
-                if j in processed or i == j:
-                    continue
-                
-                # Check if events are similar (same event on different exchanges)
-                if (self.events_are_similar(event1, event2) and 
-                    event1['exchange'] != event2['exchange']):
-                    group.append(event2)
-                    processed.add(j)
-            
-            # Only include groups with events from both exchanges
-            if len(group) > 1:
-                exchanges = {event['exchange'] for event in group}
-                if len(exchanges) > 1:  # Must have different exchanges
-                    groups.append(group)
-        
-        return groups
-    
-    def events_are_similar(self, event1, event2):
-        """Check if two events are likely the same using improved matching"""
-        name1 = event1['name'].lower()
-        name2 = event2['name'].lower()
-        
-        # Clean names for better matching
-        name1 = self.clean_event_name(name1)
-        name2 = self.clean_event_name(name2)
-        
-        # Split into words
-        words1 = set(name1.split())
-        words2 = set(name2.split())
-        
-        # Calculate similarity
-        common_words = words1 & words2
-        total_words = words1 | words2
-        
-        if len(total_words) == 0:
-            return False
-        
-        similarity = len(common_words) / len(total_words)
-        
-        # Also check for partial matches (e.g., "Djokovic" matches "N. Djokovic")
-        partial_matches = 0
-        for word1 in words1:
-            for word2 in words2:
-                if len(word1) >= 4 and len(word2) >= 4:
-                    if word1 in word2 or word2 in word1:
-                        partial_matches += 1
-        
-        partial_similarity = partial_matches / max(len(words1), len(words2))
-        
-        # Consider similar if either metric is high enough
-        return similarity >= 0.6 or partial_similarity >= 0.5
-    
-    def clean_event_name(self, name):
-        """Clean event name for better matching"""
-        import re
-        # Remove common prefixes/suffixes and normalize
-        name = re.sub(r'\(.*?\)', '', name)  # Remove parentheses content
-        name = re.sub(r'\b(vs|v)\b', ' ', name)  # Remove vs/v
-        name = re.sub(r'[^\w\s]', ' ', name)  # Remove special chars
-        name = re.sub(r'\s+', ' ', name).strip()  # Normalize whitespace
-        return name
-    
-    def analyze_event_group_for_arbitrage(self, event_group):
-        """Analyze a group of similar events for real arbitrage opportunities"""
-        opportunities = []
-        
-        try:
-            print(f"Analyzing event group: {[e['name'] for e in event_group]}")
-            
-            # Get markets for each event in the group
-            all_markets = []
-            for event in event_group:
-                if event['exchange'] == 'smarkets':
-                    markets = self.get_smarkets_markets(event['id'])
-                else:
-                    markets = self.get_matchbook_markets(event['id'])
-                
-                for market in markets:
-                    market['event_name'] = event['name']
-                    market['sport'] = event['sport']
-                    all_markets.append(market)
-            
-            print(f"Found {len(all_markets)} markets across exchanges")
-            
-            # Group markets by type
-            market_groups = self.group_similar_markets(all_markets)
-            print(f"Grouped into {len(market_groups)} market type groups")
-            
-            # Analyze each market group for arbitrage
-            for market_group in market_groups:
-                if len(market_group) >= 2:
-                    # Must have markets from different exchanges
-                    exchanges = {market['exchange'] for market in market_group}
-                    if len(exchanges) > 1:
-                        arb_opps = self.find_arbitrage_in_market_group(market_group)
-                        opportunities.extend(arb_opps)
-                    
-        except Exception as e:
-            print(f"Error analyzing event group: {e}")
-        
-        return opportunities
-    
-    def group_similar_markets(self, markets):
-        """Group markets that are the same type across exchanges"""
-        groups = []
-        processed = set()
-        
-        for i, market1 in enumerate(markets):
-            if i in processed:
-                continue
-                
-            group = [market1]
-            processed.add(i)
-            
-            for j, market2 in enumerate(markets):
-                if j in processed or i == j:
-                    continue
-                
-                # Check if markets are similar type and from different exchanges
-                if (self.markets_are_similar(market1, market2) and 
-                    market1['exchange'] != market2['exchange']):
-                    group.append(market2)
-                    processed.add(j)
-            
-            if len(group) > 1:
-                groups.append(group)
-        
-        return groups
-    
-    def markets_are_similar(self, market1, market2):
-        """Check if two markets are the same type using improved matching"""
-        name1 = market1['name'].lower()
-        name2 = market2['name'].lower()
-        
-        # Common market type keywords
-        market_keywords = [
-            ['winner', 'match', 'result'],
-            ['total', 'over', 'under'],
-            ['handicap', 'spread', 'line'],
-            ['first', 'set'],
-            ['correct', 'score']
-        ]
-        
-        # Check if both names contain keywords from the same group
-        for keyword_group in market_keywords:
-            match1 = any(keyword in name1 for keyword in keyword_group)
-            match2 = any(keyword in name2 for keyword in keyword_group)
-            if match1 and match2:
-                return True
-        
-        # Fallback to exact name match
-        return name1 == name2
-    
-    def find_arbitrage_in_market_group(self, market_group):
-        """Find real arbitrage opportunities within a market group"""
-        opportunities = []
-        
-        try:
-            print(f"Analyzing market group: {[m['name'] for m in market_group]}")
-            
-            # Get real odds for all markets in the group
-            all_odds = []
-            for market in market_group:
-                if market['exchange'] == 'smarkets':
-                    odds = self.get_smarkets_odds(market['id'])
-                else:
-                    odds = self.get_matchbook_odds(market['id'])
-                
-                for odd in odds:
-                    odd['market_id'] = market['id']
-                    odd['market_name'] = market['name']
-                    odd['event_name'] = market['event_name']
-                    odd['sport'] = market['sport']
-                    all_odds.append(odd)
-            
-            print(f"Found {len(all_odds)} odds across markets")
-            
-            if len(all_odds) >= 2:
-                # Calculate real arbitrage opportunities
-                arb_opps = self.calculate_real_arbitrage(all_odds)
-                opportunities.extend(arb_opps)
-            
-        except Exception as e:
-            print(f"Error finding arbitrage in market group: {e}")
-        
-        return opportunities
-    
-    def calculate_real_arbitrage(self, odds_list):
-        """Calculate real arbitrage opportunities from live odds"""
-        opportunities = []
-        
-        try:
-            # Group odds by selection/outcome
-            outcome_groups = {}
-            for odd in odds_list:
-                # Normalize selection names for better matching
-                selection = self.normalize_selection_name(odd['selection'])
-                if selection not in outcome_groups:
-                    outcome_groups[selection] = []
-                outcome_groups[selection].append(odd)
-            
-            print(f"Grouped odds into {len(outcome_groups)} outcomes: {list(outcome_groups.keys())}")
-            
-            # For binary markets (most common)
-            if len(outcome_groups) == 2:
-                opportunities.extend(self.check_binary_arbitrage_real(outcome_groups))
-            
-        except Exception as e:
-            print(f"Error calculating real arbitrage: {e}")
-        
-        return opportunities
-    
-    def normalize_selection_name(self, selection):
-        """Normalize selection names for better matching"""
-        import re
-        # Convert to lowercase and remove common variations
-        selection = selection.lower().strip()
-        # Remove titles, initials, etc.
-        selection = re.sub(r'\b[a-z]\.\s*', '', selection)  # Remove initials like "N. "
-        selection = re.sub(r'\s+', ' ', selection)  # Normalize whitespace
-        return selection
-    
-    def check_binary_arbitrage_real(self, outcome_groups):
-        """Check for real arbitrage in binary markets using live odds"""
-        opportunities = []
-        
-        try:
-            outcome_names = list(outcome_groups.keys())
-            outcome1_odds = outcome_groups[outcome_names[0]]
-            outcome2_odds = outcome_groups[outcome_names[1]]
-            
-            print(f"Checking arbitrage between '{outcome_names[0]}' and '{outcome_names[1]}'")
-            
-            # Find best odds combination from different exchanges
-            for odd1 in outcome1_odds:
-                for odd2 in outcome2_odds:
-                    # Must be from different exchanges
-                    if odd1['exchange'] == odd2['exchange']:
-                        continue
-                    
-                    # Check minimum liquidity requirements
-                    if (odd1['available'] < self.min_liquidity or 
-                        odd2['available'] < self.min_liquidity):
-                        continue
-                    
-                    # Calculate arbitrage
-                    odds1 = float(odd1['odds'])
-                    odds2 = float(odd2['odds'])
-                    
-                    if odds1 <= 1 or odds2 <= 1:
-                        continue
-                    
-                    implied_prob1 = 1.0 / odds1
-                    implied_prob2 = 1.0 / odds2
-                    total_implied_prob = implied_prob1 + implied_prob2
-                    
-                    print(f"Checking: {odds1:.2f} vs {odds2:.2f}, Total prob: {total_implied_prob:.4f}")
-                    
-                    # Check if real arbitrage exists
-                    if total_implied_prob < self.min_implied_prob_threshold:
-                        profit_margin = (1.0 - total_implied_prob) * 100
-                        
-                        # Calculate optimal stakes
-                        total_stake = 1000
-                        stake1 = (implied_prob1 / total_implied_prob) * total_stake
-                        stake2 = (implied_prob2 / total_implied_prob) * total_stake
-                        
-                        # Calculate returns
-                        return1 = stake1 * odds1
-                        return2 = stake2 * odds2
-                        
-                        # Account for exchange commissions
-                        commission1 = return1 * 0.02
-                        commission2 = return2 * 0.02
-                        
-                        net_profit = min(return1, return2) - total_stake - commission1 - commission2
-                        
-                        if net_profit > 0:
-                            opportunity = {
-                                'event_name': odd1.get('event_name', 'Unknown Event'),
-                                'market_name': odd1.get('market_name', 'Unknown Market'),
-                                'sport': odd1.get('sport', 'Unknown'),
-                                'total_implied_prob': round(total_implied_prob, 4),
-                                'profit_margin': round(profit_margin, 2),
-                                'roi': round((net_profit / total_stake) * 100, 2),
-                                'bet1_selection': odd1['selection'],
-                                'bet1_exchange': odd1['exchange'],
-                                'bet1_odds': round(odds1, 2),
-                                'bet1_stake': round(stake1, 2),
-                                'bet1_liquidity': round(odd1['available'], 2),
-                                'bet1_return': round(return1, 2),
-                                'bet2_selection': odd2['selection'],
-                                'bet2_exchange': odd2['exchange'],
-                                'bet2_odds': round(odds2, 2),
-                                'bet2_stake': round(stake2, 2),
-                                'bet2_liquidity': round(odd2['available'], 2),
-                                'bet2_return': round(return2, 2),
-                                'total_stake': total_stake,
-                                'guaranteed_profit': round(net_profit, 2),
-                                'event_time': 'Live'
-                            }
-                            
-                            opportunities.append(opportunity)
-                            print(f"REAL ARBITRAGE FOUND: {profit_margin:.2f}% profit on {odd1.get('event_name')}")
-                            
-        except Exception as e:
-            print(f"Error checking binary arbitrage: {e}")
-        
-        return opportunities
-
+        self.details_shown = self.status_shown = None
 
 
 def run_arbitrage_scanner():
     """Main function to run the GUI"""
+    configure_logging()
     root = tk.Tk()
     app = ArbitrageScannerGUI(root)
     root.mainloop()
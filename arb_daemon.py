@@ -0,0 +1,144 @@
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+from arb_scanner import SmarketsMatchbookScanner
+from scan_logging import configure_logging
+
+SPORTS = ('tennis', 'football', 'basketball')
+
+# Named explicitly: run as a script, __name__ is '__main__'
+logger = logging.getLogger('arb_daemon')
+
+
+def load_credentials(path=None):
+    """(username, password) for Matchbook from a JSON file, else $MATCHBOOK_USERNAME/$MATCHBOOK_PASSWORD"""
+    if path:
+        with open(path) as f:
+            credentials = json.load(f)
+        return credentials.get('username', ''), credentials.get('password', '')
+    return os.environ.get('MATCHBOOK_USERNAME', ''), os.environ.get('MATCHBOOK_PASSWORD', '')
+
+
+class ScannerDaemon:
+    """Continuous scan that writes its results as JSON lines.
+
+    Every line is an object with a 'type' and a 'ts' timestamp:
+    'opportunity' when a market's opportunity appears or changes,
+    'closed' when it is no longer reported, and 'metrics' every
+    metrics_interval seconds with the scanner's metrics snapshot and the
+    latest cycle's stats. Opportunities are keyed by market_key, so an
+    unchanged opportunity is written once however many cycles it lasts.
+    """
+
+    def __init__(self, scanner, output, metrics_interval=60.0):
+        self.scanner = scanner
+        self.output = output
+        self.metrics_interval = metrics_interval
+        self.stop_event = threading.Event()
+        self.reported = {}          # market key -> opportunity as last written, without its quote age
+        self._next_metrics = 0.0
+
+    def write(self, kind, record):
+        self.output.write(json.dumps(dict(record, type=kind, ts=round(time.time(), 3))) + '\n')
+        self.output.flush()
+
+    def on_cycle(self, opportunities, stats):
+        current = {}
+        for opportunity in opportunities:
+            key = tuple(opportunity['market_key'])
+            current[key] = opportunity
+            # The quote age changes every cycle; only a change in the prices is news
+            comparable = {name: value for name, value in opportunity.items() if name != 'quote_age'}
+            if self.reported.get(key) != comparable:
+                self.reported[key] = comparable
+                self.write('opportunity', opportunity)
+
+        for key in [key for key in self.reported if key not in current]:
+            closed = self.reported.pop(key)
+            self.write('closed', {'market_key': key, 'event_name': closed['event_name'],
+                                  'market_name': closed['market_name']})
+
+        now = time.time()
+        if self.metrics_interval and now >= self._next_metrics:
+            self._next_metrics = now + self.metrics_interval
+            self.write('metrics', dict(self.scanner.metrics.snapshot(), cycle=stats))
+
+    def run(self, market_filters):
+        """Scan until stop() is called, e.g. from a signal handler"""
+        logger.info("Scanning %s", ', '.join(sport for sport, enabled in market_filters.items() if enabled))
+        try:
+            self.scanner.run_continuous(market_filters, self.stop_event, self.on_cycle)
+        finally:
+            if self.metrics_interval:
+                self.write('metrics', self.scanner.metrics.snapshot())
+            self.scanner.close()
+            logger.info("Stopped")
+
+    def stop(self, signum=None, frame=None):
+        if signum is not None:
+            logger.info("Received %s, stopping after the current cycle", signal.Signals(signum).name)
+        self.stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan Smarkets and Matchbook continuously without a display, "
+                                                 "writing opportunities and metrics as JSON lines")
+    parser.add_argument('--sports', nargs='+', choices=SPORTS, default=['tennis'])
+    parser.add_argument('--threshold', type=float, default=0.98,
+                        help="Maximum total implied probability to report (default 0.98)")
+    parser.add_argument('--min-liquidity', type=float, default=100, help="Minimum £ available per leg (default 100)")
+    parser.add_argument('--credentials', help="JSON file with Matchbook 'username' and 'password' "
+                                              "(default: $MATCHBOOK_USERNAME and $MATCHBOOK_PASSWORD)")
+    parser.add_argument('--output', '-o', help="Append JSON lines to this file (default: stdout)")
+    parser.add_argument('--metrics-interval', type=float, default=60.0,
+                        help="Seconds between metrics lines, 0 for none (default 60)")
+    parser.add_argument('--metrics-file', help="Also dump metrics to this file every --metrics-interval seconds "
+                                               "(Prometheus text for .prom/.txt, JSON otherwise)")
+    parser.add_argument('--discovery-interval', type=float,
+                        help="Seconds between full rediscovery scans (default: the scanner's)")
+    parser.add_argument('--poll-interval', type=float,
+                        help="Seconds between odds polls of markets near the threshold (default: the scanner's)")
+    parser.add_argument('--endpoints', nargs=2, metavar=('SMARKETS_URL', 'MATCHBOOK_URL'),
+                        help="Exchange base URLs to use instead of the live APIs, e.g. an exchange_simulator")
+    parser.add_argument('--mappings', default='arb_mappings.db', help="Event and market link store")
+    parser.add_argument('--log-level', default='INFO', help="Level of the log lines on stderr (default INFO)")
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+
+    username, password = load_credentials(args.credentials)
+    if not username or not password:
+        parser.error("Matchbook credentials are required: use --credentials or set "
+                     "MATCHBOOK_USERNAME and MATCHBOOK_PASSWORD")
+
+    scanner = SmarketsMatchbookScanner(mappings_path=args.mappings)
+    scanner.matchbook_username = username
+    scanner.matchbook_password = password
+    if args.endpoints:
+        scanner.use_endpoints(*args.endpoints)
+    scanner.min_implied_prob_threshold = args.threshold
+    scanner.min_liquidity = args.min_liquidity
+    if args.discovery_interval is not None:
+        scanner.discovery_interval = args.discovery_interval
+    if args.poll_interval is not None:
+        scanner.odds_poll_interval = args.poll_interval
+    if args.metrics_file and args.metrics_interval:
+        scanner.metrics.start_dump(args.metrics_file, args.metrics_interval)
+
+    output = open(args.output, 'a') if args.output else sys.stdout
+    daemon = ScannerDaemon(scanner, output, args.metrics_interval)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    try:
+        daemon.run({sport: sport in args.sports for sport in SPORTS})
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
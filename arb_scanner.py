@@ -0,0 +1,1126 @@
+import logging
+import threading
+import queue
+import time
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from event_matching import EventMatcher, clean_event_name, group_events, tokenize, tokens_are_similar
+from mapping_store import MappingStore
+from market_types import classify_market, group_markets
+from arbitrage_engine import best_implied_prob
+from price_book import PriceBook
+from records import Event, Market, Quote, WatchedGroup
+from response_cache import ResponseCache
+from transport import Transport
+from traffic_capture import TrafficRecorder, TrafficReplayer
+from scan_metrics import ScanMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class SmarketsMatchbookScanner:
+    """Real-time cross-exchange arbitrage scanner"""
+    def __init__(self, mappings_path='arb_mappings.db'):
+        # API endpoints
+        self.smarkets_base_url = "https://api.smarkets.com/v3"
+        self.matchbook_base_url = "https://www.matchbook.com/bpapi/rest"
+        
+        # Credentials (Matchbook only - Smarkets uses public API)
+        self.matchbook_username = ""
+        self.matchbook_password = ""
+        self.matchbook_session_token = None
+        self.matchbook_session_refresh = 4 * 3600   # Re-login before the session can expire
+        self._matchbook_login_time = 0.0
+        self._login_lock = threading.Lock()
+        
+        # Settings
+        self.min_implied_prob_threshold = 0.98
+        self.min_liquidity = 100
+        self.max_stake = 1000   # Largest total stake an opportunity is sized to
+        self.commission_rates = {'smarkets': 0.02, 'matchbook': 0.02}
+        
+        # Smarkets accepts comma-separated IDs in one quotes or contracts request
+        self.smarkets_batch_size = 20
+        
+        # Continuous mode: odds of matched markets are re-polled on a fast cadence,
+        # event and market lists are rediscovered on a slow one
+        self.discovery_interval = 60.0
+        self.odds_poll_interval = 1.0       # markets within near_threshold_margin of the threshold
+        self.idle_poll_interval = 5.0       # markets further away
+        self.near_threshold_margin = 0.02
+        self.max_staleness = 10.0           # quotes older than this are never reported
+        
+        # Event discovery pages through the full result set
+        self.events_page_size = 100
+        self.max_event_pages = 50
+        
+        # Smarkets contracts per market, least recently used first: market ID ->
+        # (expires, [(contract ID, name)]); kept for the response cache's contracts TTL
+        self.max_contract_markets = 4096
+        self._contract_cache = OrderedDict()
+        self._contract_cache_lock = threading.Lock()
+        
+        # Concurrency: at most this many requests in flight per exchange
+        self.max_concurrency = {'smarkets': 8, 'matchbook': 4}
+        self.stream_threads = 1             # event stream threads per exchange, one per sport scanned
+        self._pool_sizes = {}               # base URL -> keep-alive pool size mounted on the session
+        self._executors = {}
+        self._executor_lock = threading.Lock()
+        
+        # Confirmed Smarkets <-> Matchbook links, reused across scans
+        self.mappings = MappingStore(mappings_path)
+        
+        # Latest quotes per market, kept between scans and re-evaluated per market update
+        self.price_book = PriceBook()
+        self.configure_price_book()
+        
+        # Event, market and contract metadata is cached; prices are always fetched
+        self.response_cache = ResponseCache()
+        
+        # Rate limits, retries and session refresh for every exchange request
+        self.transport = Transport(lambda: self.session,
+                                   {'smarkets': self.smarkets_base_url, 'matchbook': self.matchbook_base_url})
+        self.transport.authenticate['matchbook'] = self.refresh_matchbook_session
+        
+        # Request, stage and quote-age metrics (see ScanMetrics)
+        self.metrics = ScanMetrics()
+        self.transport.metrics = self.metrics
+        
+        # Session
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'ArbitrageScanner/1.0',
+            'Accept': 'application/json',
+            'Content-Type': 'application/json'
+        })
+        self.configure_connection_pool()
+    
+    def configure_connection_pool(self, stream_threads=None):
+        """Size each exchange's keep-alive pool so every worker and event stream can hold a connection.
+        
+        stream_threads is the number of event stream threads a scan runs per
+        exchange (one per enabled sport); it is remembered for later resizes.
+        A pool that already has the right size is kept with its connections.
+        """
+        if stream_threads is not None:
+            self.stream_threads = stream_threads
+        for exchange, base_url in (('smarkets', self.smarkets_base_url), ('matchbook', self.matchbook_base_url)):
+            size = self.max_concurrency[exchange] + self.stream_threads
+            if self._pool_sizes.get(base_url) == size:
+                continue
+            self._pool_sizes[base_url] = size
+            self.session.mount(base_url, HTTPAdapter(pool_connections=1, pool_maxsize=size))
+    
+    def use_endpoints(self, smarkets_base_url, matchbook_base_url):
+        """Point the scanner at other exchange endpoints, e.g. a local simulator"""
+        self.smarkets_base_url = smarkets_base_url
+        self.matchbook_base_url = matchbook_base_url
+        self.transport.base_urls = {'smarkets': smarkets_base_url, 'matchbook': matchbook_base_url}
+        self.configure_connection_pool()
+    
+    def record_traffic(self, path):
+        """Write every exchange request and response from now on to a gzipped JSONL capture"""
+        self.session = TrafficRecorder(self.session, path)
+    
+    def replay_traffic(self, path, speed=1.0):
+        """Serve exchange responses from a capture instead of the network (see TrafficReplayer)"""
+        self.session.close()
+        self.session = TrafficReplayer(path, speed)
+        # The recorded timing already reflects the exchanges' rate limits
+        self.transport.disable_rate_limits()
+    
+    def configure_price_book(self):
+        """Copy the current arbitrage settings onto the price book"""
+        self.price_book.commission = self.commission_rates
+        self.price_book.max_stake = self.max_stake
+        self.price_book.max_implied_prob = self.min_implied_prob_threshold
+        self.price_book.min_liquidity = self.min_liquidity
+    
+    def cached_get(self, url, **kwargs):
+        """GET through the response cache and the rate-limited transport"""
+        return self.response_cache.get(self.transport, url, **kwargs)
+    
+    def _executor(self, exchange):
+        """Bounded worker pool for one exchange, recreated if its limit changes"""
+        with self._executor_lock:
+            limit = self.max_concurrency[exchange]
+            executor = self._executors.get(exchange)
+            if executor is None or executor._max_workers != limit:
+                if executor is not None:
+                    executor.shutdown(wait=False)
+                executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"{exchange}-fetch")
+                self._executors[exchange] = executor
+                self.configure_connection_pool()
+            return executor
+    
+    def _submit(self, exchange, fn, *args):
+        return self._executor(exchange).submit(fn, *args)
+    
+    def close(self):
+        """Stop worker pools and release pooled connections"""
+        with self._executor_lock:
+            for executor in self._executors.values():
+                executor.shutdown(wait=False)
+            self._executors.clear()
+        self.metrics.stop_dump()
+        self.session.close()
+        self.mappings.close()
+    
+    def test_smarkets_connection(self):
+        """Test Smarkets public API connection (no auth needed)"""
+        try:
+            url = f"{self.smarkets_base_url}/events/"
+            response = self.transport.get(url, timeout=10)
+            logger.info("Smarkets test: Status %s", response.status_code)
+            
+            if response.status_code == 200:
+                logger.info("Smarkets public API connection successful")
+                return True
+            else:
+                logger.warning("Smarkets public API error: %s", response.status_code)
+                return False
+                
+        except Exception as e:
+            logger.error("Smarkets connection error: %s", e)
+            return False
+    
+    def test_matchbook_connection(self):
+        """Test Matchbook API connection"""
+        try:
+            return self.matchbook_login()
+        except Exception as e:
+            logger.error("Matchbook connection error: %s", e)
+            return False
+    
+    def matchbook_login(self):
+        """Login to Matchbook API"""
+        try:
+            url = f"{self.matchbook_base_url}/security/session"
+            
+            payload = {
+                "username": self.matchbook_username,
+                "password": self.matchbook_password
+            }
+            
+            response = self.transport.post(url, json=payload, timeout=15)
+            logger.info("Matchbook login: Status %s", response.status_code)
+            
+            if response.status_code == 200:
+                data = response.json()
+                self.matchbook_session_token = data.get('session-token')
+                self._matchbook_login_time = time.time()
+                # Only Matchbook requests carry the token
+                self.transport.headers['matchbook'] = {'session-token': self.matchbook_session_token}
+                logger.info("Matchbook login successful")
+                return True
+            else:
+                logger.warning("Matchbook login failed: %s", response.text)
+                return False
+                
+        except Exception as e:
+            logger.error("Matchbook login error: %s", e)
+            return False
+    
+    def refresh_matchbook_session(self, force):
+        """Log in again when the session is due for renewal, or when forced after a 401"""
+        token = self.matchbook_session_token
+        if not self.matchbook_username:
+            return False
+        if not force and token and time.time() - self._matchbook_login_time < self.matchbook_session_refresh:
+            return True
+        with self._login_lock:
+            # Another worker may have renewed the session while this one waited
+            if self.matchbook_session_token != token:
+                return True
+            return self.matchbook_login()
+    
+    def find_real_arbitrage_opportunities(self, market_filters, watch=None, results=None):
+        """Find real arbitrage opportunities between exchanges using live data.
+        
+        When a watch dict is given, every matched market group is recorded in
+        it for continuous re-polling (see run_continuous). When a results
+        queue is given, each opportunity is put on it as soon as it is found,
+        so callers can show it while the scan is still running; the complete
+        list is returned at the end either way.
+        """
+        opportunities = []
+        first_found = []
+        
+        def emit(opportunity):
+            if not first_found:
+                first_found.append(time.time() - scan_start)
+                self.metrics.observe_first_opportunity(first_found[0])
+                logger.info("First opportunity after %.2fs", first_found[0])
+            if results is not None:
+                results.put(opportunity)
+        
+        try:
+            logger.info("Starting REAL-TIME arbitrage scan (threshold %s, min liquidity £%s)",
+                        self.min_implied_prob_threshold, self.min_liquidity)
+            scan_start = time.time()
+            
+            # Log in up front so concurrent event fetches share one session token
+            sports = [sport for sport, enabled in market_filters.items() if enabled]
+            if sports and not self.matchbook_session_token:
+                self.matchbook_login()
+            
+            # Stream live events from both exchanges, every sport at once
+            self.configure_connection_pool(stream_threads=len(sports))
+            inbox = queue.Queue()
+            for sport in sports:
+                logger.info("Fetching live %s events...", sport)
+                for events in (self.iter_smarkets_events(sport), self.iter_matchbook_events(sport)):
+                    threading.Thread(target=self._stream_events, args=(events, inbox), daemon=True).start()
+            
+            opportunities = self.run_scan_pipeline(inbox, producers=2 * len(sports), watch=watch, emit=emit)
+            self.metrics.observe_stage('scan', time.time() - scan_start)
+            
+            logger.info("Found %d real arbitrage opportunities in %.1fs", len(opportunities), time.time() - scan_start)
+            
+        except Exception as e:
+            logger.exception("Error in real arbitrage scan: %s", e)
+        
+        return opportunities
+    
+    def _stream_events(self, events, inbox):
+        """Feed events from one paginated fetcher into the scan pipeline"""
+        try:
+            for event in events:
+                inbox.put(('event', event))
+        except Exception as e:
+            logger.error("Error streaming events: %s", e)
+        finally:
+            inbox.put(('producer_done', None))
+    
+    def scan_event_groups(self, event_groups):
+        """Fetch markets and odds for already-grouped events through the scan pipeline"""
+        inbox = queue.Queue()
+        for group in event_groups:
+            inbox.put(('group', group))
+        return self.run_scan_pipeline(inbox, producers=0)
+    
+    def run_scan_pipeline(self, inbox, producers, watch=None, emit=None):
+        """Drive the events -> markets -> odds pipeline from a single message queue.
+        
+        Inbox messages are streamed events, pre-built event groups and
+        completed fetches. Events are matched across exchanges as they
+        arrive, against an index of those still unmatched, and a matched
+        group's markets are requested immediately; each market group's odds
+        are requested as soon as its event group's markets are in, and
+        arbitrage is checked as soon as its odds are in.
+        Scan time therefore follows the slowest events -> markets -> odds
+        chain rather than the sum of round trips. emit, if given, is called
+        with each opportunity as it is found.
+        """
+        self.configure_price_book()
+        self.price_book.expire(self.max_staleness)
+        
+        opportunities = []
+        pending = {}             # future -> ('markets', event group index) or ('odds', [(market group key, market)])
+        matcher = EventMatcher() # indexes streamed events not yet matched
+        linked_waiting = {}      # (exchange, id) -> streamed event waiting for its stored partner
+        streamed = set()         # exchanges that streamed at least one event
+        group_markets = {}       # event group index -> markets received so far
+        markets_remaining = {}   # event group index -> market fetches outstanding
+        market_groups = {}       # market group key -> [markets outstanding, odds received]
+        smarkets_ready = []      # (market group key, market) awaiting a batched quote request
+        counts = {'events': 0, 'event_groups': 0, 'market_groups': 0}
+        
+        def track(future, stage, key):
+            pending[future] = (stage, key)
+            future.add_done_callback(lambda done: inbox.put(('done', done)))
+        
+        def start_event_group(group):
+            index = counts['event_groups']
+            counts['event_groups'] += 1
+            group_markets[index] = []
+            markets_remaining[index] = len(group)
+            for event in group:
+                track(self._submit(event.exchange, self.fetch_event_markets, event), 'markets', index)
+        
+        while producers or pending or not inbox.empty():
+            kind, payload = inbox.get()
+            
+            if kind == 'producer_done':
+                producers -= 1
+                if not producers and linked_waiting:
+                    with self.metrics.stage('match'):
+                        groups = self.match_unpartnered_events(matcher, linked_waiting, streamed)
+                    for group in groups:
+                        start_event_group(group)
+            elif kind == 'group':
+                start_event_group(payload)
+            elif kind == 'event':
+                counts['events'] += 1
+                streamed.add(payload.exchange)
+                with self.metrics.stage('match'):
+                    group = self.match_streamed_event(payload, matcher, linked_waiting)
+                if group:
+                    start_event_group(group)
+            else:
+                stage, key = pending.pop(payload)
+                try:
+                    result = payload.result()
+                except Exception as e:
+                    logger.error("Error in %s fetch: %s", stage, e)
+                    result = [] if stage == 'markets' else {}
+                
+                if stage == 'markets':
+                    group_markets[key].extend(result)
+                    markets_remaining[key] -= 1
+                    if not markets_remaining[key]:
+                        # All markets for this event group are in - fan out the odds
+                        with self.metrics.stage('market_grouping'):
+                            new_market_groups = self.group_similar_markets(group_markets.pop(key))
+                        for market_group in new_market_groups:
+                            if len({market.exchange for market in market_group}) < 2:
+                                continue
+                            group_key = counts['market_groups']
+                            counts['market_groups'] += 1
+                            market_groups[group_key] = [len(market_group), [], market_group]
+                            for market in market_group:
+                                if market.exchange == 'smarkets':
+                                    smarkets_ready.append((group_key, market))
+                                else:
+                                    track(self._submit('matchbook', self.fetch_market_odds_batch, [market]),
+                                          'odds', [(group_key, market)])
+                else:
+                    for group_key, market in key:
+                        state = market_groups[group_key]
+                        state[0] -= 1
+                        state[1].extend(result.get(market.id, []))
+                        if state[0]:
+                            continue
+                        
+                        del market_groups[group_key]
+                        if watch is not None:
+                            found = self.watch_market_group(watch, state[2], state[1])
+                        elif len(state[1]) >= 2:
+                            found = self.calculate_real_arbitrage(state[1], state[2])
+                        else:
+                            found = []
+                        opportunities.extend(found)
+                        if emit:
+                            for opportunity in found:
+                                emit(opportunity)
+            
+            # Smarkets markets that became ready together share quote requests,
+            # so only flush once the messages already queued have been handled
+            if smarkets_ready and (inbox.empty() or len(smarkets_ready) >= self.smarkets_batch_size):
+                while smarkets_ready:
+                    batch = smarkets_ready[:self.smarkets_batch_size]
+                    del smarkets_ready[:self.smarkets_batch_size]
+                    track(self._submit('smarkets', self.fetch_market_odds_batch, [market for _, market in batch]),
+                          'odds', batch)
+        
+        self.mappings.flush()
+        logger.info("Scanned %d streamed events, %d event groups, %d market groups (%d stored links reused)",
+                    counts['events'], counts['event_groups'], counts['market_groups'], self.mappings.hits)
+        return opportunities
+    
+    def run_continuous(self, market_filters, stop_event, on_cycle):
+        """Scan continuously until stop_event is set.
+        
+        Events and markets are rediscovered with a full pipeline scan every
+        discovery_interval; in between, only the odds of already matched
+        market groups are re-polled. on_cycle(opportunities, stats) is called
+        after every cycle with the opportunities from quotes no older than
+        max_staleness.
+        """
+        self.configure_price_book()
+        watch = {}
+        next_discovery = 0.0
+        while not stop_event.is_set():
+            cycle_start = time.time()
+            if cycle_start >= next_discovery:
+                self.find_real_arbitrage_opportunities(market_filters, watch=watch)
+                # Market groups that were not found again have closed
+                for key in [key for key, entry in watch.items() if entry.discovered < cycle_start]:
+                    closed = watch.pop(key)
+                    self.price_book.remove_market(key)
+                    self.forget_contracts(market.id for market in closed.markets if market.exchange == 'smarkets')
+                next_discovery = cycle_start + self.discovery_interval
+                stats = {'discovery': True, 'polled': len(watch), 'unchanged': 0}
+            else:
+                stats = self.refresh_watched_odds(watch)
+                # Selection pairs first confirmed by this poll
+                self.mappings.flush()
+            
+            stats.update(self.staleness(watch))
+            on_cycle(self.current_opportunities(watch), stats)
+            stop_event.wait(max(0.0, self.odds_poll_interval - (time.time() - cycle_start)))
+    
+    def watch_market_group(self, watch, markets, odds):
+        """Record a discovered market group for re-polling and evaluate its odds"""
+        key = tuple(sorted(market.key for market in markets))
+        entry = watch.get(key)
+        if entry is None:
+            entry = watch[key] = WatchedGroup(key, markets)
+        entry.discovered = time.time()
+        self.evaluate_watched(entry, odds)
+        return entry.opportunities
+    
+    def evaluate_watched(self, entry, odds):
+        """Re-evaluate a watched market group; returns False if its prices are unchanged"""
+        entry.polled = time.time()
+        digest = hashlib.sha1(repr(sorted(
+            (odd.exchange, odd.selection, odd.odds, odd.available,
+             odd.ladder.tobytes() if odd.ladder is not None else b'') for odd in odds)).encode()).digest()
+        if digest == entry.digest:
+            return False
+        
+        entry.digest = digest
+        if len(odds) >= 2:
+            entry.implied = best_implied_prob(self.group_outcomes(odds), self.min_liquidity)
+            entry.opportunities = self.calculate_real_arbitrage(odds, key=entry.key)
+        else:
+            entry.implied = float('inf')
+            entry.opportunities = []
+        return True
+    
+    def poll_interval(self, entry):
+        """Seconds between odds polls: fast near the threshold, never beyond max_staleness"""
+        if entry.implied - self.min_implied_prob_threshold <= self.near_threshold_margin:
+            return self.odds_poll_interval
+        return min(self.idle_poll_interval, self.max_staleness)
+    
+    def refresh_watched_odds(self, watch):
+        """Re-poll odds for watched market groups that are due, closest to the threshold first"""
+        now = time.time()
+        due = [entry for entry in watch.values() if now - entry.polled >= self.poll_interval(entry)]
+        due.sort(key=lambda entry: entry.implied)
+        
+        # Submitted in priority order, so the executors fetch the closest markets first
+        futures = {}   # future -> exchange
+        smarkets = [market for entry in due for market in entry.markets if market.exchange == 'smarkets']
+        for start in range(0, len(smarkets), self.smarkets_batch_size):
+            futures[self._submit('smarkets', self.fetch_market_odds_batch,
+                                 smarkets[start:start + self.smarkets_batch_size])] = 'smarkets'
+        for entry in due:
+            for market in entry.markets:
+                if market.exchange == 'matchbook':
+                    futures[self._submit('matchbook', self.fetch_market_odds_batch, [market])] = 'matchbook'
+        
+        odds_by_market = {}   # (exchange, market ID) -> odds
+        for future in as_completed(futures):
+            try:
+                for market_id, odds in future.result().items():
+                    odds_by_market[(futures[future], market_id)] = odds
+            except Exception as e:
+                logger.error("Error in odds refresh: %s", e)
+        
+        unchanged = 0
+        for entry in due:
+            keys = [(market.exchange, market.id) for market in entry.markets]
+            # A market whose fetch failed keeps its old quotes and keeps ageing
+            if any(key not in odds_by_market for key in keys):
+                continue
+            odds = [odd for key in keys for odd in odds_by_market[key]]
+            if not self.evaluate_watched(entry, odds):
+                unchanged += 1
+        
+        return {'discovery': False, 'polled': len(due), 'unchanged': unchanged}
+    
+    def staleness(self, watch):
+        """Age in seconds of the oldest and average watched quotes"""
+        now = time.time()
+        ages = [now - entry.polled for entry in watch.values()]
+        return {
+            'markets': len(ages),
+            'max_age': max(ages, default=0.0),
+            'mean_age': sum(ages) / len(ages) if ages else 0.0,
+            'stale': sum(1 for age in ages if age > self.max_staleness)
+        }
+    
+    def current_opportunities(self, watch):
+        """Opportunities from watched quotes no older than max_staleness.
+        
+        Each is a copy carrying its quote_age; the records in the price book
+        stay as evaluated, so an unchanged opportunity still compares equal.
+        """
+        now = time.time()
+        opportunities = []
+        for entry in watch.values():
+            age = now - entry.polled
+            if age > self.max_staleness:
+                continue
+            for opportunity in entry.opportunities:
+                opportunities.append(dict(opportunity, quote_age=round(age, 1)))
+        return opportunities
+    
+    def match_streamed_event(self, event, matcher, linked_waiting):
+        """Pair an arriving event with its counterpart from the other exchange.
+        
+        Events with a stored link wait for their known partner, and the link's
+        TTL restarts when the partner arrives; anything else goes through the
+        fuzzy matcher and new pairs are stored. Returns the pair, or None
+        while the event waits for its counterpart.
+        """
+        exchange = event.exchange
+        partner = self.mappings.partner('event', exchange, event.id)
+        if partner is not None:
+            counterpart = linked_waiting.pop((self.other_exchange(exchange), partner), None)
+            if counterpart is None:
+                linked_waiting[(exchange, str(event.id))] = event
+                return None
+            self.mappings.touch('event', exchange, event.id)
+            return [counterpart, event]
+        
+        return self.match_new_event(event, matcher)
+    
+    def match_new_event(self, event, matcher):
+        group = matcher.add(event)
+        if group:
+            self.link_pair('event', group[0].id, group[1].id, group[0].exchange)
+        return group
+    
+    def match_unpartnered_events(self, matcher, linked_waiting, streamed):
+        """Fuzzy match the linked events whose partner never streamed in.
+        
+        Called once every event has arrived: a partner still missing from an
+        exchange that did stream has settled or left the live listing, so
+        its link is dropped and the event gets the same chance to match as
+        one never seen before. Links to an exchange that streamed nothing,
+        e.g. after a failed login, are kept. Returns the new pairs.
+        """
+        groups = []
+        for (exchange, event_id), event in linked_waiting.items():
+            if self.other_exchange(exchange) in streamed:
+                self.mappings.unlink('event', exchange, event_id)
+            group = self.match_new_event(event, matcher)
+            if group:
+                groups.append(group)
+        linked_waiting.clear()
+        return groups
+    
+    def other_exchange(self, exchange):
+        return 'matchbook' if exchange == 'smarkets' else 'smarkets'
+    
+    def link_pair(self, level, id1, id2, exchange1, outcome_key=None):
+        """Store a confirmed pair given in either exchange order"""
+        if id1 is None or id2 is None:
+            return
+        if exchange1 == 'smarkets':
+            self.mappings.link(level, id1, id2, outcome_key)
+        else:
+            self.mappings.link(level, id2, id1, outcome_key)
+    
+    def pair_linked(self, level, items):
+        """Split events or markets into stored pairs and the rest, which still need matching"""
+        remaining = {(item.exchange, str(item.id)): item for item in items}
+        pairs = []
+        for item in items:
+            key = (item.exchange, str(item.id))
+            if key not in remaining:
+                continue
+            partner = self.mappings.partner(level, item.exchange, item.id)
+            partner_key = (self.other_exchange(item.exchange), partner)
+            if partner is not None and partner_key in remaining:
+                pairs.append([remaining.pop(key), remaining.pop(partner_key)])
+                self.mappings.touch(level, item.exchange, item.id)
+        return pairs, list(remaining.values())
+    
+    def link_new_groups(self, level, groups):
+        """Store groups that came out of fuzzy matching as exactly one item per exchange"""
+        for group in groups:
+            if len(group) == 2 and group[0].exchange != group[1].exchange:
+                self.link_pair(level, group[0].id, group[1].id, group[0].exchange)
+    
+    def fetch_event_markets(self, event):
+        """Get markets for one event"""
+        with self.metrics.stage('fetch'):
+            if event.exchange == 'smarkets':
+                return self.get_smarkets_markets(event)
+            return self.get_matchbook_markets(event)
+    
+    def fetch_market_odds(self, market):
+        """Get odds for one market, tagged with the market"""
+        return self.fetch_market_odds_batch([market])[market.id]
+    
+    def fetch_market_odds_batch(self, markets):
+        """Get odds tagged with their market for markets on one exchange, keyed by market ID.
+        
+        Smarkets markets are priced with batched quote requests; Matchbook
+        markets are fetched one at a time.
+        """
+        with self.metrics.stage('odds'):
+            if markets and markets[0].exchange == 'smarkets':
+                odds_by_market = self.get_smarkets_odds_bulk([market.id for market in markets])
+            else:
+                odds_by_market = {market.id: self.get_matchbook_odds(market.id) for market in markets}
+        fetched = time.time()
+        
+        for market in markets:
+            for odd in odds_by_market[market.id]:
+                odd.fetched = fetched
+                odd.market = market
+        return odds_by_market
+    
+    def get_smarkets_events(self, sport_filter=None):
+        """Get real live events from Smarkets public API"""
+        events = list(self.iter_smarkets_events(sport_filter))
+        logger.info("Smarkets: Found %d live events", len(events))
+        return events
+    
+    def iter_smarkets_events(self, sport_filter=None):
+        """Yield live Smarkets events page by page.
+        
+        Smarkets paginates with a cursor, so pages are fetched in order and
+        each page's events are yielded before the next request.
+        """
+        url = f"{self.smarkets_base_url}/events/"
+        params = {'state': 'live', 'limit': self.events_page_size}
+        
+        if sport_filter:
+            sport_ids = {
+                'tennis': 'tennis',
+                'football': 'football', 
+                'basketball': 'basketball'
+            }
+            if sport_filter in sport_ids:
+                params['sport_id'] = sport_ids[sport_filter]
+        
+        for page in range(self.max_event_pages):
+            try:
+                with self.metrics.stage('fetch'):
+                    response = self.cached_get(url, params=params, timeout=10)
+                
+                if response.status_code != 200:
+                    logger.warning("Smarkets API error: %s", response.status_code)
+                    return
+                
+                data = response.json()
+                    
+            except Exception as e:
+                logger.error("Error fetching Smarkets events: %s", e)
+                return
+            
+            for event in data.get('events', []):
+                yield Event('smarkets', event.get('id'), event.get('name'), event.get('sport_id', 'unknown'),
+                            event.get('start_datetime'))
+            
+            # next_page is a query string carrying the cursor and original filters
+            next_page = (data.get('pagination') or {}).get('next_page')
+            if not next_page or not data.get('events'):
+                return
+            url = f"{self.smarkets_base_url}/events/{next_page}"
+            params = None
+    
+    def get_smarkets_markets(self, event):
+        """Get real markets for a Smarkets event"""
+        markets = []
+        try:
+            url = f"{self.smarkets_base_url}/events/{event.id}/markets/"
+            response = self.cached_get(url, timeout=10)
+            
+            if response.status_code == 200:
+                data = response.json()
+                for market in data.get('markets', []):
+                    if market.get('state') == 'live':
+                        markets.append(Market('smarkets', market.get('id'), market.get('name'), event))
+                        
+        except Exception as e:
+            logger.error("Error fetching Smarkets markets for event %s: %s", event.id, e)
+        
+        return markets
+    
+    def get_smarkets_odds(self, market_id):
+        """Get real live odds for a Smarkets market"""
+        return self.get_smarkets_odds_bulk([market_id]).get(market_id, [])
+    
+    def get_smarkets_contracts(self, market_ids):
+        """Get contracts for many Smarkets markets, fetching only those not cached or expired.
+        
+        Contracts are cached per market rather than per request URL, since
+        the markets batched into one request differ from scan to scan; the
+        cache takes the response cache's contracts TTL and holds at most
+        max_contract_markets markets.
+        """
+        now = time.monotonic()
+        with self._contract_cache_lock:
+            missing = []
+            for market_id in market_ids:
+                entry = self._contract_cache.get(market_id)
+                if entry is None or entry[0] <= now:
+                    missing.append(market_id)
+                else:
+                    self._contract_cache.move_to_end(market_id)
+        
+        expires = now + self.response_cache.ttls.get('contracts', 0.0)
+        for start in range(0, len(missing), self.smarkets_batch_size):
+            chunk = missing[start:start + self.smarkets_batch_size]
+            try:
+                url = f"{self.smarkets_base_url}/markets/{','.join(map(str, chunk))}/contracts/"
+                # Straight to the transport: caching this URL as well would hold the contracts twice
+                response = self.transport.get(url, timeout=10)
+                
+                if response.status_code != 200:
+                    logger.warning("Smarkets contracts error: %s", response.status_code)
+                    continue
+                
+                fetched = {market_id: [] for market_id in chunk}
+                for contract in response.json().get('contracts', []):
+                    fetched.setdefault(contract.get('market_id'), []).append(
+                        (contract.get('id'), contract.get('name')))
+                with self._contract_cache_lock:
+                    for market_id, contracts in fetched.items():
+                        self._contract_cache[market_id] = (expires, contracts)
+                        self._contract_cache.move_to_end(market_id)
+                    while len(self._contract_cache) > self.max_contract_markets:
+                        self._contract_cache.popitem(last=False)
+                    
+            except Exception as e:
+                logger.error("Error fetching Smarkets contracts for markets %s: %s", chunk, e)
+        
+        with self._contract_cache_lock:
+            entries = {market_id: self._contract_cache.get(market_id) for market_id in market_ids}
+        return {market_id: entry[1] if entry else [] for market_id, entry in entries.items()}
+    
+    def forget_contracts(self, market_ids):
+        """Drop cached contracts of markets that have closed"""
+        with self._contract_cache_lock:
+            for market_id in market_ids:
+                self._contract_cache.pop(market_id, None)
+    
+    def smarkets_back_levels(self, quote):
+        """(decimal odds, available £) back levels from a Smarkets quote, best first.
+        
+        Backing takes resting offers. Prices are implied probability in basis
+        points and quantities are in 1/10000 GBP.
+        """
+        levels = []
+        for offer in quote.get('offers', []):
+            price = float(offer.get('price', 0))
+            if price > 0:
+                levels.append((10000.0 / price, float(offer.get('quantity', 0)) / 10000))
+        levels.sort(reverse=True)
+        return levels
+    
+    def get_smarkets_odds_bulk(self, market_ids):
+        """Get live odds for many Smarkets markets with batched multi-ID quote requests.
+        
+        Every contract of a market comes back in the same response, so all
+        legs of a market are priced at the same instant.
+        """
+        contracts = self.get_smarkets_contracts(market_ids)
+        odds_by_market = {market_id: [] for market_id in market_ids}
+        
+        for start in range(0, len(market_ids), self.smarkets_batch_size):
+            chunk = market_ids[start:start + self.smarkets_batch_size]
+            try:
+                url = f"{self.smarkets_base_url}/markets/{','.join(map(str, chunk))}/quotes/"
+                response = self.cached_get(url, timeout=10)
+                
+                if response.status_code != 200:
+                    logger.warning("Smarkets quotes error: %s", response.status_code)
+                    continue
+                
+                quotes = response.json()
+                for market_id in chunk:
+                    for contract_id, contract_name in contracts.get(market_id, []):
+                        levels = self.smarkets_back_levels(quotes.get(str(contract_id), {}))
+                        if not levels:
+                            continue
+                        
+                        decimal_odds, available_liquidity = levels[0]  # Best available price
+                        if decimal_odds > 1 and available_liquidity >= self.min_liquidity:
+                            odds_by_market[market_id].append(Quote(
+                                'smarkets', contract_name, contract_id, decimal_odds, available_liquidity,
+                                np.array(levels), len(contracts[market_id])))
+                            
+            except Exception as e:
+                logger.error("Error fetching Smarkets quotes for markets %s: %s", chunk, e)
+        
+        return odds_by_market
+    
+    def get_matchbook_events(self, sport_filter=None):
+        """Get real live events from Matchbook API"""
+        events = list(self.iter_matchbook_events(sport_filter))
+        logger.info("Matchbook: Found %d live events", len(events))
+        return events
+    
+    def iter_matchbook_events(self, sport_filter=None):
+        """Yield live Matchbook events from every page of the lookup.
+        
+        The first page reports the total, then the remaining offsets are
+        fetched concurrently on the Matchbook pool and yielded as each page
+        arrives.
+        """
+        if not self.matchbook_session_token:
+            if not self.matchbook_login():
+                return
+        
+        params = {'status': 'open', 'offset': 0, 'per-page': self.events_page_size}
+        
+        if sport_filter:
+            sport_ids = {
+                'tennis': 325,
+                'football': 11,
+                'basketball': 18
+            }
+            if sport_filter in sport_ids:
+                params['sport-ids'] = sport_ids[sport_filter]
+        
+        # The transport already re-logged in once on a 401, so a second one is final
+        status, data = self._get_matchbook_events_page(params, 0)
+        if status == 401:
+            logger.warning("Matchbook: Session rejected after re-login")
+            return
+        if data is None:
+            return
+        
+        yield from self._live_matchbook_events(data)
+        
+        total = data.get('total', 0)
+        offsets = range(self.events_page_size, min(total, self.max_event_pages * self.events_page_size),
+                        self.events_page_size)
+        futures = [self._submit('matchbook', self._get_matchbook_events_page, params, offset)
+                   for offset in offsets]
+        for future in as_completed(futures):
+            status, data = future.result()
+            if data is not None:
+                yield from self._live_matchbook_events(data)
+    
+    def _get_matchbook_events_page(self, params, offset):
+        """Fetch one page of Matchbook events; returns (status code, data or None)"""
+        try:
+            url = f"{self.matchbook_base_url}/lookups/events"
+            with self.metrics.stage('fetch'):
+                response = self.cached_get(url, params=dict(params, offset=offset), timeout=10)
+            
+            if response.status_code == 200:
+                return response.status_code, response.json()
+            if response.status_code != 401:
+                logger.warning("Matchbook API error: %s", response.status_code)
+            return response.status_code, None
+                    
+        except Exception as e:
+            logger.error("Error fetching Matchbook events: %s", e)
+            return None, None
+    
+    def _live_matchbook_events(self, data):
+        for event in data.get('events', []):
+            if event.get('in-running-flag'):  # Live events only
+                yield Event('matchbook', event.get('id'), event.get('name'), event.get('sport-id'), event.get('start'))
+    
+    def get_matchbook_markets(self, event):
+        """Get real markets for a Matchbook event"""
+        markets = []
+        try:
+            url = f"{self.matchbook_base_url}/events/{event.id}/markets"
+            response = self.cached_get(url, timeout=10)
+            
+            if response.status_code == 200:
+                data = response.json()
+                for market in data.get('markets', []):
+                    if market.get('status') == 'open':
+                        markets.append(Market('matchbook', market.get('id'), market.get('name'), event))
+                        
+        except Exception as e:
+            logger.error("Error fetching Matchbook markets for event %s: %s", event.id, e)
+        
+        return markets
+    
+    def get_matchbook_odds(self, market_id):
+        """Get real live odds for a Matchbook market"""
+        odds = []
+        try:
+            url = f"{self.matchbook_base_url}/markets/{market_id}/runners"
+            response = self.cached_get(url, timeout=10)
+            
+            if response.status_code == 200:
+                data = response.json()
+                open_runners = sum(1 for runner in data.get('runners', []) if runner.get('status') == 'open')
+                for runner in data.get('runners', []):
+                    if runner.get('status') == 'open':
+                        levels = self.matchbook_back_levels(runner)
+                        
+                        # Best back price with enough liquidity
+                        best_back = next((level for level in levels if level[1] >= self.min_liquidity), None)
+                        
+                        if best_back:
+                            odds.append(Quote('matchbook', runner.get('name'), runner.get('id'), best_back[0],
+                                              best_back[1], np.array(levels), open_runners))
+                                
+        except Exception as e:
+            logger.error("Error fetching Matchbook odds for market %s: %s", market_id, e)
+        
+        return odds
+    
+    def matchbook_back_levels(self, runner):
+        """(decimal odds, available £) back levels from a Matchbook runner, best first"""
+        levels = [(float(price['odds']), float(price.get('available-amount', 0)))
+                  for price in runner.get('prices', []) if price.get('side') == 'back' and price.get('odds')]
+        levels.sort(reverse=True)
+        return levels
+    
+    def group_similar_events(self, events):
+        """Group events that are likely the same across exchanges"""
+        groups, unmatched = self.pair_linked('event', events)
+        new_groups = group_events(unmatched)
+        self.link_new_groups('event', new_groups)
+        return groups + new_groups
+    
+    def events_are_similar(self, event1, event2):
+        """Check if two events are likely the same using improved matching"""
+        return tokens_are_similar(tokenize(event1.name), tokenize(event2.name))
+    
+    def clean_event_name(self, name):
+        """Clean event name for better matching"""
+        return clean_event_name(name)
+    
+    def analyze_event_group_for_arbitrage(self, event_group):
+        """Analyze a group of similar events for real arbitrage opportunities"""
+        opportunities = []
+        
+        try:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Analyzing event group: %s", [e.name for e in event_group])
+            
+            # Get markets for each event in the group
+            all_markets = []
+            for event in event_group:
+                all_markets.extend(self.fetch_event_markets(event))
+            
+            logger.debug("Found %d markets across exchanges", len(all_markets))
+            
+            # Group markets by type
+            market_groups = self.group_similar_markets(all_markets)
+            logger.debug("Grouped into %d market type groups", len(market_groups))
+            
+            # Analyze each market group for arbitrage
+            for market_group in market_groups:
+                if len(market_group) >= 2:
+                    # Must have markets from different exchanges
+                    exchanges = {market.exchange for market in market_group}
+                    if len(exchanges) > 1:
+                        arb_opps = self.find_arbitrage_in_market_group(market_group)
+                        opportunities.extend(arb_opps)
+                    
+        except Exception as e:
+            logger.error("Error analyzing event group: %s", e)
+        
+        return opportunities
+    
+    def group_similar_markets(self, markets):
+        """Group markets that are the same type across exchanges"""
+        known_groups, markets = self.pair_linked('market', markets)
+        groups = group_markets(markets)
+        self.link_new_groups('market', groups)
+        return known_groups + groups
+    
+    def markets_are_similar(self, market1, market2):
+        """Check if two markets are the same canonical type, line and period"""
+        return classify_market(market1.name, market1.event.sport) == classify_market(market2.name, market2.event.sport)
+    
+    def find_arbitrage_in_market_group(self, market_group):
+        """Find real arbitrage opportunities within a market group"""
+        opportunities = []
+        
+        try:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Analyzing market group: %s", [m.name for m in market_group])
+            
+            # Get real odds for all markets in the group
+            all_odds = []
+            for market in market_group:
+                all_odds.extend(self.fetch_market_odds(market))
+            
+            logger.debug("Found %d odds across markets", len(all_odds))
+            
+            if len(all_odds) >= 2:
+                # Calculate real arbitrage opportunities
+                arb_opps = self.calculate_real_arbitrage(all_odds)
+                opportunities.extend(arb_opps)
+            
+        except Exception as e:
+            logger.error("Error finding arbitrage in market group: %s", e)
+        
+        return opportunities
+    
+    def calculate_real_arbitrage(self, odds_list, markets=None, key=None):
+        """Calculate real arbitrage opportunities from live odds.
+        
+        The odds replace the price book's quotes for their market group:
+        key (sorted (exchange, market ID) pairs), else markets, else the
+        markets the odds are tagged with.
+        """
+        opportunities = []
+        start = time.perf_counter()
+        
+        try:
+            outcome_groups = self.group_outcomes(odds_list)
+            # Hot path: the outcome list is only built when debug output is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Grouped odds into %d outcomes: %s", len(outcome_groups), list(outcome_groups))
+            
+            first = odds_list[0].market
+            if key is None:
+                if markets is None:
+                    markets = {odd.market.key for odd in odds_list}
+                else:
+                    markets = {market.key for market in markets}
+                key = tuple(sorted(markets))
+            opportunity = self.price_book.update_market(
+                key,
+                [(outcome, odd.exchange, odd.selection, odd.odds, odd.available, odd.ladder)
+                 for outcome, group in outcome_groups.items() for odd in group],
+                info={
+                    'event_name': first.event.name,
+                    'market_name': first.name,
+                    'sport': first.event.sport,
+                    'event_time': 'Live'
+                },
+                outcome_count=max(odd.outcomes for odd in odds_list),
+                snapshot_exchanges={exchange for exchange, _ in key})
+            if opportunity:
+                opportunities.append(opportunity)
+                # Age of the oldest quote the opportunity was found on
+                now = time.time()
+                self.metrics.observe_opportunity(now - min(odd.fetched or now for odd in odds_list))
+                logger.info("REAL ARBITRAGE FOUND: %.2f%% profit across %d outcomes on %s",
+                            opportunity['profit_margin'], opportunity['outcomes'], opportunity['event_name'])
+            
+        except Exception as e:
+            logger.error("Error calculating real arbitrage: %s", e)
+        
+        self.metrics.observe_stage('arbitrage', time.perf_counter() - start)
+        return opportunities
+    
+    def group_outcomes(self, odds_list):
+        """Group odds by selection/outcome, storing newly confirmed selection pairs"""
+        outcome_groups = {}
+        unlinked = set()
+        for odd in odds_list:
+            selection = self.mappings.outcome_key(odd.exchange, odd.selection_id)
+            if selection is None:
+                # Normalize selection names for better matching
+                selection = self.normalize_selection_name(odd.selection)
+                unlinked.add(selection)
+            if selection not in outcome_groups:
+                outcome_groups[selection] = []
+            outcome_groups[selection].append(odd)
+        
+        # One price per exchange under a name-matched outcome confirms the selection pair
+        for selection in unlinked:
+            group = outcome_groups[selection]
+            if len(group) == 2 and group[0].exchange != group[1].exchange:
+                self.link_pair('selection', group[0].selection_id, group[1].selection_id,
+                               group[0].exchange, outcome_key=selection)
+        return outcome_groups
+    
+    def normalize_selection_name(self, selection):
+        """Normalize selection names for better matching"""
+        import re
+        # Convert to lowercase and remove common variations
+        selection = selection.lower().strip()
+        # Remove titles, initials, etc.
+        selection = re.sub(r'\b[a-z]\.\s*', '', selection)  # Remove initials like "N. "
+        selection = re.sub(r'\s+', ' ', selection)  # Normalize whitespace
+        return selection
@@ -0,0 +1,185 @@
+import numpy as np
+
+
+def reduce_best_prices(outcome_groups, min_liquidity=0):
+    """Best back price per (outcome, exchange) in one pass over the odds.
+
+    Returns (outcomes, exchanges, odds, records): odds is an (outcomes,
+    exchanges) array with 0 where an exchange has no usable price, and
+    records holds the Quote behind each best price.
+    """
+    outcomes = list(outcome_groups)
+    exchanges = sorted({odd.exchange for odds in outcome_groups.values() for odd in odds})
+    columns = {exchange: j for j, exchange in enumerate(exchanges)}
+
+    odds = np.zeros((len(outcomes), len(exchanges)))
+    records = np.empty(odds.shape, dtype=object)
+    for i, outcome in enumerate(outcomes):
+        for odd in outcome_groups[outcome]:
+            price = float(odd.odds)
+            j = columns[odd.exchange]
+            if price > odds[i, j] and odd.available >= min_liquidity:
+                odds[i, j] = price
+                records[i, j] = odd
+    return outcomes, exchanges, odds, records
+
+
+def best_combination(odds):
+    """Exchange column per outcome minimising the summed implied probability.
+
+    A combination must span at least two exchanges, so when every best price
+    sits on one exchange the outcome that is cheapest to move elsewhere is
+    switched. Returns (choice, implied) with the chosen implied probability
+    per outcome (inf where an outcome has no price).
+    """
+    with np.errstate(divide='ignore'):
+        implied = np.where(odds > 1, 1.0 / odds, np.inf)
+    rows = np.arange(len(odds))
+    choice = implied.argmin(axis=1)
+
+    if implied.shape[1] > 1 and (choice == choice[0]).all():
+        elsewhere = implied.copy()
+        elsewhere[:, choice[0]] = np.inf
+        alternative = elsewhere.argmin(axis=1)
+        # inf - inf is nan for an outcome with no price anywhere; the sum is inf either way
+        with np.errstate(invalid='ignore'):
+            switch = np.argmin(elsewhere[rows, alternative] - implied[rows, choice])
+        choice[switch] = alternative[switch]
+
+    return choice, implied[rows, choice]
+
+
+def ladder(record):
+    """(levels, 2) array of [decimal odds, available stake] for a Quote, best first"""
+    levels = record.ladder
+    if levels is None:
+        levels = np.array([[float(record.odds), float(record.available)]])
+    return levels[levels[:, 1] > 0]
+
+
+def size_stakes(ladders, rates, max_stake=None):
+    """Most profitable executable stakes when backing every leg down its ladder.
+
+    Every leg is staked to pay the same net return R after commission. Each
+    level adds return capacity at its own net odds, so between breakpoints
+    (R values where some leg exhausts a level) profit grows at the constant
+    marginal rate 1 - sum(1 / net odds of each leg's current level). Levels
+    only get worse, so the walk stops at the first breakpoint after which
+    the marginal rate is no longer positive, when any leg runs out of depth,
+    or when the total stake reaches max_stake.
+
+    Returns (stakes, gross returns, net return R) with one entry per leg.
+    """
+    returns_at = []   # cumulative net return at the end of each level, per leg
+    stakes_at = []
+    gross_at = []
+    for levels, rate in zip(ladders, rates):
+        net_odds = 1 + (levels[:, 0] - 1) * (1 - rate)
+        returns_at.append(np.concatenate([[0.0], np.cumsum(levels[:, 1] * net_odds)]))
+        stakes_at.append(np.concatenate([[0.0], np.cumsum(levels[:, 1])]))
+        gross_at.append(np.concatenate([[0.0], np.cumsum(levels[:, 1] * levels[:, 0])]))
+
+    depth = min(points[-1] for points in returns_at)
+    breakpoints = np.unique(np.concatenate(returns_at))
+    breakpoints = breakpoints[(breakpoints > 0) & (breakpoints <= depth)]
+    if not len(breakpoints):
+        return np.zeros(len(ladders)), np.zeros(len(ladders)), 0.0
+
+    # Marginal profit per unit of R on each segment [start, breakpoint)
+    starts = np.concatenate([[0.0], breakpoints[:-1]])
+    cost_rate = np.zeros(len(starts))
+    for returns, stakes in zip(returns_at, stakes_at):
+        level = np.searchsorted(returns, starts, side='right') - 1
+        cost_rate += np.diff(stakes)[level] / np.diff(returns)[level]
+    profitable = 1 - cost_rate > 0
+    segments = len(profitable) if profitable.all() else int(np.argmin(profitable))
+    if not segments:
+        return np.zeros(len(ladders)), np.zeros(len(ladders)), 0.0
+    net_return = breakpoints[segments - 1]
+
+    if max_stake is not None:
+        points = np.concatenate([[0.0], breakpoints[:segments]])
+        total = sum(np.interp(points, returns, stakes) for returns, stakes in zip(returns_at, stakes_at))
+        if total[-1] > max_stake:
+            net_return = float(np.interp(max_stake, total, points))
+
+    stakes = np.array([np.interp(net_return, returns, stakes) for returns, stakes in zip(returns_at, stakes_at)])
+    gross = np.array([np.interp(net_return, returns, gross) for returns, gross in zip(returns_at, gross_at)])
+    return stakes, gross, float(net_return)
+
+
+def best_implied_prob(outcome_groups, min_liquidity=0):
+    """Summed implied probability of the best cross-exchange combination (inf if none)"""
+    outcomes, exchanges, odds, records = reduce_best_prices(outcome_groups, min_liquidity)
+    if len(outcomes) < 2 or len(exchanges) < 2:
+        return float('inf')
+    return float(best_combination(odds)[1].sum())
+
+
+def find_arbitrage(outcome_groups, commission=None, max_stake=1000, max_implied_prob=0.98,
+                   min_liquidity=0, outcome_count=None):
+    """Optimal cross-exchange back-all-outcomes arbitrage for one market, or None.
+
+    outcome_groups maps an outcome key to its Quotes (see records) from every
+    exchange; any number of outcomes is supported. outcome_count is the
+    number of outcomes the market really has, so a book missing a priced
+    outcome is never reported.
+    """
+    outcomes, exchanges, odds, records = reduce_best_prices(outcome_groups, min_liquidity)
+    if outcome_count is not None and len(outcomes) < outcome_count:
+        return None
+    return evaluate_prices(odds, exchanges, lambda i, j: (records[i, j].selection, ladder(records[i, j])),
+                           commission, max_stake, max_implied_prob)
+
+
+def evaluate_prices(odds, exchanges, leg, commission=None, max_stake=1000, max_implied_prob=0.98):
+    """Arbitrage for an (outcomes, exchanges) array of best prices, or None.
+
+    leg(i, j) returns (selection name, ladder) for outcome i on exchange j.
+    Stakes are sized down each chosen leg's price ladder (see size_stakes),
+    up to max_stake in total (None for the full profitable depth), with
+    commission a fraction per exchange charged on the winning leg's
+    winnings.
+    """
+    commission = commission or {}
+    if odds.shape[0] < 2 or odds.shape[1] < 2:
+        return None
+
+    choice, implied = best_combination(odds)
+    total_implied_prob = implied.sum()
+    if not np.isfinite(total_implied_prob) or total_implied_prob >= max_implied_prob:
+        return None
+
+    chosen = [leg(i, j) for i, j in enumerate(choice)]
+    ladders = [levels for _, levels in chosen]
+    rates = [commission.get(exchanges[j], 0.0) for j in choice]
+
+    stakes, gross, net_return = size_stakes(ladders, rates, max_stake)
+    total_stake = stakes.sum()
+    net_profit = net_return - total_stake
+    if total_stake <= 0 or net_profit <= 0:
+        return None
+    max_profitable_stake = total_stake if max_stake is None else size_stakes(ladders, rates)[0].sum()
+
+    legs = []
+    for i, (selection, levels) in enumerate(chosen):
+        legs.append({
+            'selection': selection,
+            'exchange': exchanges[choice[i]],
+            'odds': round(float(odds[i, choice[i]]), 2),
+            'vwap_odds': round(float(gross[i] / stakes[i]), 3),
+            'stake': round(float(stakes[i]), 2),
+            'liquidity': round(float(levels[:, 1].sum()), 2),
+            'return': round(float(gross[i]), 2)
+        })
+
+    return {
+        'outcomes': len(odds),
+        'total_implied_prob': round(float(total_implied_prob), 4),
+        'profit_margin': round(float(1.0 - total_implied_prob) * 100, 2),
+        'roi': round(float(net_profit / total_stake) * 100, 2),
+        'legs': legs,
+        'total_stake': round(float(total_stake), 2),
+        'max_profitable_stake': round(float(max_profitable_stake), 2),
+        'guaranteed_profit': round(float(net_profit), 2)
+    }
@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from bs_pricer import BinomialModel, black_scholes_vectorized, greeks_vectorized
+
+# Contracts used for accuracy runs: (S, K, r, sigma, T, q, option_type)
+ACCURACY_CONTRACTS = [
+    (100.0, 100.0, 0.05, 0.20, 0.25, 0.02, 'Call'),
+    (100.0, 100.0, 0.05, 0.20, 0.25, 0.02, 'Put'),
+    (100.0, 80.0, 0.05, 0.30, 1.00, 0.00, 'Call'),
+    (100.0, 120.0, 0.05, 0.30, 1.00, 0.00, 'Put'),
+    (50.0, 60.0, 0.08, 0.40, 0.50, 0.03, 'Put'),
+    (150.0, 140.0, 0.03, 0.15, 2.00, 0.04, 'Call'),
+]
+LATTICE_FAMILIES = ['crr']   # BinomialModel builds a Cox-Ross-Rubinstein lattice
+REFERENCE_STEPS = 5000
+
+# Which direction is an improvement for each metric group
+METRIC_DIRECTION = {'latency': 'lower', 'throughput': 'higher', 'error': 'lower', 'memory': 'lower',
+                    'startup': 'lower'}
+
+# Modules that must not be pulled in by importing the pricing core
+HEAVY_MODULES = ('tkinter', 'matplotlib', 'scipy', 'yfinance', 'pandas')
+
+STARTUP_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+{first_use}
+done = time.perf_counter()
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{'import': imported - start, 'first_use': done - start, 'heavy': heavy}}))
+'''
+
+
+def _time_call(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _reference_price(S, K, r, sigma, T, q, option_type, american, steps=REFERENCE_STEPS):
+    """High-resolution CRR price with NumPy backward induction."""
+    dt = T / steps
+    u = np.exp(sigma * np.sqrt(dt))
+    d = 1 / u
+    p = (np.exp((r - q) * dt) - d) / (u - d)
+    discount = np.exp(-r * dt)
+    sign = 1.0 if option_type == 'Call' else -1.0
+
+    j = np.arange(steps + 1)
+    values = np.maximum(sign * (S * u**j * d**(steps - j) - K), 0.0)
+    for i in range(steps - 1, -1, -1):
+        values = discount * (p * values[1:i + 2] + (1 - p) * values[:i + 1])
+        if american:
+            j = np.arange(i + 1)
+            values = np.maximum(values, sign * (S * u**j * d**(i - j) - K))
+    return float(values[0])
+
+
+def bench_latency(steps_list, repeats):
+    S, K, r, sigma, T, q, option_type = ACCURACY_CONTRACTS[1]
+    metrics = {}
+    for steps in steps_list:
+        model = BinomialModel(S, K, r, sigma, T, q, steps)
+        metrics[f'latency.binomial_american.steps={steps}'] = _time_call(
+            lambda: model.price_american_option(option_type), repeats)
+        metrics[f'latency.binomial_european.steps={steps}'] = _time_call(
+            lambda: model._price_european_option(option_type), repeats)
+    metrics['latency.black_scholes.single'] = _time_call(
+        lambda: black_scholes_vectorized(S, K, r, sigma, T, q, option_type == 'Call'), max(repeats, 50))
+    return metrics
+
+
+def _random_batch(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(50, 150, size), rng.uniform(50, 150, size), np.full(size, 0.05),
+            rng.uniform(0.1, 0.6, size), rng.uniform(0.05, 2.0, size), np.full(size, 0.01),
+            rng.random(size) < 0.5)
+
+
+def bench_throughput(batch_sizes, binomial_batch_sizes, repeats):
+    metrics = {}
+    for size in batch_sizes:
+        batch = _random_batch(size)
+        for name, engine in (('black_scholes', black_scholes_vectorized), ('greeks', greeks_vectorized)):
+            elapsed = _time_call(lambda: engine(*batch), repeats)
+            metrics[f'throughput.{name}.batch={size}'] = size / elapsed
+
+    for size in binomial_batch_sizes:
+        S, K, r, sigma, T, q, is_call = _random_batch(size, seed=1)
+
+        def run():
+            for i in range(size):
+                BinomialModel(S[i], K[i], r[i], sigma[i], T[i], q[i], 100).price_american_option(
+                    'Call' if is_call[i] else 'Put')
+
+        elapsed = _time_call(run, max(1, repeats // 2))
+        metrics[f'throughput.binomial_american.steps=100.batch={size}'] = size / elapsed
+    return metrics
+
+
+def bench_accuracy(steps_list):
+    metrics = {}
+    references = {}
+    for contract in ACCURACY_CONTRACTS:
+        references[contract] = {
+            'european': float(black_scholes_vectorized(*contract[:6], contract[6] == 'Call')),
+            'american': _reference_price(*contract, american=True)
+        }
+
+    for family in LATTICE_FAMILIES:
+        for steps in steps_list:
+            errors = {'european': [], 'american': []}
+            for contract in ACCURACY_CONTRACTS:
+                result = BinomialModel(*contract[:6], steps).price_american_option(contract[6])
+                errors['european'].append(abs(result['european_price'] - references[contract]['european']))
+                errors['american'].append(abs(result['american_price'] - references[contract]['american']))
+
+            for style, values in errors.items():
+                metrics[f'error.binomial_{style}.{family}.steps={steps}.max_abs'] = max(values)
+                metrics[f'error.binomial_{style}.{family}.steps={steps}.rmse'] = float(
+                    np.sqrt(np.mean(np.square(values))))
+    return metrics
+
+
+def _peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_memory(steps_list, batch_size):
+    S, K, r, sigma, T, q, option_type = ACCURACY_CONTRACTS[1]
+    metrics = {}
+    for steps in steps_list:
+        metrics[f'memory.binomial_american.steps={steps}'] = _peak_memory(
+            lambda: BinomialModel(S, K, r, sigma, T, q, steps).price_american_option(option_type))
+
+    batch = _random_batch(batch_size)
+    metrics[f'memory.black_scholes.batch={batch_size}'] = _peak_memory(lambda: black_scholes_vectorized(*batch))
+    metrics[f'memory.greeks.batch={batch_size}'] = _peak_memory(lambda: greeks_vectorized(*batch))
+    return metrics
+
+
+def bench_startup(repeats):
+    """Cold import cost of the pricing modules, each in a fresh interpreter."""
+    probes = {
+        'bs_pricer': 'bs_pricer.BinomialModel(100, 100, 0.05, 0.2, 0.25, 0.02, 50).price_american_option()',
+        'portfolio': 'portfolio.Portfolio({"X": 100}).greeks()',
+    }
+    here = os.path.dirname(os.path.abspath(__file__))
+    metrics = {}
+    for module, first_use in probes.items():
+        code = STARTUP_PROBE.format(module=module, first_use=first_use,
+                                    heavy=HEAVY_MODULES)
+        runs = []
+        for _ in range(repeats):
+            output = subprocess.run([sys.executable, '-c', code], cwd=here, check=True,
+                                    capture_output=True, text=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+
+        metrics[f'startup.import.{module}'] = statistics.median(run['import'] for run in runs)
+        metrics[f'startup.first_use.{module}'] = statistics.median(run['first_use'] for run in runs)
+        metrics[f'startup.heavy_modules.{module}'] = len(runs[-1]['heavy'])
+        if runs[-1]['heavy']:
+            print(f"{module} import loaded heavy modules: {', '.join(runs[-1]['heavy'])}", file=sys.stderr)
+    return metrics
+
+
+def run_benchmarks(quick=False):
+    steps_list = [25, 50, 100] if quick else [25, 50, 100, 200, 300]
+    repeats = 3 if quick else 7
+    batch_sizes = [100, 10_000] if quick else [1, 100, 10_000, 100_000, 1_000_000]
+    binomial_batch_sizes = [5] if quick else [10, 50]
+
+    metrics = {}
+    for name, run in (
+        ('startup', lambda: bench_startup(repeats)),
+        ('latency', lambda: bench_latency(steps_list, repeats)),
+        ('throughput', lambda: bench_throughput(batch_sizes, binomial_batch_sizes, repeats)),
+        ('accuracy', lambda: bench_accuracy(steps_list)),
+        ('memory', lambda: bench_memory(steps_list, batch_sizes[-1])),
+    ):
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        metrics.update(run())
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'quick': quick,
+            'reference_steps': REFERENCE_STEPS
+        },
+        'metrics': metrics
+    }
+
+
+def compare_results(baseline, current, tolerance, accuracy_tolerance):
+    """Return (regressions, improvements) between two result documents."""
+    regressions = []
+    improvements = []
+    for key, new in sorted(current['metrics'].items()):
+        old = baseline['metrics'].get(key)
+        if old is None:
+            continue
+        group = key.split('.', 1)[0]
+        tol = accuracy_tolerance if group == 'error' else tolerance
+        floor = 1e-12 if group == 'error' else 0.0
+
+        if METRIC_DIRECTION[group] == 'lower':
+            worse = new > old * (1 + tol) + floor
+            better = new < old * (1 - tol) - floor
+        else:
+            worse = new < old * (1 - tol)
+            better = new > old * (1 + tol)
+
+        change = (new - old) / old if old else float('inf') if new else 0.0
+        entry = {'metric': key, 'baseline': old, 'current': new, 'change': change}
+        if worse:
+            regressions.append(entry)
+        elif better:
+            improvements.append(entry)
+    return regressions, improvements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pricing-engine speed, accuracy and memory benchmarks")
+    parser.add_argument('--output', '-o', help="Write JSON results to this file (default: stdout)")
+    parser.add_argument('--quick', action='store_true', help="Smaller grids for a fast smoke run")
+    parser.add_argument('--compare', metavar='BASELINE', help="Baseline JSON to check for regressions")
+    parser.add_argument('--current', metavar='RESULTS',
+                        help="Compare an existing results file instead of running the suite")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="Allowed relative slowdown/memory growth before flagging (default 0.10)")
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.01,
+                        help="Allowed relative error growth before flagging (default 0.01)")
+    args = parser.parse_args()
+
+    if args.current:
+        with open(args.current) as f:
+            results = json.load(f)
+    else:
+        results = run_benchmarks(quick=args.quick)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    elif not args.compare:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions, improvements = compare_results(baseline, results, args.tolerance, args.accuracy_tolerance)
+        json.dump({'regressions': regressions, 'improvements': improvements}, sys.stdout, indent=2)
+        print()
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.compare}", file=sys.stderr)
+            sys.exit(1)
+        print(f"No regressions against {args.compare}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
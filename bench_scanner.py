@@ -0,0 +1,317 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+from collections import deque
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from arb_scanner import SmarketsMatchbookScanner
+from exchange_simulator import ExchangeSimulator
+from scan_logging import configure_logging
+
+SPORTS = ('tennis', 'football', 'basketball')
+
+
+def _market_filters(sports):
+    return {sport: sport in sports for sport in SPORTS}
+
+
+def record(capture, sports, username, password):
+    """Run one live scan, writing all exchange traffic to capture"""
+    scanner = SmarketsMatchbookScanner()
+    scanner.matchbook_username = username
+    scanner.matchbook_password = password
+    scanner.record_traffic(capture)
+    try:
+        opportunities = scanner.find_real_arbitrage_opportunities(_market_filters(sports))
+    finally:
+        scanner.close()
+    print(f"Recorded {scanner.session.records} requests and {len(opportunities)} opportunities to {capture}",
+          file=sys.stderr)
+
+
+def bench_replay(capture, sports, speed, repeats):
+    """End-to-end scans served from a capture, each with a fresh scanner and no stored mappings"""
+    timings = []
+    for _ in range(repeats):
+        scanner = SmarketsMatchbookScanner(mappings_path=':memory:')
+        scanner.matchbook_username = 'replay'   # The login response comes from the capture
+        scanner.matchbook_password = 'replay'
+        scanner.replay_traffic(capture, speed)
+        try:
+            start = time.perf_counter()
+            opportunities = scanner.find_real_arbitrage_opportunities(_market_filters(sports))
+            timings.append(time.perf_counter() - start)
+        finally:
+            scanner.close()
+
+    replayer = scanner.session
+    return {
+        'latency.scan.median': statistics.median(timings),
+        'latency.scan.min': min(timings),
+        'throughput.requests_per_second': replayer.served / timings[-1] if timings[-1] else 0.0,
+        'count.recorded_requests': len(replayer),
+        'count.served_requests': replayer.served,
+        'count.missed_requests': replayer.misses,
+        'count.markets': len(scanner.price_book),
+        'count.links': len(scanner.mappings),
+        'count.opportunities': len(opportunities),
+    }
+
+
+def _matching_scores(scanner, simulator):
+    """(recall, precision) of the scanner's stored event links against the true pairs"""
+    pairs = simulator.event_pairs()
+    linked = {smarkets_id: scanner.mappings.partner('event', 'smarkets', smarkets_id) for smarkets_id in pairs}
+    linked = {smarkets_id: partner for smarkets_id, partner in linked.items() if partner is not None}
+    correct = sum(1 for smarkets_id, partner in linked.items() if str(partner) == str(pairs[smarkets_id]))
+    return correct / len(pairs) if pairs else 0.0, correct / len(linked) if linked else 0.0
+
+
+def bench_load(sports, events, scans, duration, latency, error_rate, perturbation, arbitrage_rate,
+               rate_limits=False, seed=0):
+    """Full and continuous scans against a local simulated exchange.
+
+    Full scans (the first cold, the rest reusing stored links) give scan
+    time, scans per minute and matching recall. The simulator's clock is
+    then restarted so its injected arbitrages open during a continuous run
+    of duration seconds; each is detected when the price book first reports
+    an opportunity on its market while the window is open.
+    """
+    simulator = ExchangeSimulator(events, sports=sports, perturbation=perturbation, latency=latency,
+                                  error_rate=error_rate, arbitrage_rate=arbitrage_rate,
+                                  arbitrage_start=(0.1 * duration, 0.6 * duration),
+                                  arbitrage_duration=0.3 * duration, seed=seed)
+    server = simulator.start()
+    scanner = SmarketsMatchbookScanner(mappings_path=':memory:')
+    scanner.matchbook_username = 'load'
+    scanner.matchbook_password = 'load'
+    scanner.use_endpoints(*simulator.base_urls(server))
+    if not rate_limits:
+        scanner.transport.disable_rate_limits()
+    market_filters = _market_filters(sports)
+    metrics = {}
+
+    try:
+        timings = []
+        for _ in range(scans):
+            start = time.perf_counter()
+            scanner.find_real_arbitrage_opportunities(market_filters)
+            timings.append(time.perf_counter() - start)
+            if len(timings) == 1:
+                recall, precision = _matching_scores(scanner, simulator)
+        warm = timings[1:] or timings
+        metrics.update({
+            'latency.scan.cold': timings[0],
+            'latency.scan.warm_median': statistics.median(warm),
+            'throughput.scans_per_minute': 60.0 / statistics.median(warm),
+            'matching.recall': recall,
+            'matching.precision': precision,
+        })
+
+        simulator.reset_clock()
+        windows = simulator.arbitrage_windows()
+        by_market = {}
+        for window in windows:
+            by_market[(window['smarkets_event'], window['smarkets_market'])] = window
+            by_market[(window['matchbook_event'], window['matchbook_market'])] = window
+        detected = {}   # Smarkets market ID -> seconds from window opening to first report
+        spurious = []
+
+        def on_opportunity(opportunity):
+            now = time.time()
+            window = by_market.get((opportunity['event_name'], opportunity['market_name']))
+            if window is None:
+                spurious.append(opportunity)
+            elif window['start'] <= now <= window['end']:
+                detected.setdefault(window['smarkets_market_id'], now - window['start'])
+
+        cycles = []
+        stop_event = threading.Event()
+        scanner.price_book.on_opportunity = on_opportunity
+        timer = threading.Timer(duration, stop_event.set)
+        timer.start()
+        start = time.perf_counter()
+        scanner.run_continuous(market_filters, stop_event, lambda opportunities, stats: cycles.append(stats))
+        elapsed = time.perf_counter() - start
+        timer.cancel()
+
+        latencies = sorted(detected.values())
+        metrics.update({
+            'throughput.cycles_per_minute': 60.0 * len(cycles) / elapsed,
+            'detection.latency_median': statistics.median(latencies) if latencies else None,
+            'detection.latency_p90': latencies[int(0.9 * (len(latencies) - 1))] if latencies else None,
+            'detection.latency_max': latencies[-1] if latencies else None,
+            'detection.recall': len(detected) / len(windows) if windows else 0.0,
+            'count.events': sum(len(sport_events) for sport_events in simulator.events.values()),
+            'count.markets': len(simulator.smarkets_markets),
+            'count.arbitrages': len(windows),
+            'count.spurious_opportunities': len(spurious),
+            'count.simulator_requests': simulator.requests,
+            'count.transport_retries': scanner.transport.retries,
+        })
+    finally:
+        scanner.close()
+        server.shutdown()
+    return metrics
+
+
+def _deep_size(*roots):
+    """Bytes reachable from roots, counting each object once (so shared and interned strings count once)"""
+    seen = set()
+    pending = deque(roots)
+    size = 0
+    while pending:
+        obj = pending.popleft()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            pending.extend(obj)
+        elif isinstance(obj, np.ndarray):
+            if obj.base is not None:
+                pending.append(obj.base)
+            if obj.dtype.names:
+                for name in obj.dtype.names:
+                    if obj.dtype[name].hasobject:
+                        pending.extend(obj[name].ravel().tolist())
+            elif obj.dtype.hasobject:
+                pending.extend(obj.ravel().tolist())
+        elif not isinstance(obj, (str, bytes, int, float, bool, type(None))):
+            pending.extend(getattr(obj, name) for cls in type(obj).__mro__
+                           for name in getattr(cls, '__slots__', ()) if hasattr(obj, name))
+            pending.extend(getattr(obj, '__dict__', {}).values())
+    return size
+
+
+def bench_memory(sports, events, seed=0):
+    """Memory held per tracked market after one discovery scan of a simulated exchange.
+
+    Counts everything reachable from the continuous scan's watch list and
+    the price book: market records, quotes, price ladders and opportunities.
+    """
+    simulator = ExchangeSimulator(events, sports=sports, latency=0.0, error_rate=0.0, seed=seed)
+    server = simulator.start()
+    scanner = SmarketsMatchbookScanner(mappings_path=':memory:')
+    scanner.matchbook_username = 'memory'
+    scanner.matchbook_password = 'memory'
+    scanner.use_endpoints(*simulator.base_urls(server))
+    scanner.transport.disable_rate_limits()
+    try:
+        scanner.configure_price_book()
+        watch = {}
+        start = time.perf_counter()
+        scanner.find_real_arbitrage_opportunities(_market_filters(sports), watch=watch)
+        elapsed = time.perf_counter() - start
+        markets = len(watch)
+        watch_bytes = _deep_size(watch)
+        book_bytes = _deep_size(scanner.price_book.markets)
+        total_bytes = _deep_size(watch, scanner.price_book.markets)
+    finally:
+        scanner.close()
+        server.shutdown()
+    return {
+        'memory.per_market.total': total_bytes / markets if markets else 0.0,
+        'memory.per_market.watch': watch_bytes / markets if markets else 0.0,
+        'memory.per_market.price_book': book_bytes / markets if markets else 0.0,
+        'memory.total_mb': total_bytes / 1e6,
+        'latency.scan.cold': elapsed,
+        'count.markets': markets,
+        'count.quotes': scanner.price_book.updates,
+    }
+
+
+def _write_results(results, output):
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record exchange traffic and benchmark the scanner against it")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = commands.add_parser('record', help="Capture one live scan's traffic")
+    record_parser.add_argument('capture', help="Gzipped JSONL file to append to")
+    record_parser.add_argument('--sports', nargs='+', choices=SPORTS, default=list(SPORTS))
+    record_parser.add_argument('--username', default=os.environ.get('MATCHBOOK_USERNAME', ''),
+                               help="Matchbook username (default: $MATCHBOOK_USERNAME)")
+    record_parser.add_argument('--password', default=os.environ.get('MATCHBOOK_PASSWORD', ''),
+                               help="Matchbook password (default: $MATCHBOOK_PASSWORD)")
+
+    replay_parser = commands.add_parser('replay', help="Benchmark scans served from a capture")
+    replay_parser.add_argument('capture', help="Capture written by the record command")
+    replay_parser.add_argument('--sports', nargs='+', choices=SPORTS, default=list(SPORTS))
+    replay_parser.add_argument('--speed', type=float, default=0.0,
+                               help="1 replays at recorded speed, 10 ten times faster, 0 (default) without waiting")
+    replay_parser.add_argument('--repeats', type=int, default=3)
+    replay_parser.add_argument('--output', '-o', help="Write JSON results to this file (default: stdout)")
+
+    load_parser = commands.add_parser('load', help="Benchmark against a local simulated exchange")
+    load_parser.add_argument('--sports', nargs='+', choices=SPORTS, default=list(SPORTS))
+    load_parser.add_argument('--events', type=int, default=300, help="Live events per sport (default 300)")
+    load_parser.add_argument('--scans', type=int, default=3, help="Full scans before the continuous run")
+    load_parser.add_argument('--duration', type=float, default=120.0, help="Seconds of continuous scanning")
+    load_parser.add_argument('--latency', type=float, default=0.02, help="Mean simulated seconds per request")
+    load_parser.add_argument('--error-rate', type=float, default=0.01)
+    load_parser.add_argument('--perturbation', type=float, default=0.3,
+                             help="Fraction of Matchbook event names that differ from Smarkets")
+    load_parser.add_argument('--arbitrage-rate', type=float, default=0.05,
+                             help="Fraction of markets given an arbitrage window")
+    load_parser.add_argument('--rate-limits', action='store_true',
+                             help="Keep the exchanges' rate limits (off by default to measure the scanner)")
+    load_parser.add_argument('--seed', type=int, default=0)
+    load_parser.add_argument('--output', '-o', help="Write JSON results to this file (default: stdout)")
+
+    memory_parser = commands.add_parser('memory', help="Measure memory per tracked market on a simulated exchange")
+    memory_parser.add_argument('--sports', nargs='+', choices=SPORTS, default=list(SPORTS))
+    memory_parser.add_argument('--events', type=int, default=300, help="Live events per sport (default 300)")
+    memory_parser.add_argument('--seed', type=int, default=0)
+    memory_parser.add_argument('--output', '-o', help="Write JSON results to this file (default: stdout)")
+
+    for command_parser in (record_parser, replay_parser, load_parser, memory_parser):
+        command_parser.add_argument('--verbose', '-v', action='store_true',
+                                    help="Show the scanner's progress messages on stderr")
+    args = parser.parse_args()
+    configure_logging('INFO' if args.verbose else 'WARNING')
+
+    meta = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+    }
+    if args.command == 'record':
+        record(args.capture, args.sports, args.username, args.password)
+    elif args.command == 'replay':
+        meta.update(capture=os.path.basename(args.capture), speed=args.speed, repeats=args.repeats)
+        metrics = bench_replay(args.capture, args.sports, args.speed, args.repeats)
+        _write_results({'meta': meta, 'metrics': metrics}, args.output)
+    elif args.command == 'memory':
+        meta.update(sports=args.sports, events=args.events, seed=args.seed)
+        metrics = bench_memory(args.sports, args.events, args.seed)
+        _write_results({'meta': meta, 'metrics': metrics}, args.output)
+    else:
+        meta.update({key: getattr(args, key) for key in (
+            'sports', 'events', 'scans', 'duration', 'latency', 'error_rate', 'perturbation',
+            'arbitrage_rate', 'rate_limits', 'seed')})
+        metrics = bench_load(args.sports, args.events, max(args.scans, 1), args.duration, args.latency,
+                             args.error_rate, args.perturbation, args.arbitrage_rate, args.rate_limits,
+                             args.seed)
+        _write_results({'meta': meta, 'metrics': metrics}, args.output)
+
+if __name__ == "__main__":
+    main()
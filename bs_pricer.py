@@ -1,14 +1,144 @@
-import tkinter as tk
-from tkinter import ttk
+import importlib
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-from scipy.stats import norm
-import yfinance as yf
 from datetime import datetime
 import threading
 import time
+import cProfile
+import traceback
+import pstats
+import json
+from collections import deque
+from contextlib import contextmanager
+
+class _LazyModule:
+    """Module proxy that imports the real module on first attribute access.
+
+    Keeps `import bs_pricer` down to NumPy and the standard library; the GUI,
+    charting, SciPy and market-data stacks load when something first uses them.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+tk = _LazyModule('tkinter')
+ttk = _LazyModule('tkinter.ttk')
+_mpl_figure = _LazyModule('matplotlib.figure')
+_mpl_tkagg = _LazyModule('matplotlib.backends.backend_tkagg')
+_special = _LazyModule('scipy.special')
+yf = _LazyModule('yfinance')
+
+class _StandardNormal:
+    """The parts of scipy.stats.norm the pricer uses, without importing scipy.stats."""
+    @staticmethod
+    def cdf(x):
+        return _special.ndtr(x)
+
+    @staticmethod
+    def pdf(x):
+        return np.exp(-0.5 * np.square(x)) / np.sqrt(2 * np.pi)
+
+norm = _StandardNormal()
+
+class PricingInstrumentation:
+    """Stage timers, work counters and a rolling latency window for the pricer.
+
+    Stages are timed with time.perf_counter. Trace events are only kept
+    while tracing is enabled, and cProfile only runs while profiling is on.
+    """
+    HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000)
+
+    def __init__(self, window=200):
+        self.latencies = deque(maxlen=window)
+        self.counters = {'trees_built': 0, 'nodes_evaluated': 0}
+        self.last_stages = {}
+        self.tracing = False
+        self.trace_events = deque(maxlen=20000)
+        self.profiler = None
+        self._run_start = None
+        self._run_stages = {}
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._run_stages[name] = self._run_stages.get(name, 0.0) + elapsed
+            if self.tracing:
+                self.trace_events.append({
+                    'name': name, 'ph': 'X', 'pid': 0, 'tid': threading.get_ident(),
+                    'ts': start * 1e6, 'dur': elapsed * 1e6
+                })
+
+    def begin_run(self):
+        self._run_stages = {}
+        self._run_start = time.perf_counter()
+        if self.profiler:
+            self.profiler.enable()
+
+    def end_run(self):
+        if self.profiler:
+            self.profiler.disable()
+        if self._run_start is None:
+            return
+        self.latencies.append(time.perf_counter() - self._run_start)
+        self.last_stages = self._run_stages
+        self._run_start = None
+
+    def percentile(self, pct):
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(self.latencies, pct))
+
+    def histogram(self):
+        """Counts of recent run latencies per bucket (last bucket is overflow)."""
+        counts = [0] * (len(self.HISTOGRAM_BUCKETS_MS) + 1)
+        for latency in self.latencies:
+            ms = latency * 1000
+            index = next((i for i, edge in enumerate(self.HISTOGRAM_BUCKETS_MS) if ms < edge),
+                         len(self.HISTOGRAM_BUCKETS_MS))
+            counts[index] += 1
+        return counts
+
+    def summary(self):
+        if not self.latencies:
+            return "No calculations timed yet"
+        stages = sorted(self.last_stages.items(), key=lambda item: -item[1])[:4]
+        breakdown = "  ".join(f"{name} {secs * 1000:.1f}" for name, secs in stages)
+        return (f"Last {self.latencies[-1] * 1000:.1f} ms | p50 {self.percentile(50) * 1000:.1f} "
+                f"p95 {self.percentile(95) * 1000:.1f} ms | {breakdown} | "
+                f"trees {self.counters['trees_built']:,} nodes {self.counters['nodes_evaluated']:,}")
+
+    def set_profiling(self, enabled):
+        self.profiler = cProfile.Profile() if enabled else None
+
+    def dump(self, prefix):
+        """Write the cProfile stats and stage trace collected so far; returns the paths."""
+        paths = []
+        if self.profiler:
+            self.profiler.dump_stats(f"{prefix}.prof")
+            with open(f"{prefix}_profile.txt", 'w') as f:
+                pstats.Stats(self.profiler, stream=f).sort_stats('cumulative').print_stats(40)
+            paths += [f"{prefix}.prof", f"{prefix}_profile.txt"]
+        if self.trace_events:
+            with open(f"{prefix}_trace.json", 'w') as f:
+                json.dump({'traceEvents': list(self.trace_events), 'displayTimeUnit': 'ms'}, f)
+            paths.append(f"{prefix}_trace.json")
+        return paths
+
+instrumentation = PricingInstrumentation()
 
 class BinomialModel:
     def __init__(self, S, K, r, sigma, T, q, steps=100):
@@ -28,6 +158,9 @@ class BinomialModel:
         self.discount = np.exp(-r * self.dt)
     
     def price_american_option(self, option_type='Call'):
+        instrumentation.count('trees_built')
+        instrumentation.count('nodes_evaluated', (self.steps + 1) * (self.steps + 2) // 2)
+        
         # Initialize asset price tree
         asset_prices = np.zeros((self.steps + 1, self.steps + 1))
         for i in range(self.steps + 1):
@@ -86,6 +219,8 @@ class BinomialModel:
     
     def _price_european_option(self, option_type='Call'):
         # Simple European binomial pricing
+        instrumentation.count('trees_built')
+        instrumentation.count('nodes_evaluated', (self.steps + 1) * (self.steps + 2) // 2)
         option_values = np.zeros((self.steps + 1, self.steps + 1))
         
         # Asset prices
@@ -143,6 +278,58 @@ class BinomialModel:
             'reasons': reasons
         }
 
+def black_scholes_vectorized(S, K, r, sigma, T, q, is_call=True):
+    """Black-Scholes prices for broadcastable arrays of contract inputs.
+
+    Matches OptionPricingGUI.black_scholes_price element-wise: invalid
+    inputs (T, sigma, S or K not positive) price at zero.
+    """
+    S, K, r, sigma, T, q, is_call = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S, K, r, sigma, T, q)), np.asarray(is_call, dtype=bool))
+    valid = (T > 0) & (sigma > 0) & (S > 0) & (K > 0)
+    S_, K_, sigma_, T_ = (np.where(valid, x, 1.0) for x in (S, K, sigma, T))
+
+    sqrt_T = np.sqrt(T_)
+    d1 = (np.log(S_ / K_) + (r - q + 0.5 * sigma_**2) * T_) / (sigma_ * sqrt_T)
+    d2 = d1 - sigma_ * sqrt_T
+
+    disc_S = S_ * np.exp(-q * T_)
+    disc_K = K_ * np.exp(-r * T_)
+    call = disc_S * norm.cdf(d1) - disc_K * norm.cdf(d2)
+    put = disc_K * norm.cdf(-d2) - disc_S * norm.cdf(-d1)
+
+    price = np.where(is_call, call, put)
+    return np.where(valid, np.maximum(price, 0.0), 0.0)
+
+def greeks_vectorized(S, K, r, sigma, T, q, is_call=True):
+    """Greeks for broadcastable arrays, in the same units as calculate_greeks.
+
+    Theta is per calendar day, Vega and Rho per 1% move. Returns a dict of
+    arrays keyed 'Delta', 'Gamma', 'Theta', 'Vega', 'Rho'.
+    """
+    S, K, r, sigma, T, q, is_call = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S, K, r, sigma, T, q)), np.asarray(is_call, dtype=bool))
+    valid = (T > 0) & (sigma > 0) & (S > 0) & (K > 0)
+    S_, K_, sigma_, T_ = (np.where(valid, x, 1.0) for x in (S, K, sigma, T))
+
+    sqrt_T = np.sqrt(T_)
+    d1 = (np.log(S_ / K_) + (r - q + 0.5 * sigma_**2) * T_) / (sigma_ * sqrt_T)
+    d2 = d1 - sigma_ * sqrt_T
+
+    pdf_d1 = norm.pdf(d1)
+    div_disc = np.exp(-q * T_)
+    rate_disc = np.exp(-r * T_)
+    cdf_d2 = np.where(is_call, norm.cdf(d2), norm.cdf(-d2))
+
+    delta = np.where(is_call, div_disc * norm.cdf(d1), -div_disc * norm.cdf(-d1))
+    gamma = pdf_d1 * div_disc / (S_ * sigma_ * sqrt_T)
+    theta = -((S_ * pdf_d1 * sigma_ * div_disc) / (2 * sqrt_T) + r * K_ * rate_disc * cdf_d2) / 365
+    vega = S_ * div_disc * pdf_d1 * sqrt_T / 100
+    rho = np.where(is_call, 1.0, -1.0) * K_ * T_ * rate_disc * cdf_d2 / 100
+
+    greeks = {'Delta': delta, 'Gamma': gamma, 'Theta': theta, 'Vega': vega, 'Rho': rho}
+    return {name: np.where(valid, value, 0.0) for name, value in greeks.items()}
+
 class OptionPricingGUI:
     def __init__(self, root):
         self.root = root
@@ -164,6 +351,7 @@ class OptionPricingGUI:
         
         self.create_interface()
         self.update_calculations()
+        self.root.after(0, self.warm_backends)
     
     def black_scholes_price(self, S, K, r, sigma, T, q, option_type='Call'):
         try:
@@ -239,6 +427,54 @@ class OptionPricingGUI:
         self.create_controls(control_frame)
         self.create_results(result_frame)
         self.create_charts(result_frame)
+        self.create_status_bar()
+    
+    def create_status_bar(self):
+        status_frame = ttk.Frame(self.root, padding=(10, 2))
+        status_frame.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        status_frame.columnconfigure(1, weight=1)
+        
+        # Rolling latency histogram, one bar per bucket
+        self.histogram_canvas = tk.Canvas(status_frame, width=120, height=20, highlightthickness=0)
+        self.histogram_canvas.grid(row=0, column=0, padx=(0, 10))
+        
+        self.perf_status = ttk.Label(status_frame, text=instrumentation.summary(), font=('Courier', 8))
+        self.perf_status.grid(row=0, column=1, sticky=tk.W)
+        
+        self.profiling_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(status_frame, text="Profile", variable=self.profiling_var,
+                       command=self.toggle_profiling).grid(row=0, column=2, padx=(10, 5))
+        ttk.Button(status_frame, text="Dump Profile", command=self.dump_profile).grid(row=0, column=3)
+    
+    def toggle_profiling(self):
+        enabled = self.profiling_var.get()
+        instrumentation.set_profiling(enabled)
+        instrumentation.tracing = enabled
+        if enabled:
+            instrumentation.trace_events.clear()
+    
+    def dump_profile(self):
+        prefix = f"bs_pricer_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        paths = instrumentation.dump(prefix)
+        if paths:
+            self.perf_status.config(text=f"Wrote {', '.join(paths)}")
+        else:
+            self.perf_status.config(text="Nothing to dump - enable Profile and recalculate first")
+    
+    def update_status_bar(self):
+        self.perf_status.config(text=instrumentation.summary())
+        
+        counts = instrumentation.histogram()
+        canvas = self.histogram_canvas
+        canvas.delete('all')
+        width = int(canvas['width']) // len(counts)
+        height = int(canvas['height'])
+        peak = max(counts) or 1
+        for i, count in enumerate(counts):
+            bar = int((height - 2) * count / peak)
+            color = 'darkgreen' if i < 3 else 'orange' if i < 6 else 'red'
+            canvas.create_rectangle(i * width + 1, height - bar, (i + 1) * width - 1, height,
+                                    fill=color, outline='')
     
     def create_controls(self, parent):
         # Live Data Section
@@ -398,26 +634,55 @@ class OptionPricingGUI:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
     
     def create_charts(self, parent):
-        chart_frame = ttk.LabelFrame(parent, text="Analysis Charts", padding="5")
-        chart_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.chart_frame = ttk.LabelFrame(parent, text="Analysis Charts", padding="5")
+        self.chart_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # The figure is built once matplotlib has been imported in the background
+        self.fig = None
+        self.chart_placeholder = ttk.Label(self.chart_frame, text="Loading charts...", foreground='gray')
+        self.chart_placeholder.pack(expand=True)
+    
+    def warm_backends(self):
+        """Import the chart and market-data stacks off the Tk thread."""
+        def warm():
+            try:
+                _mpl_figure.load()
+                _mpl_tkagg.load()
+            except Exception as e:
+                # e is unbound once the except block exits, before the callback runs
+                message = f"Charts unavailable: {e}"
+                self.root.after(0, lambda: self.chart_placeholder.config(text=message))
+                return
+            self.root.after(0, self.build_charts)
+            
+            try:
+                yf.load()
+            except Exception as e:
+                print(f"yfinance unavailable: {e}")
+        
+        threading.Thread(target=warm, daemon=True).start()
+    
+    def build_charts(self):
+        self.chart_placeholder.destroy()
         
-        self.fig = Figure(figsize=(16, 10), dpi=80)
-        self.fig.patch.set_facecolor('white')
+        fig = _mpl_figure.Figure(figsize=(16, 10), dpi=80)
+        fig.patch.set_facecolor('white')
         
         # Create 6 subplots (3x2)
-        self.ax1 = self.fig.add_subplot(2, 3, 1)  # Price vs Stock Price
-        self.ax2 = self.fig.add_subplot(2, 3, 2)  # Price vs Volatility
-        self.ax3 = self.fig.add_subplot(2, 3, 3)  # Price vs Time
-        self.ax4 = self.fig.add_subplot(2, 3, 4)  # Early Exercise Premium
-        self.ax5 = self.fig.add_subplot(2, 3, 5)  # Greeks
-        self.ax6 = self.fig.add_subplot(2, 3, 6)  # Option Values
-        
-        self.fig.subplots_adjust(left=0.08, right=0.95, top=0.95, bottom=0.08, 
-                                hspace=0.3, wspace=0.3)
-        
-        self.canvas = FigureCanvasTkAgg(self.fig, chart_frame)
-        self.canvas.draw()
+        self.ax1 = fig.add_subplot(2, 3, 1)  # Price vs Stock Price
+        self.ax2 = fig.add_subplot(2, 3, 2)  # Price vs Volatility
+        self.ax3 = fig.add_subplot(2, 3, 3)  # Price vs Time
+        self.ax4 = fig.add_subplot(2, 3, 4)  # Early Exercise Premium
+        self.ax5 = fig.add_subplot(2, 3, 5)  # Greeks
+        self.ax6 = fig.add_subplot(2, 3, 6)  # Option Values
+        
+        fig.subplots_adjust(left=0.08, right=0.95, top=0.95, bottom=0.08, 
+                           hspace=0.3, wspace=0.3)
+        
+        self.canvas = _mpl_tkagg.FigureCanvasTkAgg(fig, self.chart_frame)
         self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.fig = fig
+        self.update_calculations()
     
     def fetch_data(self):
         def fetch():
@@ -458,7 +723,8 @@ class OptionPricingGUI:
                 self.root.after(0, update_gui)
                 
             except Exception as e:
-                self.root.after(0, lambda: self.data_status.config(text=f"Error: {str(e)[:30]}", foreground="red"))
+                message = f"Error: {str(e)[:30]}"
+                self.root.after(0, lambda: self.data_status.config(text=message, foreground="red"))
         
         threading.Thread(target=fetch, daemon=True).start()
     
@@ -473,6 +739,7 @@ class OptionPricingGUI:
         self.update_calculations()
     
     def update_calculations(self):
+        instrumentation.begin_run()
         try:
             # Get parameters
             S = self.params['S'].get()
@@ -485,30 +752,42 @@ class OptionPricingGUI:
             steps = self.binomial_steps.get()
             
             # Black-Scholes
-            bs_price = self.black_scholes_price(S, K, r, sigma, T, q, option_type)
-            self.bs_price_label.config(text=f"${bs_price:.4f}")
+            with instrumentation.stage('black_scholes'):
+                bs_price = self.black_scholes_price(S, K, r, sigma, T, q, option_type)
+                self.bs_price_label.config(text=f"${bs_price:.4f}")
             
             # Greeks
-            greeks = self.calculate_greeks(S, K, r, sigma, T, q, option_type)
-            for greek, value in greeks.items():
-                self.greeks_labels[greek].config(text=f"{value:.4f}")
+            with instrumentation.stage('greeks'):
+                greeks = self.calculate_greeks(S, K, r, sigma, T, q, option_type)
+                for greek, value in greeks.items():
+                    self.greeks_labels[greek].config(text=f"{value:.4f}")
             
             # Binomial
-            model = BinomialModel(S, K, r, sigma, T, q, steps)
-            result = model.price_american_option(option_type)
+            with instrumentation.stage('binomial'):
+                model = BinomialModel(S, K, r, sigma, T, q, steps)
+                result = model.price_american_option(option_type)
             
             self.euro_price_label.config(text=f"${result['european_price']:.4f}")
             self.amer_price_label.config(text=f"${result['american_price']:.4f}")
             self.premium_label.config(text=f"${result['early_exercise_premium']:.4f}")
             
             # Early exercise analysis
-            self.update_exercise_analysis(result)
+            with instrumentation.stage('exercise_analysis'):
+                self.update_exercise_analysis(result)
             
             # Update charts
-            self.update_charts()
+            charts_drawn = self.update_charts()
             
         except Exception as e:
-            print(f"Error in calculations: {e}")
+            traceback.print_exc()
+            instrumentation.end_run()
+            self.perf_status.config(text=f"Error in calculations: {e}")
+            return
+        
+        instrumentation.end_run()
+        # A chart error stays on the status bar; its stage timings are still recorded
+        if charts_drawn:
+            self.update_status_bar()
     
     def update_exercise_analysis(self, result):
         exercise_info = result['should_exercise_now']
@@ -554,6 +833,10 @@ European Price: ${result['european_price']:.4f}
         self.exercise_text.insert(1.0, analysis)
     
     def update_charts(self):
+        """Redraw every chart; returns False after reporting an error on the status bar"""
+        if self.fig is None:
+            return True
+        
         try:
             S = self.params['S'].get()
             K = self.params['K'].get()
@@ -569,35 +852,143 @@ European Price: ${result['european_price']:.4f}
                 ax.clear()
             
             # Chart 1: Price vs Stock Price
-            S_range = np.linspace(max(1, S * 0.7), S * 1.3, 20)
-            bs_prices = [self.black_scholes_price(s, K, r, sigma, T, q, option_type) for s in S_range]
+            with instrumentation.stage('chart_spot_sweep'):
+                S_range = np.linspace(max(1, S * 0.7), S * 1.3, 20)
+                bs_prices = [self.black_scholes_price(s, K, r, sigma, T, q, option_type) for s in S_range]
             
-            american_prices = []
-            european_prices = []
-            for s in S_range:
-                model = BinomialModel(s, K, r, sigma, T, q, steps)
-                result = model.price_american_option(option_type)
-                american_prices.append(result['american_price'])
-                european_prices.append(result['european_price'])
-            
-            self.ax1.plot(S_range, bs_prices, 'b-', label='Black-Scholes', linewidth=2)
-            self.ax1.plot(S_range, european_prices, 'g--', label='European', linewidth=2)
-            self.ax1.plot(S_range, american_prices, 'r-', label='American', linewidth=2)
-            self.ax1.axvline(S, color='gray', linestyle=':', alpha=0.7)
-            self.ax1.set_title('Price vs Stock Price')
-            self.ax1.set_xlabel('Stock Price ($)')
-            self.ax1.set_ylabel('Option Price ($)')
-            self.ax1.legend()
-            self.ax1.grid(True, alpha=0.3)
+                american_prices = []
+                european_prices = []
+                for s in S_range:
+                    model = BinomialModel(s, K, r, sigma, T, q, steps)
+                    result = model.price_american_option(option_type)
+                    american_prices.append(result['american_price'])
+                    european_prices.append(result['european_price'])
+            
+                self.ax1.plot(S_range, bs_prices, 'b-', label='Black-Scholes', linewidth=2)
+                self.ax1.plot(S_range, european_prices, 'g--', label='European', linewidth=2)
+                self.ax1.plot(S_range, american_prices, 'r-', label='American', linewidth=2)
+                self.ax1.axvline(S, color='gray', linestyle=':', alpha=0.7)
+                self.ax1.set_title('Price vs Stock Price')
+                self.ax1.set_xlabel('Stock Price ($)')
+                self.ax1.set_ylabel('Option Price ($)')
+                self.ax1.legend()
+                self.ax1.grid(True, alpha=0.3)
             
             # Chart 2: Price vs Volatility
-            vol_range = np.linspace(0.1, min(1.0, sigma * 2), 15)
-            bs_vol_prices = [self.black_scholes_price(S, K, r, vol, T, q, option_type) for vol in vol_range]
+            with instrumentation.stage('chart_vol_sweep'):
+                vol_range = np.linspace(0.1, min(1.0, sigma * 2), 15)
+                bs_vol_prices = [self.black_scholes_price(S, K, r, vol, T, q, option_type) for vol in vol_range]
+            
+                am_vol_prices = []
+                eu_vol_prices = []
+                for vol in vol_range:
+                    model = BinomialModel(S, K, r, vol, T, q, steps)
+                    result = model.price_american_option(option_type)
+                    am_vol_prices.append(result['american_price'])
+                    eu_vol_prices.append(result['european_price'])
+            
+                self.ax2.plot(vol_range, bs_vol_prices, 'b-', label='Black-Scholes', linewidth=2)
+                self.ax2.plot(vol_range, eu_vol_prices, 'g--', label='European', linewidth=2)
+                self.ax2.plot(vol_range, am_vol_prices, 'r-', label='American', linewidth=2)
+                self.ax2.axvline(sigma, color='gray', linestyle=':', alpha=0.7)
+                self.ax2.set_title('Price vs Volatility')
+                self.ax2.set_xlabel('Volatility')
+                self.ax2.set_ylabel('Option Price ($)')
+                self.ax2.legend()
+                self.ax2.grid(True, alpha=0.3)
+            
+            # Chart 3: Price vs Time
+            with instrumentation.stage('chart_time_sweep'):
+                T_range = np.linspace(0.01, max(T * 2, 0.1), 15)
+                bs_time_prices = [self.black_scholes_price(S, K, r, sigma, t, q, option_type) for t in T_range]
+            
+                am_time_prices = []
+                eu_time_prices = []
+                for t in T_range:
+                    model = BinomialModel(S, K, r, sigma, t, q, steps)
+                    result = model.price_american_option(option_type)
+                    am_time_prices.append(result['american_price'])
+                    eu_time_prices.append(result['european_price'])
+            
+                self.ax3.plot(T_range, bs_time_prices, 'b-', label='Black-Scholes', linewidth=2)
+                self.ax3.plot(T_range, eu_time_prices, 'g--', label='European', linewidth=2)
+                self.ax3.plot(T_range, am_time_prices, 'r-', label='American', linewidth=2)
+                self.ax3.axvline(T, color='gray', linestyle=':', alpha=0.7)
+                self.ax3.set_title('Price vs Time to Expiration')
+                self.ax3.set_xlabel('Time (years)')
+                self.ax3.set_ylabel('Option Price ($)')
+                self.ax3.legend()
+                self.ax3.grid(True, alpha=0.3)
+            
+            # Chart 4: Early Exercise Premium
+            with instrumentation.stage('chart_premium'):
+                premiums = [a - e for a, e in zip(american_prices, european_prices)]
+                self.ax4.plot(S_range, premiums, 'm-', linewidth=2)
+                self.ax4.fill_between(S_range, premiums, alpha=0.3, color='magenta')
+                self.ax4.axvline(K, color='gray', linestyle=':', alpha=0.7)
+                self.ax4.set_title('Early Exercise Premium')
+                self.ax4.set_xlabel('Stock Price ($)')
+                self.ax4.set_ylabel('Premium ($)')
+                self.ax4.grid(True, alpha=0.3)
+            
+            # Chart 5: Greeks
+            with instrumentation.stage('chart_greeks_sweep'):
+                deltas = []
+                gammas = []
+                for s in S_range:
+                    greeks = self.calculate_greeks(s, K, r, sigma, T, q, option_type)
+                    deltas.append(greeks['Delta'])
+                    gammas.append(greeks['Gamma'])
+            
+                self.ax5.plot(S_range, deltas, 'b-', label='Delta', linewidth=2)
+                self.ax5.plot(S_range, np.array(gammas) * 10, 'r-', label='Gamma x10', linewidth=2)
+                self.ax5.axvline(S, color='gray', linestyle=':', alpha=0.7)
+                self.ax5.set_title('Greeks vs Stock Price')
+                self.ax5.set_xlabel('Stock Price ($)')
+                self.ax5.legend()
+                self.ax5.grid(True, alpha=0.3)
             
-            am_vol_prices = []
-            eu_vol_prices = []
-            for vol in vol_range:
-                model = BinomialModel(S, K, r, vol, T, q, steps)
+            # Chart 6: Option Values
+            with instrumentation.stage('chart_option_values'):
+                model = BinomialModel(S, K, r, sigma, T, q, steps)
                 result = model.price_american_option(option_type)
-                am_vol_prices.append(result['american_price'])
-                eu_vol_prices.append(result['european_price'])
\ No newline at end of file
+                intrinsic = result['should_exercise_now']['intrinsic_value']
+                labels = ['Intrinsic', 'Black-Scholes', 'European', 'American']
+                values = [intrinsic, self.black_scholes_price(S, K, r, sigma, T, q, option_type),
+                          result['european_price'], result['american_price']]
+                colors = ['gray', 'blue', 'green', 'red']
+            
+                self.ax6.bar(labels, values, color=colors, alpha=0.7)
+                for i, value in enumerate(values):
+                    self.ax6.text(i, value, f"${value:.2f}", ha='center', va='bottom', fontsize=8)
+                self.ax6.set_title('Option Values')
+                self.ax6.set_ylabel('Value ($)')
+                self.ax6.grid(True, alpha=0.3, axis='y')
+            
+            with instrumentation.stage('draw'):
+                self.canvas.draw()
+            
+        except Exception as e:
+            traceback.print_exc()
+            self.perf_status.config(text=f"Error updating charts: {e}")
+            return False
+        return True
+    
+    def reset_parameters(self):
+        defaults = {'S': 100.0, 'K': 100.0, 'r': 0.05, 'sigma': 0.20, 'T': 0.25, 'q': 0.02}
+        for param, value in defaults.items():
+            self.params[param].set(value)
+            self.param_labels[param].config(text=f"{value:.4f}")
+        
+        self.binomial_steps.set(100)
+        self.steps_label.config(text="100")
+        self.update_calculations()
+
+
+def main():
+    root = tk.Tk()
+    app = OptionPricingGUI(root)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
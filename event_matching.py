@@ -0,0 +1,189 @@
+import re
+
+# Same normalisation as the scanner's original clean_event_name, compiled once
+_PARENTHESES = re.compile(r'\(.*?\)')
+_VERSUS = re.compile(r'\b(vs|v)\b')
+_SPECIAL_CHARS = re.compile(r'[^\w\s]')
+
+PARTIAL_MATCH_LENGTH = 4
+
+
+def clean_event_name(name):
+    """Lowercase and strip parentheses, 'vs'/'v' and punctuation from an event name"""
+    name = _PARENTHESES.sub('', name.lower())
+    name = _VERSUS.sub(' ', name)
+    name = _SPECIAL_CHARS.sub(' ', name)
+    return ' '.join(name.split())
+
+
+def tokenize(name):
+    return frozenset(clean_event_name(name).split())
+
+
+def token_similarity(words1, words2):
+    """(Jaccard overlap, partial-match ratio) of two pre-tokenised names.
+
+    The partial-match ratio counts pairs of words of four or more letters
+    where one contains the other ("djokovic" / "ndjokovic"), relative to
+    the longer name. Tuples compare Jaccard first, so exact word overlap
+    outranks partial matches when choosing between candidates.
+    """
+    total_words = words1 | words2
+    if not total_words:
+        return 0.0, 0.0
+
+    partial_matches = 0
+    for word1 in words1:
+        if len(word1) < PARTIAL_MATCH_LENGTH:
+            continue
+        for word2 in words2:
+            if len(word2) >= PARTIAL_MATCH_LENGTH and (word1 in word2 or word2 in word1):
+                partial_matches += 1
+
+    return len(words1 & words2) / len(total_words), partial_matches / max(len(words1), len(words2))
+
+
+def is_similar(score):
+    """Whether a token_similarity score is a match: Jaccard of at least 0.6, or partial ratio of 0.5"""
+    jaccard, partial = score
+    return jaccard >= 0.6 or partial >= 0.5
+
+
+def tokens_are_similar(words1, words2):
+    """Word-overlap test behind events_are_similar, on pre-tokenised names"""
+    return is_similar(token_similarity(words1, words2))
+
+
+def blocking_keys(tokens):
+    """Index keys for a token set: each word, plus 4-letter prefix and suffix keys
+    for longer words so initials and joined names still meet as candidates."""
+    keys = set(tokens)
+    for token in tokens:
+        if len(token) >= PARTIAL_MATCH_LENGTH:
+            keys.add('<' + token[:PARTIAL_MATCH_LENGTH])
+            keys.add('>' + token[-PARTIAL_MATCH_LENGTH:])
+    return keys
+
+
+class EventMatcher:
+    """Inverted-index matcher for events across exchanges.
+
+    Each event name is normalised and tokenised once, and its blocking keys
+    are indexed per exchange. Only events sharing at least one key with an
+    event from a different exchange are scored, so matching stays close to
+    linear in the number of events instead of comparing every pair. Keys
+    shared by more than max_block_size events (e.g. 'fc', 'united') are too
+    unselective to block on and are skipped while rarer keys exist.
+    """
+
+    def __init__(self, max_block_size=200):
+        self.max_block_size = max_block_size
+        self._entries = {}     # entry id -> (event, tokens, keys)
+        self._index = {}       # exchange -> {key: set of entry ids}
+        self._next_id = 0
+        self.comparisons = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _insert(self, event, tokens, keys):
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (event, tokens, keys)
+        index = self._index.setdefault(event.exchange, {})
+        for key in keys:
+            index.setdefault(key, set()).add(entry_id)
+        return entry_id
+
+    def _remove(self, entry_id):
+        event, tokens, keys = self._entries.pop(entry_id)
+        index = self._index[event.exchange]
+        for key in keys:
+            bucket = index[key]
+            bucket.discard(entry_id)
+            if not bucket:
+                del index[key]
+
+    def _candidates(self, exchange, keys):
+        """Entry IDs from other exchanges sharing a selective key, in insertion order"""
+        candidates = set()
+        for other_exchange, index in self._index.items():
+            if other_exchange == exchange:
+                continue
+            buckets = [index[key] for key in keys if key in index]
+            selective = [bucket for bucket in buckets if len(bucket) <= self.max_block_size]
+            for bucket in selective or buckets:
+                candidates.update(bucket)
+        return sorted(candidates)
+
+    def _best_match(self, exchange, tokens, keys):
+        """The most similar candidate entry, the earliest indexed on a tie, or None"""
+        best_id, best_score = None, None
+        for entry_id in self._candidates(exchange, keys):
+            self.comparisons += 1
+            score = token_similarity(tokens, self._entries[entry_id][1])
+            if is_similar(score) and (best_score is None or score > best_score):
+                best_id, best_score = entry_id, score
+        return best_id
+
+    def add(self, event):
+        """Match a streamed event one-to-one against unmatched events.
+
+        Returns [matched event, event] and forgets both, or None after
+        indexing the event to wait for its counterpart.
+        """
+        tokens = tokenize(event.name)
+        keys = blocking_keys(tokens)
+
+        entry_id = self._best_match(event.exchange, tokens, keys)
+        if entry_id is None:
+            self._insert(event, tokens, keys)
+            return None
+
+        matched = self._entries[entry_id][0]
+        self._remove(entry_id)
+        return [matched, event]
+
+    def group(self, events):
+        """Group events that are likely the same across exchanges.
+
+        Same grouping as the scanner's original pairwise loop (each
+        unprocessed event collects every similar unprocessed event from
+        another exchange), but candidates come from the blocking index
+        instead of a full scan. The events are indexed alongside any already
+        waiting in the matcher, and grouped ones are forgotten.
+        """
+        entry_ids = []
+        for event in events:
+            tokens = tokenize(event.name)
+            entry_ids.append(self._insert(event, tokens, blocking_keys(tokens)))
+
+        groups = []
+        processed = set()
+        for entry_id in entry_ids:
+            if entry_id in processed:
+                continue
+            processed.add(entry_id)
+            event, tokens, keys = self._entries[entry_id]
+
+            group = [entry_id]
+            for candidate_id in self._candidates(event.exchange, keys):
+                if candidate_id in processed:
+                    continue
+                self.comparisons += 1
+                if tokens_are_similar(tokens, self._entries[candidate_id][1]):
+                    group.append(candidate_id)
+                    processed.add(candidate_id)
+
+            # Only include groups with events from both exchanges
+            if len(group) > 1:
+                groups.append([self._entries[member][0] for member in group])
+                for member in group:
+                    self._remove(member)
+
+        return groups
+
+
+def group_events(events, max_block_size=200):
+    """Group events that are likely the same across exchanges; see EventMatcher.group"""
+    return EventMatcher(max_block_size).group(events)
@@ -0,0 +1,367 @@
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+# Smarkets sport ID -> Matchbook sport ID
+SPORTS = {'tennis': 325, 'football': 11, 'basketball': 18}
+
+SMARKETS_PREFIX = '/smarkets/v3'
+MATCHBOOK_PREFIX = '/matchbook/bpapi/rest'
+
+# Markets per sport: (Smarkets name, Matchbook name, outcomes); None in the
+# outcomes stands for the home and away sides
+MARKETS = {
+    'tennis': [('Winner', 'Match Odds', None)],
+    'football': [('Full-time result', 'Match Odds', None),
+                 ('Over/under 2.5', 'Total Goals 2.5', ['Over 2.5', 'Under 2.5'])],
+    'basketball': [('Winner', 'Moneyline', None)],
+}
+
+_SYLLABLES = ('ka', 'lo', 'ren', 'mi', 'sto', 'var', 'den', 'tel', 'bru', 'nor', 'sil', 'ga', 'ton',
+              'vik', 'mar', 'zel', 'pa', 'ros', 'ber', 'chi', 'dal', 'fen', 'gor', 'hal', 'ju', 'kov')
+_CLUB_SUFFIXES = ('United', 'City', 'Rovers', 'Athletic', 'Town', 'Wanderers')
+_TEAM_SUFFIXES = ('Hawks', 'Kings', 'Giants', 'Lions', 'Comets', 'Rockets')
+
+
+class SimulatedMarket:
+    """One market listed on both exchanges, with prices that drift over time"""
+    __slots__ = ('sport', 'smarkets_id', 'matchbook_id', 'smarkets_name', 'matchbook_name', 'event',
+                 'outcomes', 'contract_ids', 'runner_ids', 'probabilities', 'margins', 'depth',
+                 'arbitrage', 'updated')
+
+    def __init__(self, sport, event, smarkets_name, matchbook_name, outcomes):
+        self.sport = sport
+        self.event = event
+        self.smarkets_name = smarkets_name
+        self.matchbook_name = matchbook_name
+        self.outcomes = outcomes
+        self.smarkets_id = self.matchbook_id = None
+        self.contract_ids = []
+        self.runner_ids = []
+        self.probabilities = []
+        self.margins = {}
+        self.depth = []
+        self.arbitrage = None   # (start offset, end offset, exchange) of an injected arbitrage
+        self.updated = 0.0
+
+
+class ExchangeSimulator:
+    """Local stand-in for the Smarkets and Matchbook endpoints the scanner calls.
+
+    Every sport gets events_per_sport live events, each listed on both
+    exchanges. With probability perturbation the Matchbook name of an event
+    is altered the way real listings differ (initials, club suffixes,
+    dropped letters), so matching can be scored against the true pairs.
+    Prices follow a random walk with the given volatility per second.
+    A fraction arbitrage_rate of markets gets one arbitrage window opening
+    between arbitrage_start seconds after start() (or reset_clock()) and lasting
+    arbitrage_duration, during which one exchange prices the favourite high
+    enough to take the best combined book to arbitrage_book.
+
+    Each request waits latency seconds (+/-50%) and fails with a 503 at
+    error_rate. Matchbook requests need the session-token from a login.
+    """
+
+    def __init__(self, events_per_sport=100, sports=tuple(SPORTS), perturbation=0.3, latency=0.0,
+                 error_rate=0.0, arbitrage_rate=0.05, arbitrage_start=(5.0, 60.0), arbitrage_duration=30.0,
+                 arbitrage_book=0.96, volatility=0.01, seed=0):
+        self.perturbation = perturbation
+        self.latency = latency
+        self.error_rate = error_rate
+        self.arbitrage_book = arbitrage_book
+        self.volatility = volatility
+        self.rng = random.Random(seed)
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._tokens = set()
+        self._ids = iter(range(10_000_000, 100_000_000))
+
+        self.events = {sport: [] for sport in sports}    # sport -> [event dict]
+        self.smarkets_markets = {}      # market ID -> SimulatedMarket
+        self.matchbook_markets = {}
+        self.event_markets = {}         # (exchange, event ID) -> [SimulatedMarket]
+
+        for sport in sports:
+            names = self._unique_sides(sport, 2 * events_per_sport)
+            for home, away in zip(names[::2], names[1::2]):
+                self._add_event(sport, home, away)
+
+        markets = list(self.smarkets_markets.values())
+        for market in self.rng.sample(markets, int(round(arbitrage_rate * len(markets)))):
+            start = self.rng.uniform(*arbitrage_start)
+            market.arbitrage = (start, start + arbitrage_duration, self.rng.choice(('smarkets', 'matchbook')))
+
+    def _word(self):
+        return ''.join(self.rng.choice(_SYLLABLES) for _ in range(self.rng.randint(2, 3))).capitalize()
+
+    def _unique_sides(self, sport, count):
+        names = set()
+        while len(names) < count:
+            if sport == 'tennis':
+                names.add(f"{self._word()} {self._word()}")
+            elif sport == 'football':
+                names.add(f"{self._word()} {self.rng.choice(_CLUB_SUFFIXES)}")
+            else:
+                names.add(f"{self._word()} {self.rng.choice(_TEAM_SUFFIXES)}")
+        names = sorted(names)
+        self.rng.shuffle(names)
+        return names
+
+    def _perturb(self, sport, side):
+        """A side's name as Matchbook might list it"""
+        choice = self.rng.random()
+        words = side.split()
+        if sport == 'tennis' and choice < 0.5:
+            return f"{words[0][0]}. {' '.join(words[1:])}"
+        if sport == 'football' and choice < 0.5:
+            return side + ' FC'
+        long_words = [i for i, word in enumerate(words) if len(word) >= 6]
+        if long_words:
+            i = self.rng.choice(long_words)
+            cut = self.rng.randrange(2, len(words[i]) - 1)
+            words[i] = words[i][:cut] + words[i][cut + 1:]
+        return ' '.join(words)
+
+    def _add_event(self, sport, home, away):
+        event = {
+            'sport': sport,
+            'smarkets_id': str(next(self._ids)),
+            'matchbook_id': next(self._ids),
+            'smarkets_name': f"{home} vs {away}",
+            'matchbook_name': f"{home} v {away}",
+            'start': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.started - 1800)),
+        }
+        if self.rng.random() < self.perturbation:
+            event['matchbook_name'] = f"{self._perturb(sport, home)} v {self._perturb(sport, away)}"
+        self.events[sport].append(event)
+
+        for smarkets_name, matchbook_name, outcomes in MARKETS[sport]:
+            if outcomes is None:
+                outcomes = [home, 'Draw', away] if sport == 'football' else [home, away]
+            market = SimulatedMarket(sport, event, smarkets_name, matchbook_name, outcomes)
+            market.smarkets_id = str(next(self._ids))
+            market.matchbook_id = next(self._ids)
+            market.contract_ids = [str(next(self._ids)) for _ in outcomes]
+            market.runner_ids = [next(self._ids) for _ in outcomes]
+            weights = [self.rng.uniform(0.5, 2.0) for _ in outcomes]
+            market.probabilities = [weight / sum(weights) for weight in weights]
+            market.margins = {'smarkets': self.rng.uniform(0.02, 0.05), 'matchbook': self.rng.uniform(0.02, 0.05)}
+            market.depth = [self.rng.choice((150.0, 400.0, 1000.0, 2500.0)) for _ in range(3)]
+            market.updated = self.started
+
+            self.smarkets_markets[market.smarkets_id] = market
+            self.matchbook_markets[market.matchbook_id] = market
+            self.event_markets.setdefault(('smarkets', event['smarkets_id']), []).append(market)
+            self.event_markets.setdefault(('matchbook', event['matchbook_id']), []).append(market)
+
+    def event_pairs(self):
+        """True Smarkets event ID -> Matchbook event ID pairs"""
+        return {event['smarkets_id']: event['matchbook_id'] for events in self.events.values() for event in events}
+
+    def reset_clock(self):
+        """Restart the arbitrage schedule and price drift from now"""
+        with self._lock:
+            self.started = time.time()
+            for market in self.smarkets_markets.values():
+                market.updated = self.started
+
+    def arbitrage_windows(self):
+        """Injected arbitrages as dicts with absolute start and end times"""
+        return [{'sport': market.sport,
+                 'smarkets_market': market.smarkets_name, 'matchbook_market': market.matchbook_name,
+                 'smarkets_event': market.event['smarkets_name'],
+                 'matchbook_event': market.event['matchbook_name'],
+                 'smarkets_market_id': market.smarkets_id, 'matchbook_market_id': market.matchbook_id,
+                 'exchange': market.arbitrage[2],
+                 'start': self.started + market.arbitrage[0], 'end': self.started + market.arbitrage[1]}
+                for market in self.smarkets_markets.values() if market.arbitrage]
+
+    def back_levels(self, market, exchange, now):
+        """[(decimal odds, available £)] per outcome, best first, at time now"""
+        with self._lock:
+            steps = min(int(now - market.updated), 60)
+            if steps > 0:
+                scale = self.volatility * math.sqrt(steps)
+                drifted = [p * math.exp(self.rng.gauss(0, scale)) for p in market.probabilities]
+                market.probabilities = [p / sum(drifted) for p in drifted]
+                market.updated += steps
+            probabilities = list(market.probabilities)
+
+        odds = [1.0 / (p * (1 + market.margins[exchange])) for p in probabilities]
+        arbitrage = market.arbitrage
+        if arbitrage and arbitrage[2] == exchange and arbitrage[0] <= now - self.started < arbitrage[1]:
+            # Lift the favourite until the best book across both exchanges reaches arbitrage_book
+            favourite = max(range(len(odds)), key=lambda k: probabilities[k])
+            margin = market.margins['matchbook' if exchange == 'smarkets' else 'smarkets']
+            others = sum(p * (1 + margin) for k, p in enumerate(probabilities) if k != favourite)
+            odds[favourite] = max(odds[favourite], 1.0 / max(self.arbitrage_book - others, 0.01))
+
+        return [[(price * (1 - 0.01 * level), market.depth[level]) for level in range(len(market.depth))]
+                for price in odds]
+
+    def start(self, host='127.0.0.1', port=0):
+        """Serve on a background thread; returns the server (server_address has the port)"""
+        server = ThreadingHTTPServer((host, port), type('Handler', (_Handler,), {'simulator': self}))
+        server.daemon_threads = True
+        self.reset_clock()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def base_urls(self, server):
+        """(Smarkets base URL, Matchbook base URL) for a running server"""
+        host, port = server.server_address[:2]
+        return f"http://{host}:{port}{SMARKETS_PREFIX}", f"http://{host}:{port}{MATCHBOOK_PREFIX}"
+
+    def handle(self, method, path, query, headers, payload):
+        """(status, JSON body) for one request"""
+        with self._lock:
+            self.requests += 1
+            fail = self.rng.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency * random.uniform(0.5, 1.5))
+        if fail:
+            with self._lock:
+                self.errors += 1
+            return 503, {'error': 'simulated outage'}
+
+        if path.startswith(SMARKETS_PREFIX):
+            return self.smarkets(path[len(SMARKETS_PREFIX):], query)
+        if path.startswith(MATCHBOOK_PREFIX):
+            path = path[len(MATCHBOOK_PREFIX):]
+            if method == 'POST' and path == '/security/session':
+                token = f"sim-{next(self._ids)}"
+                with self._lock:
+                    self._tokens.add(token)
+                return 200, {'session-token': token}
+            if headers.get('session-token') not in self._tokens:
+                return 401, {'errors': [{'messages': ['You are not logged in.']}]}
+            return self.matchbook(path, query)
+        return 404, {}
+
+    def smarkets(self, path, query):
+        parts = [part for part in path.split('/') if part]
+        now = time.time()
+        if parts == ['events']:
+            events = self.events.get(query.get('sport_id'), []) if 'sport_id' in query else \
+                [event for events in self.events.values() for event in events]
+            limit = int(query.get('limit', 100))
+            start = int(query.get('pagination_last_id', 0))
+            body = {'events': [{'id': event['smarkets_id'], 'name': event['smarkets_name'],
+                                'sport_id': event['sport'], 'state': 'live',
+                                'start_datetime': event['start']} for event in events[start:start + limit]]}
+            if start + limit < len(events):
+                body['pagination'] = {'next_page': '?' + urlencode(dict(query, pagination_last_id=start + limit))}
+            return 200, body
+        if len(parts) == 3 and parts[0] == 'events' and parts[2] == 'markets':
+            markets = self.event_markets.get(('smarkets', parts[1]), [])
+            return 200, {'markets': [{'id': market.smarkets_id, 'name': market.smarkets_name, 'state': 'live',
+                                      'event_id': parts[1]} for market in markets]}
+        if len(parts) == 3 and parts[0] == 'markets':
+            markets = [self.smarkets_markets[market_id] for market_id in parts[1].split(',')
+                       if market_id in self.smarkets_markets]
+            if parts[2] == 'contracts':
+                return 200, {'contracts': [{'id': contract_id, 'name': name, 'market_id': market.smarkets_id}
+                                           for market in markets
+                                           for contract_id, name in zip(market.contract_ids, market.outcomes)]}
+            if parts[2] == 'quotes':
+                # Prices are implied probability in basis points, quantities in 1/10000 GBP
+                body = {}
+                for market in markets:
+                    for contract_id, levels in zip(market.contract_ids, self.back_levels(market, 'smarkets', now)):
+                        body[contract_id] = {
+                            'offers': [{'price': int(round(10000 / odds)), 'quantity': int(available * 10000)}
+                                       for odds, available in levels],
+                            'bids': []}
+                return 200, body
+        return 404, {}
+
+    def matchbook(self, path, query):
+        parts = [part for part in path.split('/') if part]
+        now = time.time()
+        if parts == ['lookups', 'events']:
+            sport_ids = {matchbook_id: sport for sport, matchbook_id in SPORTS.items()}
+            sport = sport_ids.get(int(query['sport-ids'])) if 'sport-ids' in query else None
+            events = self.events.get(sport, []) if sport else \
+                [event for events in self.events.values() for event in events]
+            offset = int(query.get('offset', 0))
+            per_page = int(query.get('per-page', 20))
+            return 200, {'total': len(events), 'offset': offset, 'per-page': per_page,
+                         'events': [{'id': event['matchbook_id'], 'name': event['matchbook_name'],
+                                     'sport-id': SPORTS[event['sport']], 'in-running-flag': True,
+                                     'start': event['start']} for event in events[offset:offset + per_page]]}
+        if len(parts) == 3 and parts[0] == 'events' and parts[2] == 'markets' and parts[1].isdigit():
+            markets = self.event_markets.get(('matchbook', int(parts[1])), [])
+            return 200, {'markets': [{'id': market.matchbook_id, 'name': market.matchbook_name, 'status': 'open',
+                                      'event-id': int(parts[1])} for market in markets]}
+        if len(parts) == 3 and parts[0] == 'markets' and parts[2] == 'runners' and parts[1].isdigit():
+            market = self.matchbook_markets.get(int(parts[1]))
+            if market is None:
+                return 404, {}
+            levels = self.back_levels(market, 'matchbook', now)
+            return 200, {'runners': [
+                {'id': runner_id, 'name': name, 'status': 'open',
+                 'prices': [{'side': 'back', 'odds': round(odds, 2), 'available-amount': available}
+                            for odds, available in runner_levels]}
+                for runner_id, name, runner_levels in zip(market.runner_ids, market.outcomes, levels)]}
+        return 404, {}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    simulator = None
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self, method):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length) or b'null') if length else None
+        status, body = self.simulator.handle(method, url.path, query, self.headers, payload)
+
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._respond('GET')
+
+    def do_POST(self):
+        self._respond('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated Smarkets/Matchbook exchange for load testing")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--events', type=int, default=100, help="Live events per sport")
+    parser.add_argument('--perturbation', type=float, default=0.3)
+    parser.add_argument('--latency', type=float, default=0.0, help="Mean seconds per request")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--arbitrage-rate', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    simulator = ExchangeSimulator(args.events, perturbation=args.perturbation, latency=args.latency,
+                                  error_rate=args.error_rate, arbitrage_rate=args.arbitrage_rate, seed=args.seed)
+    server = simulator.start(port=args.port)
+    smarkets_url, matchbook_url = simulator.base_urls(server)
+    print(f"Smarkets: {smarkets_url}\nMatchbook: {matchbook_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
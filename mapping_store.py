@@ -0,0 +1,159 @@
+import sqlite3
+import threading
+import time
+
+LEVELS = ('event', 'market', 'selection')
+EXCHANGES = ('smarkets', 'matchbook')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS links (
+    level TEXT NOT NULL,
+    smarkets_id TEXT NOT NULL,
+    matchbook_id TEXT NOT NULL,
+    outcome_key TEXT,
+    created REAL NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (level, smarkets_id)
+);
+CREATE INDEX IF NOT EXISTS links_matchbook ON links (level, matchbook_id);
+CREATE INDEX IF NOT EXISTS links_expires ON links (expires);
+'''
+
+
+class MappingStore:
+    """Confirmed Smarkets <-> Matchbook ID links, persisted in SQLite.
+
+    Event, market and selection links are kept for the life of a fixture, so
+    later scans pair known IDs directly instead of fuzzy matching them again.
+    Links expire ttl seconds after they were last confirmed or touched, so
+    a link lives as long as scans keep seeing both sides; expired rows are
+    purged on open. All unexpired links are held in memory, so lookups
+    never touch the database. New links, touches and unlinks apply to
+    memory at once and are written in one transaction by flush(), which
+    scans call when they finish and close() calls last.
+    """
+
+    def __init__(self, path='arb_mappings.db', ttl=12 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # (level, smarkets id) -> creation time of a new link, or None for a
+        # changed expiry or a removal, not yet saved
+        self._dirty = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        # level -> exchange -> id -> (partner id, outcome key, expires)
+        self._links = {level: {exchange: {} for exchange in EXCHANGES} for level in LEVELS}
+
+        self.purge_expired()
+        for level, smarkets_id, matchbook_id, outcome_key, expires in self._conn.execute(
+                'SELECT level, smarkets_id, matchbook_id, outcome_key, expires FROM links'):
+            self._remember(level, smarkets_id, matchbook_id, outcome_key, expires)
+
+    def __len__(self):
+        return sum(len(links['smarkets']) for links in self._links.values())
+
+    def _remember(self, level, smarkets_id, matchbook_id, outcome_key, expires):
+        links = self._links[level]
+        # A re-link replaces both sides' previous partners
+        for exchange, item_id in (('smarkets', smarkets_id), ('matchbook', matchbook_id)):
+            previous = links[exchange].pop(item_id, None)
+            if previous is not None:
+                other = 'matchbook' if exchange == 'smarkets' else 'smarkets'
+                links[other].pop(previous[0], None)
+        links['smarkets'][smarkets_id] = (matchbook_id, outcome_key, expires)
+        links['matchbook'][matchbook_id] = (smarkets_id, outcome_key, expires)
+
+    def _lookup(self, level, exchange, item_id):
+        link = self._links[level][exchange].get(str(item_id))
+        if link is not None and link[2] < time.time():
+            link = None
+        if link is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return link
+
+    def partner(self, level, exchange, item_id):
+        """ID of the linked item on the other exchange (as a string), or None"""
+        link = self._lookup(level, exchange, item_id)
+        return link[0] if link else None
+
+    def outcome_key(self, exchange, selection_id):
+        """Shared outcome key of a linked selection, or None"""
+        link = self._lookup('selection', exchange, selection_id)
+        return link[1] if link else None
+
+    def link(self, level, smarkets_id, matchbook_id, outcome_key=None):
+        """Record a confirmed pair, replacing any earlier link of either ID"""
+        smarkets_id, matchbook_id = str(smarkets_id), str(matchbook_id)
+        now = time.time()
+        with self._lock:
+            self._remember(level, smarkets_id, matchbook_id, outcome_key, now + self.ttl)
+            self._dirty[(level, smarkets_id)] = now
+
+    def touch(self, level, exchange, item_id):
+        """Restart the TTL of a link that was seen again; returns False if there is none"""
+        with self._lock:
+            links = self._links[level]
+            link = links[exchange].get(str(item_id))
+            if link is None:
+                return False
+            expires = time.time() + self.ttl
+            other = 'matchbook' if exchange == 'smarkets' else 'smarkets'
+            links[exchange][str(item_id)] = (link[0], link[1], expires)
+            links[other][link[0]] = (str(item_id), link[1], expires)
+            self._dirty.setdefault((level, str(item_id) if exchange == 'smarkets' else link[0]), None)
+        return True
+
+    def unlink(self, level, exchange, item_id):
+        """Forget a link that turned out stale, e.g. because one side has settled"""
+        with self._lock:
+            links = self._links[level]
+            link = links[exchange].pop(str(item_id), None)
+            if link is None:
+                return
+            other = 'matchbook' if exchange == 'smarkets' else 'smarkets'
+            links[other].pop(link[0], None)
+            self._dirty[(level, str(item_id) if exchange == 'smarkets' else link[0])] = None
+
+    def flush(self):
+        """Save every link, expiry and removal since the last flush in one transaction"""
+        with self._lock:
+            if not self._dirty:
+                return
+            for (level, smarkets_id), created in self._dirty.items():
+                link = self._links[level]['smarkets'].get(smarkets_id)
+                if link is None:
+                    self._conn.execute('DELETE FROM links WHERE level = ? AND smarkets_id = ?', (level, smarkets_id))
+                elif created is None:
+                    self._conn.execute('UPDATE links SET expires = ? WHERE level = ? AND smarkets_id = ?',
+                                       (link[2], level, smarkets_id))
+                else:
+                    # A re-link replaces the Matchbook side's earlier partner too
+                    self._conn.execute('DELETE FROM links WHERE level = ? AND matchbook_id = ? AND smarkets_id != ?',
+                                       (level, link[0], smarkets_id))
+                    self._conn.execute('INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?, ?, ?)',
+                                       (level, smarkets_id, link[0], link[1], created, link[2]))
+            self._dirty.clear()
+            self._conn.commit()
+
+    def purge_expired(self):
+        """Delete settled links; returns the number removed"""
+        self.flush()
+        now = time.time()
+        with self._lock:
+            removed = self._conn.execute('DELETE FROM links WHERE expires < ?', (now,)).rowcount
+            self._conn.commit()
+            for links in self._links.values():
+                for exchange_links in links.values():
+                    for item_id in [item_id for item_id, link in exchange_links.items() if link[2] < now]:
+                        del exchange_links[item_id]
+        return removed
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
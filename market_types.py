@@ -0,0 +1,130 @@
+import re
+from functools import lru_cache
+
+# Checked before periods are read, or it would become a half-time market
+_HALF_TIME_FULL_TIME = re.compile(r'half[\s-]*time\s*/\s*full[\s-]*time|\bht\s*/\s*ft\b')
+
+# Market types, most specific first: the first pattern that matches a name
+# wins, so "Match Handicap" is a handicap and never collides with match odds
+MARKET_TYPES = tuple((market_type, re.compile(pattern)) for market_type, pattern in (
+    ('correct_score', r'correct score'),
+    ('both_teams_to_score', r'both teams to score|\bbtts\b'),
+    ('draw_no_bet', r'draw no bet'),
+    ('double_chance', r'double chance'),
+    ('handicap', r'handicap|spread|\bline\b'),
+    ('total', r'total|over\s*/?\s*under|\bover\b|\bunder\b'),
+    ('match_odds', r'match odds|winner|\bresult\b|to win|moneyline|money line|\bmatch\b'),
+))
+
+_ORDINALS = {'first': 1, '1st': 1, 'second': 2, '2nd': 2, 'third': 3, '3rd': 3,
+             'fourth': 4, '4th': 4, 'fifth': 5, '5th': 5}
+_ORDINAL = r'(?P<ordinal>first|second|third|fourth|fifth|1st|2nd|3rd|4th|5th)'
+
+# Periods, also most specific first; the matched text is removed before the
+# line is read so "Set 1" or "2nd Half" is never taken for a line
+PERIODS = tuple((period, re.compile(pattern)) for period, pattern in (
+    ('set', r'\bset (?P<number>\d)\b|' + _ORDINAL + r' set\b'),
+    ('quarter', r'\bquarter (?P<number>\d)\b|\bq(?P<short>[1-4])\b|' + _ORDINAL + r' quarter\b'),
+    ('half', _ORDINAL + r' half\b|(?P<half_time>\bhalf[\s-]*time\b)'),
+))
+
+# What a total or handicap counts; a line on goals never pairs with the same
+# line on corners
+SUBJECTS = tuple((subject, re.compile(pattern)) for subject, pattern in (
+    ('corners', r'\bcorners?\b'),
+    ('cards', r'\bcards?\b|\bbookings?\b'),
+    ('goals', r'\bgoals?\b'),
+    ('points', r'\bpoints?\b|\bpts\b'),
+    ('games', r'\bgames?\b'),
+    ('sets', r'\bsets?\b'),
+))
+
+# Subject of a total or handicap whose name does not say, e.g. Smarkets'
+# football "Over/under 2.5", by sport name or Matchbook sport ID
+DEFAULT_SUBJECTS = {'football': 'goals', 'soccer': 'goals', '11': 'goals',
+                    'basketball': 'points', '18': 'points',
+                    'tennis': 'games', '325': 'games'}
+
+_LINE = re.compile(r'(?<![\w.])[+-]?\d+(?:\.\d+)?(?![\w.])')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _period(name):
+    """(period label, name with the period text removed)"""
+    for period, pattern in PERIODS:
+        match = pattern.search(name)
+        if not match:
+            continue
+        groups = match.groupdict()
+        if groups.get('half_time'):
+            number = 1
+        elif groups.get('ordinal'):
+            number = _ORDINALS[groups['ordinal']]
+        else:
+            number = int(groups.get('number') or groups.get('short'))
+        return f'{period}_{number}', name[:match.start()] + ' ' + name[match.end():]
+    return 'full', name
+
+
+def _subject(name, sport):
+    for subject, pattern in SUBJECTS:
+        if pattern.search(name):
+            return subject
+    return DEFAULT_SUBJECTS.get(str(sport))
+
+
+@lru_cache(maxsize=4096)
+def classify_market(name, sport=None):
+    """Canonical (type, line, period) key for a market name.
+
+    Lines are kept only for totals and handicaps, whose type also names what
+    they count ('total_goals', 'handicap_points'); when the name does not
+    say, the sport's usual subject is assumed. Names that match no known
+    type, and totals or handicaps of unknown subject, key on their
+    normalised text, so identical names still group.
+    """
+    name = _WHITESPACE.sub(' ', (name or '').lower()).strip()
+
+    if _HALF_TIME_FULL_TIME.search(name):
+        return 'half_time_full_time', None, 'full'
+
+    period, rest = _period(name)
+    for market_type, pattern in MARKET_TYPES:
+        if pattern.search(rest):
+            line = None
+            if market_type in ('total', 'handicap'):
+                subject = _subject(rest, sport)
+                if subject is None:
+                    break
+                market_type = f'{market_type}_{subject}'
+                match = _LINE.search(rest)
+                if match:
+                    line = float(match.group())
+            return market_type, line, period
+
+    return 'other:' + name, None, period
+
+
+def group_markets(markets):
+    """Group markets of the same canonical type across exchanges.
+
+    Markets are bucketed by classify_market key, read with their event's
+    sport, in one pass. A bucket with
+    several markets from one exchange is split so each group holds at most
+    one market per exchange; only groups spanning exchanges are returned.
+    """
+    buckets = {}
+    for market in markets:
+        per_exchange = buckets.setdefault(classify_market(market.name, market.event.sport), {})
+        per_exchange.setdefault(market.exchange, []).append(market)
+
+    groups = []
+    for per_exchange in buckets.values():
+        if len(per_exchange) < 2:
+            continue
+        for i in range(max(len(exchange_markets) for exchange_markets in per_exchange.values())):
+            group = [exchange_markets[i] for exchange_markets in per_exchange.values()
+                     if i < len(exchange_markets)]
+            if len(group) > 1:
+                groups.append(group)
+    return groups
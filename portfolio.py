@@ -0,0 +1,311 @@
+import argparse
+import csv
+import json
+
+import numpy as np
+
+from bs_pricer import black_scholes_vectorized, greeks_vectorized
+
+GREEK_NAMES = ('Delta', 'Gamma', 'Theta', 'Vega', 'Rho')
+
+
+def load_positions(path):
+    """Load positions from a CSV or JSON file.
+
+    Each position needs id, underlying, type ('Call'/'Put'), strike,
+    expiry (years), volatility and quantity; r and q are optional
+    per-position overrides.
+    """
+    if path.lower().endswith('.json'):
+        with open(path) as f:
+            rows = json.load(f)
+    else:
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+
+    positions = []
+    for row in rows:
+        position = {
+            'id': str(row['id']),
+            'underlying': str(row['underlying']).upper(),
+            'type': str(row.get('type', 'Call')).capitalize(),
+            'strike': float(row['strike']),
+            'expiry': float(row['expiry']),
+            'volatility': float(row['volatility']),
+            'quantity': float(row['quantity'])
+        }
+        for optional in ('r', 'q'):
+            if row.get(optional) not in (None, ''):
+                position[optional] = float(row[optional])
+        positions.append(position)
+    return positions
+
+
+class Portfolio:
+    """Position book with position-weighted Greeks and scenario grids.
+
+    Contract inputs are held column-wise so every pricing pass is a single
+    broadcasted call into the vectorized engines. Per-contract prices and
+    Greeks are cached, and only rows touched since the last call (changed
+    quantities, new positions, moved spots) are re-priced.
+    """
+
+    def __init__(self, spots=None, r=0.05, q=0.0, multiplier=100, capacity=64):
+        self.spots = {u.upper(): float(s) for u, s in (spots or {}).items()}
+        self.r = r
+        self.q = q
+        self.multiplier = multiplier
+
+        self._rows = {}          # position id -> row
+        self._row_ids = []       # row -> position id (None for free slots)
+        self._free_rows = []
+        self._size = 0
+        self._dirty = set()
+
+        self._cols = {}
+        self._allocate(capacity)
+
+        self._grid_cache = None
+
+    def _allocate(self, capacity):
+        fields = {
+            'underlying': object, 'K': float, 'T': float, 'sigma': float, 'r': float,
+            'q': float, 'is_call': bool, 'qty': float, 'price': float
+        }
+        old_capacity = len(self._row_ids)
+        for name, dtype in fields.items():
+            column = np.zeros(capacity, dtype=dtype)
+            if name in self._cols:
+                column[:old_capacity] = self._cols[name]
+            self._cols[name] = column
+
+        greeks = np.zeros((capacity, len(GREEK_NAMES)))
+        if 'greeks' in self._cols:
+            greeks[:old_capacity] = self._cols['greeks']
+        self._cols['greeks'] = greeks
+
+        self._row_ids.extend([None] * (capacity - old_capacity))
+
+    @classmethod
+    def from_file(cls, path, spots, **kwargs):
+        portfolio = cls(spots, **kwargs)
+        portfolio.add_positions(load_positions(path))
+        return portfolio
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add_positions(self, positions):
+        for position in positions:
+            self.add_position(**position)
+
+    def add_position(self, id, underlying, type, strike, expiry, volatility, quantity, r=None, q=None):
+        if id in self._rows:
+            raise ValueError(f"Duplicate position id: {id}")
+
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            if self._size == len(self._row_ids):
+                self._allocate(max(2 * self._size, 64))
+            row = self._size
+            self._size += 1
+
+        cols = self._cols
+        cols['underlying'][row] = underlying.upper()
+        cols['K'][row] = strike
+        cols['T'][row] = expiry
+        cols['sigma'][row] = volatility
+        cols['r'][row] = self.r if r is None else r
+        cols['q'][row] = self.q if q is None else q
+        cols['is_call'][row] = type.capitalize() == 'Call'
+        cols['qty'][row] = quantity
+
+        self._rows[id] = row
+        self._row_ids[row] = id
+        self._dirty.add(row)
+
+    def update_quantity(self, position_id, quantity):
+        # Quantity does not change per-contract values, so there is nothing
+        # to re-price; the row is only marked for the scenario grid delta.
+        row = self._rows[position_id]
+        self._cols['qty'][row] = quantity
+        self._mark_grid_changed([row])
+
+    def remove_position(self, position_id):
+        row = self._rows.pop(position_id)
+        self._cols['qty'][row] = 0.0
+        self._row_ids[row] = None
+        self._free_rows.append(row)
+        self._dirty.discard(row)
+        self._mark_grid_changed([row])
+
+    def set_spot(self, underlying, spot):
+        underlying = underlying.upper()
+        self.spots[underlying] = float(spot)
+        active = self._active_rows()
+        self._dirty.update(active[self._cols['underlying'][active] == underlying].tolist())
+
+    def _active_rows(self):
+        return np.array(sorted(self._rows.values()), dtype=int)
+
+    def _spot_column(self, rows):
+        underlyings = self._cols['underlying'][rows]
+        try:
+            return np.array([self.spots[u] for u in underlyings], dtype=float)
+        except KeyError as e:
+            raise KeyError(f"No spot price for underlying {e.args[0]}") from None
+
+    def _mark_grid_changed(self, rows):
+        if self._grid_cache is not None:
+            self._grid_cache['changed'].update(rows)
+
+    def _refresh(self):
+        """Re-price rows whose contract inputs or spot changed."""
+        if not self._dirty:
+            return
+        rows = np.array(sorted(self._dirty), dtype=int)
+        cols = self._cols
+        args = (self._spot_column(rows), cols['K'][rows], cols['r'][rows], cols['sigma'][rows],
+                cols['T'][rows], cols['q'][rows], cols['is_call'][rows])
+
+        cols['price'][rows] = black_scholes_vectorized(*args)
+        greeks = greeks_vectorized(*args)
+        cols['greeks'][rows] = np.column_stack([greeks[name] for name in GREEK_NAMES])
+
+        self._mark_grid_changed(rows.tolist())
+        self._dirty.clear()
+
+    def greeks(self):
+        """Position-weighted Greeks, in total and per underlying."""
+        self._refresh()
+        rows = self._active_rows()
+        weights = self._cols['qty'][rows] * self.multiplier
+        weighted = self._cols['greeks'][rows] * weights[:, None]
+        underlyings = self._cols['underlying'][rows]
+
+        by_underlying = {}
+        for underlying in sorted(set(underlyings)):
+            totals = weighted[underlyings == underlying].sum(axis=0)
+            by_underlying[underlying] = dict(zip(GREEK_NAMES, totals.tolist()))
+
+        return {
+            'total': dict(zip(GREEK_NAMES, weighted.sum(axis=0).tolist())),
+            'by_underlying': by_underlying,
+            'market_value': float(np.dot(self._cols['price'][rows], weights))
+        }
+
+    def _scenario_pnl(self, rows, snapshot, spot_shocks, vol_shocks, time_shifts, chunk_size):
+        """P&L over the full grid for the given rows, shape (spot, vol, time)."""
+        spot_axis = (1.0 + spot_shocks)[:, None, None, None]
+        vol_axis = vol_shocks[None, :, None, None]
+        time_axis = (time_shifts / 365.0)[None, None, :, None]
+
+        pnl = np.zeros((len(spot_shocks), len(vol_shocks), len(time_shifts)))
+        for start in range(0, len(rows), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            S = snapshot['S'][chunk] * spot_axis
+            K = snapshot['K'][chunk]
+            sigma = np.maximum(snapshot['sigma'][chunk] + vol_axis, 1e-4)
+            T = snapshot['T'][chunk] - time_axis
+            is_call = snapshot['is_call'][chunk]
+
+            shocked = black_scholes_vectorized(S, K, snapshot['r'][chunk], sigma, T,
+                                               snapshot['q'][chunk], is_call)
+            intrinsic = np.maximum(np.where(is_call, S - K, K - S), 0.0)
+            shocked = np.where(T > 0, shocked, intrinsic)
+
+            weights = snapshot['qty'][chunk] * self.multiplier
+            pnl += ((shocked - snapshot['price'][chunk]) * weights).sum(axis=-1)
+        return pnl
+
+    def _snapshot(self, rows):
+        cols = self._cols
+        active = np.array([self._row_ids[row] is not None for row in rows], dtype=bool)
+        snapshot = {name: cols[name][rows].copy() for name in ('K', 'T', 'sigma', 'r', 'q', 'is_call', 'price')}
+        snapshot['qty'] = np.where(active, cols['qty'][rows], 0.0)
+        snapshot['S'] = np.ones(len(rows))
+        if active.any():
+            snapshot['S'][active] = self._spot_column(rows[active])
+        return snapshot
+
+    def scenario_grid(self, spot_shocks, vol_shocks, time_shifts, chunk_size=None, incremental=True):
+        """Portfolio P&L for every spot-shock x vol-shock x time-shift scenario.
+
+        spot_shocks are relative moves (0.05 = +5%), vol_shocks absolute
+        volatility moves and time_shifts calendar days forward. When the axes
+        match the previous call, only positions changed since then are
+        re-evaluated and applied as a delta to the cached grid.
+        """
+        spot_shocks = np.asarray(spot_shocks, dtype=float)
+        vol_shocks = np.asarray(vol_shocks, dtype=float)
+        time_shifts = np.asarray(time_shifts, dtype=float)
+        grid_size = len(spot_shocks) * len(vol_shocks) * len(time_shifts)
+        if chunk_size is None:
+            chunk_size = max(1, 2_000_000 // max(grid_size, 1))
+
+        self._refresh()
+        key = (spot_shocks.tobytes(), vol_shocks.tobytes(), time_shifts.tobytes())
+        cache = self._grid_cache
+        axes = (spot_shocks, vol_shocks, time_shifts)
+
+        if (incremental and cache is not None and cache['key'] == key and
+                len(cache['snapshot']['K']) == len(self._row_ids)):
+            changed = np.array(sorted(cache['changed']), dtype=int)
+            if len(changed) < len(self._row_ids) // 4:
+                if len(changed):
+                    old = {name: column[changed] for name, column in cache['snapshot'].items()}
+                    new = self._snapshot(changed)
+                    cache['pnl'] += (self._scenario_pnl(changed, new, *axes, chunk_size) -
+                                     self._scenario_pnl(changed, old, *axes, chunk_size))
+                    for name, column in cache['snapshot'].items():
+                        column[changed] = new[name]
+                    cache['changed'].clear()
+                return self._grid_result(cache['pnl'], *axes)
+
+        rows = np.arange(len(self._row_ids))
+        snapshot = self._snapshot(rows)
+        pnl = self._scenario_pnl(rows, snapshot, *axes, chunk_size)
+        self._grid_cache = {'key': key, 'pnl': pnl, 'snapshot': snapshot, 'changed': set()}
+        return self._grid_result(pnl, *axes)
+
+    def _grid_result(self, pnl, spot_shocks, vol_shocks, time_shifts):
+        worst = np.unravel_index(np.argmin(pnl), pnl.shape)
+        return {
+            'pnl': pnl.copy(),
+            'spot_shocks': spot_shocks,
+            'vol_shocks': vol_shocks,
+            'time_shifts': time_shifts,
+            'worst_case': {
+                'pnl': float(pnl[worst]),
+                'spot_shock': float(spot_shocks[worst[0]]),
+                'vol_shock': float(vol_shocks[worst[1]]),
+                'time_shift': float(time_shifts[worst[2]])
+            }
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio Greeks and scenario grid")
+    parser.add_argument('positions', help="CSV or JSON positions file")
+    parser.add_argument('--spot', action='append', default=[], metavar='SYMBOL=PRICE',
+                        help="Spot price per underlying (repeatable)")
+    parser.add_argument('--rate', type=float, default=0.05)
+    parser.add_argument('--dividend', type=float, default=0.0)
+    args = parser.parse_args()
+
+    spots = dict(item.split('=', 1) for item in args.spot)
+    portfolio = Portfolio.from_file(args.positions, spots, r=args.rate, q=args.dividend)
+
+    risk = portfolio.greeks()
+    print(f"Positions: {len(portfolio)}  Market value: ${risk['market_value']:,.2f}")
+    for greek, value in risk['total'].items():
+        print(f"  {greek:<6} {value:>14,.2f}")
+
+    grid = portfolio.scenario_grid(np.linspace(-0.2, 0.2, 9), np.linspace(-0.1, 0.1, 5), [0, 7, 30])
+    worst = grid['worst_case']
+    print(f"Worst scenario: ${worst['pnl']:,.2f} (spot {worst['spot_shock']:+.0%}, "
+          f"vol {worst['vol_shock']:+.2f}, +{worst['time_shift']:.0f}d)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import time
+
+import numpy as np
+
+from arbitrage_engine import evaluate_prices
+
+EXCHANGES = ('matchbook', 'smarkets')
+_COLUMNS = {exchange: j for j, exchange in enumerate(EXCHANGES)}
+
+# Latest back price for one selection on one exchange; odds 0 means no quote
+QUOTE_DTYPE = np.dtype([('odds', 'f8'), ('available', 'f8'), ('updated', 'f8'),
+                        ('selection', 'O'), ('ladder', 'O')])
+
+
+class MarketBook:
+    """Quotes for one cross-exchange market, one row per outcome.
+
+    quotes is an (outcomes, exchanges) structured array of QUOTE_DTYPE, so
+    an update writes one cell and evaluation reads the odds column directly.
+    """
+    __slots__ = ('key', 'info', 'outcome_count', 'rows', 'quotes', 'opportunity', 'updated')
+
+    def __init__(self, key, info):
+        self.key = key
+        self.info = info
+        self.outcome_count = 0
+        self.rows = {}          # outcome key -> row
+        self.quotes = np.zeros((0, len(EXCHANGES)), QUOTE_DTYPE)
+        self.opportunity = None
+        self.updated = 0.0
+
+    def row(self, outcome):
+        row = self.rows.get(outcome)
+        if row is None:
+            row = self.rows[outcome] = len(self.quotes)
+            self.quotes = np.concatenate([self.quotes, np.zeros((1, len(EXCHANGES)), QUOTE_DTYPE)])
+        return row
+
+
+class PriceBook:
+    """In-memory cross-exchange price book keyed by (market, outcome, exchange).
+
+    Applying a market's quotes re-evaluates only that market, so the cost of
+    an update does not grow with the size of the book. A new or changed
+    opportunity is returned and passed to on_opportunity straight away;
+    its market_key identifies the market across updates.
+    """
+
+    def __init__(self, commission=None, max_stake=1000, max_implied_prob=0.98, min_liquidity=0,
+                 on_opportunity=None):
+        self.commission = commission or {}
+        self.max_stake = max_stake
+        self.max_implied_prob = max_implied_prob
+        self.min_liquidity = min_liquidity
+        self.on_opportunity = on_opportunity
+        self.markets = {}
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.markets)
+
+    def update_market(self, key, quotes, info=None, outcome_count=None, snapshot_exchanges=()):
+        """Apply quotes for one market and re-evaluate it.
+
+        quotes is an iterable of (outcome key, exchange, selection, odds,
+        available, ladder); ladder may be None for a single price level.
+        For exchanges in snapshot_exchanges the quotes are the complete
+        book, so earlier quotes they no longer include are cleared. info
+        (event, market and sport names) is merged into opportunities.
+        Returns the market's opportunity, or None.
+        """
+        market = self.markets.get(key)
+        if market is None:
+            market = self.markets[key] = MarketBook(key, info or {})
+        elif info:
+            market.info = info
+
+        for exchange in snapshot_exchanges:
+            market.quotes[:, _COLUMNS[exchange]] = (0.0, 0.0, 0.0, None, None)
+
+        now = time.time()
+        for outcome, exchange, selection, odds, available, ladder in quotes:
+            row = market.row(outcome)
+            column = _COLUMNS[exchange]
+            if ladder is None:
+                ladder = np.array([[float(odds), float(available)]])
+            ladder = ladder[ladder[:, 1] > 0]
+            market.quotes[row, column] = (float(odds), float(available), now, selection, ladder)
+            self.updates += 1
+        if outcome_count:
+            market.outcome_count = outcome_count
+        market.updated = now
+
+        return self._evaluate(market)
+
+    def _evaluate(self, market):
+        previous = market.opportunity
+        opportunity = None
+        if len(market.rows) >= market.outcome_count:
+            quotes = market.quotes
+            best_odds = np.where(quotes['available'] >= self.min_liquidity, quotes['odds'], 0.0)
+            opportunity = evaluate_prices(best_odds, EXCHANGES,
+                                          lambda i, j: (quotes[i, j]['selection'], quotes[i, j]['ladder']),
+                                          self.commission, self.max_stake, self.max_implied_prob)
+
+        if opportunity is not None:
+            opportunity.update(market.info)
+            opportunity['market_key'] = market.key
+        market.opportunity = opportunity
+
+        if opportunity is not None and opportunity != previous and self.on_opportunity:
+            self.on_opportunity(opportunity)
+        return opportunity
+
+    def remove_market(self, key):
+        self.markets.pop(key, None)
+
+    def expire(self, max_age):
+        """Drop markets not updated within max_age seconds; returns how many"""
+        cutoff = time.time() - max_age
+        stale = [key for key, market in self.markets.items() if market.updated < cutoff]
+        for key in stale:
+            del self.markets[key]
+        return len(stale)
+
+    def opportunities(self, max_age=None):
+        """Current opportunities, optionally only from markets updated within max_age seconds"""
+        now = time.time()
+        return [market.opportunity for market in self.markets.values()
+                if market.opportunity is not None and (max_age is None or now - market.updated <= max_age)]
@@ -0,0 +1,85 @@
+_interned = {}
+
+
+def intern_id(value):
+    """The one shared copy of an exchange or sport identifier (str or int)"""
+    return _interned.setdefault(value, value)
+
+
+class Event:
+    """A live event on one exchange"""
+    __slots__ = ('exchange', 'id', 'name', 'sport', 'start_time')
+
+    def __init__(self, exchange, id, name, sport, start_time=None):
+        self.exchange = intern_id(exchange)
+        self.id = id
+        self.name = name
+        self.sport = intern_id(sport)
+        self.start_time = start_time
+
+    def __repr__(self):
+        return f"Event({self.exchange!r}, {self.id!r}, {self.name!r})"
+
+
+class Market:
+    """An open market on one exchange; event and sport come from its Event rather than copies"""
+    __slots__ = ('exchange', 'id', 'name', 'event')
+
+    def __init__(self, exchange, id, name, event):
+        self.exchange = intern_id(exchange)
+        self.id = id
+        self.name = name
+        self.event = event
+
+    @property
+    def key(self):
+        """(exchange, market ID as str), as used in price book and watch keys"""
+        return self.exchange, str(self.id)
+
+    def __repr__(self):
+        return f"Market({self.exchange!r}, {self.id!r}, {self.name!r})"
+
+
+class Quote:
+    """Best back price and price ladder for one selection of a market, as fetched.
+
+    selection_id is the Smarkets contract or Matchbook runner ID, outcomes
+    the number of open selections in the market, and fetched the time the
+    response arrived (set when the quote is tagged with its market).
+    """
+    __slots__ = ('exchange', 'selection', 'selection_id', 'odds', 'available', 'ladder', 'outcomes',
+                 'market', 'fetched')
+
+    def __init__(self, exchange, selection, selection_id, odds, available, ladder=None, outcomes=0):
+        self.exchange = intern_id(exchange)
+        self.selection = selection
+        self.selection_id = selection_id
+        self.odds = odds
+        self.available = available
+        self.ladder = ladder
+        self.outcomes = outcomes
+        self.market = None
+        self.fetched = None
+
+    def __repr__(self):
+        return f"Quote({self.exchange!r}, {self.selection!r}, {self.odds!r}, {self.available!r})"
+
+
+class WatchedGroup:
+    """A matched cross-exchange market group that continuous scanning re-polls.
+
+    key is the group's sorted (exchange, market ID) pairs, shared with its
+    price book entry. digest fingerprints the last evaluated prices,
+    implied is their best total implied probability, and opportunities
+    what they last produced.
+    """
+    __slots__ = ('key', 'markets', 'polled', 'discovered', 'digest', 'implied', 'opportunities')
+
+    def __init__(self, key, markets):
+        self.key = key
+        self.markets = markets
+        self.polled = 0.0
+        self.discovered = 0.0
+        self.digest = None
+        self.implied = float('inf')
+        self.opportunities = []
@@ -0,0 +1,110 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Endpoint classes, checked in order against the URL path, with default TTLs
+# in seconds. Metadata changes rarely; prices are never served from cache by
+# default, but concurrent identical price requests still share one fetch.
+ENDPOINT_CLASSES = (
+    ('prices', re.compile(r'/quotes/?$|/runners/?$')),
+    ('contracts', re.compile(r'/contracts/?$')),
+    ('markets', re.compile(r'/events/[^/]+/markets/?$')),
+    ('events', re.compile(r'/events/?$')),
+)
+DEFAULT_TTLS = {'events': 30.0, 'markets': 300.0, 'contracts': 3600.0, 'prices': 0.0}
+
+
+def endpoint_class(url):
+    """Name of the endpoint class a URL belongs to, or None"""
+    path = url.split('?', 1)[0]
+    for name, pattern in ENDPOINT_CLASSES:
+        if pattern.search(path):
+            return name
+    return None
+
+
+class ResponseCache:
+    """TTL cache for GET responses, tiered by endpoint class.
+
+    Successful responses are kept for their class's TTL, up to max_entries
+    in least-recently-used order. Concurrent callers asking for the same
+    URL while a fetch is in flight wait for that fetch instead of issuing
+    their own, so an expiring entry never triggers a stampede. URLs that
+    match no class (logins, account calls) pass straight through.
+    """
+
+    def __init__(self, ttls=None, max_entries=2048):
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (expires, response)
+        self._in_flight = {}            # key -> Future
+        self._lock = threading.Lock()
+        self.stats = {name: {'hits': 0, 'misses': 0, 'coalesced': 0} for name, _ in ENDPOINT_CLASSES}
+        self.evictions = 0
+
+    def get(self, session, url, params=None, **kwargs):
+        """session.get(url, params=params, **kwargs), served from cache when fresh"""
+        endpoint = endpoint_class(url)
+        if endpoint is None:
+            return session.get(url, params=params, **kwargs)
+
+        key = (url, tuple(sorted((params or {}).items())))
+        stats = self.stats[endpoint]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                stats['hits'] += 1
+                return entry[1]
+
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = Future()
+                stats['misses'] += 1
+            else:
+                stats['coalesced'] += 1
+
+        if not leader:
+            return flight.result()
+
+        try:
+            response = session.get(url, params=params, **kwargs)
+        except Exception as e:
+            with self._lock:
+                del self._in_flight[key]
+            flight.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+            ttl = self.ttls.get(endpoint, 0.0)
+            if ttl > 0 and response.status_code == 200:
+                self._entries[key] = (time.monotonic() + ttl, response)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        flight.set_result(response)
+        return response
+
+    def invalidate(self, endpoint=None):
+        """Drop cached responses, all or just one endpoint class"""
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if endpoint_class(key[0]) == endpoint]:
+                    del self._entries[key]
+
+    def hit_rates(self):
+        """Per endpoint class: requests, hits, coalesced waits and hit rate"""
+        rates = {}
+        with self._lock:
+            for name, stats in self.stats.items():
+                requests = stats['hits'] + stats['misses'] + stats['coalesced']
+                rates[name] = dict(stats, requests=requests,
+                                   hit_rate=(stats['hits'] + stats['coalesced']) / requests if requests else 0.0)
+        return rates
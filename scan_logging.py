@@ -0,0 +1,56 @@
+import logging
+import sys
+import threading
+
+FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+
+# Scanner modules that log; each has its own logger named after the module
+MODULES = ('arb_scanner', 'arb_daemon', 'transport', 'response_cache', 'scan_metrics', 'traffic_capture')
+
+
+class SampledDebugFilter(logging.Filter):
+    """Pass every record above DEBUG, but only one in every `every` DEBUG records per call site"""
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = every
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.every <= 1:
+            return True
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            seen = self._counts.get(key, 0)
+            self._counts[key] = seen + 1
+        return seen % self.every == 0
+
+
+_handler = None
+
+
+def configure_logging(level='INFO', module_levels=None, debug_sample_every=1, stream=None):
+    """Send scanner logs to stream (stderr by default).
+
+    level applies to every scanner module unless module_levels gives that
+    module its own, e.g. {'transport': 'DEBUG'}. debug_sample_every > 1
+    keeps only every n-th DEBUG record from each call site. Messages are
+    formatted lazily, so calls below a logger's level cost no formatting.
+    Calling this again replaces the previous configuration.
+    """
+    global _handler
+    root = logging.getLogger()
+    if _handler is not None:
+        root.removeHandler(_handler)
+
+    _handler = logging.StreamHandler(stream or sys.stderr)
+    _handler.setFormatter(logging.Formatter(FORMAT, '%H:%M:%S'))
+    if debug_sample_every > 1:
+        _handler.addFilter(SampledDebugFilter(debug_sample_every))
+    root.addHandler(_handler)
+
+    module_levels = module_levels or {}
+    for name in set(MODULES) | set(module_levels):
+        module_level = module_levels.get(name, level)
+        logging.getLogger(name).setLevel(module_level.upper() if isinstance(module_level, str) else module_level)
@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds in seconds; the last bucket is unbounded
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+AGE_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+# Pipeline stages timed per call: event and market list fetches, event
+# matching, market grouping, odds fetches, arbitrage evaluation and whole scans
+STAGES = ('fetch', 'match', 'market_grouping', 'odds', 'arbitrage', 'scan')
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """Bucketed distribution in the Prometheus style, with percentile estimates"""
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q):
+        """Estimate by linear interpolation inside the bucket holding the q-th value"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def summary(self):
+        summary = {'count': self.count, 'sum': round(self.sum, 6),
+                   'mean': round(self.sum / self.count, 6) if self.count else None}
+        for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            value = self.percentile(q)
+            summary[name] = round(value, 6) if value is not None else None
+        return summary
+
+
+class ScanMetrics:
+    """Thread-safe counters and histograms for the scan pipeline.
+
+    Records every HTTP attempt per (exchange, endpoint class) with its
+    status, latency and response size, the time spent in each pipeline
+    stage, the age of the quotes behind each detected opportunity and how
+    long each scan took to find its first one.
+    snapshot() returns everything as a dict; prometheus() renders the
+    Prometheus text format, and start_dump() writes either one to a file
+    periodically.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dump_stop = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.requests = {}      # (exchange, endpoint) -> {'count', 'errors', 'bytes', 'latency'}
+            self.stages = {stage: Histogram(LATENCY_BUCKETS) for stage in STAGES}
+            self.quote_age = Histogram(AGE_BUCKETS)
+            self.first_opportunity = Histogram(LATENCY_BUCKETS)
+            self.opportunities = 0
+
+    def observe_request(self, exchange, endpoint, status, seconds, size=0):
+        """One HTTP attempt; status None means the connection failed"""
+        key = (exchange or 'unknown', endpoint or 'other')
+        with self._lock:
+            stats = self.requests.get(key)
+            if stats is None:
+                stats = self.requests[key] = {'count': 0, 'errors': 0, 'bytes': 0,
+                                              'latency': Histogram(LATENCY_BUCKETS)}
+            stats['count'] += 1
+            stats['errors'] += status is None or status >= 400
+            stats['bytes'] += size
+            stats['latency'].observe(seconds)
+
+    def observe_stage(self, stage, seconds):
+        with self._lock:
+            self.stages[stage].observe(seconds)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one call of a pipeline stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - start)
+
+    def observe_opportunity(self, quote_age):
+        """An opportunity was detected on quotes fetched quote_age seconds ago"""
+        with self._lock:
+            self.opportunities += 1
+            self.quote_age.observe(quote_age)
+
+    def observe_first_opportunity(self, seconds):
+        """The first opportunity of a scan was found seconds after the scan started"""
+        with self._lock:
+            self.first_opportunity.observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            requests = {f'{exchange}.{endpoint}': dict(
+                            {key: value for key, value in stats.items() if key != 'latency'},
+                            latency=stats['latency'].summary())
+                        for (exchange, endpoint), stats in sorted(self.requests.items())}
+            return {
+                'timestamp': time.time(),
+                'uptime': round(time.time() - self.started, 3),
+                'requests': requests,
+                'totals': {
+                    'requests': sum(stats['count'] for stats in self.requests.values()),
+                    'errors': sum(stats['errors'] for stats in self.requests.values()),
+                    'bytes': sum(stats['bytes'] for stats in self.requests.values()),
+                },
+                'stages': {stage: histogram.summary() for stage, histogram in self.stages.items()},
+                'opportunities': self.opportunities,
+                'quote_age': self.quote_age.summary(),
+                'time_to_first_opportunity': self.first_opportunity.summary(),
+            }
+
+    def summary(self):
+        """One-line digest for a status bar"""
+        snapshot = self.snapshot()
+        totals = snapshot['totals']
+        latencies = [stats['latency'] for stats in snapshot['requests'].values()]
+        worst_p95 = max((latency['p95'] for latency in latencies if latency['p95'] is not None), default=None)
+        parts = [f"{totals['requests']} requests ({totals['errors']} errors)",
+                 f"{totals['bytes'] / 1e6:.1f} MB"]
+        if worst_p95 is not None:
+            parts.append(f"worst endpoint p95 {worst_p95 * 1000:.0f}ms")
+        scan = snapshot['stages']['scan']
+        if scan['count']:
+            parts.append(f"scan p50 {scan['p50']:.1f}s")
+        if snapshot['time_to_first_opportunity']['count']:
+            parts.append(f"first opportunity p50 {snapshot['time_to_first_opportunity']['p50']:.1f}s")
+        if snapshot['quote_age']['count']:
+            parts.append(f"quote age p95 {snapshot['quote_age']['p95']:.2f}s")
+        return ' | '.join(parts)
+
+    def prometheus(self, prefix='arb'):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def header(metric, kind, description):
+            lines.append(f'# HELP {prefix}_{metric} {description}')
+            lines.append(f'# TYPE {prefix}_{metric} {kind}')
+
+        def histogram(name, labels, hist):
+            cumulative = 0
+            for bound, count in zip(list(hist.bounds) + ['+Inf'], hist.counts):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(float(bound))
+                lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{le}"}} {cumulative}')
+            suffix = f'{{{labels}}}' if labels else ''
+            lines.append(f'{name}_sum{suffix} {hist.sum}')
+            lines.append(f'{name}_count{suffix} {hist.count}')
+
+        with self._lock:
+            requests = sorted(self.requests.items())
+            for metric, field, description in (
+                    ('requests_total', 'count', 'HTTP attempts to the exchanges'),
+                    ('request_errors_total', 'errors', 'HTTP attempts that failed or returned 4xx/5xx'),
+                    ('response_bytes_total', 'bytes', 'Response body bytes received')):
+                header(metric, 'counter', description)
+                for (exchange, endpoint), stats in requests:
+                    lines.append(f'{prefix}_{metric}{{exchange="{exchange}",endpoint="{endpoint}"}} {stats[field]}')
+
+            header('request_seconds', 'histogram', 'HTTP attempt latency')
+            for (exchange, endpoint), stats in requests:
+                histogram(f'{prefix}_request_seconds', f'exchange="{exchange}",endpoint="{endpoint}"',
+                          stats['latency'])
+
+            header('stage_seconds', 'histogram', 'Time per call of each scan pipeline stage')
+            for stage, hist in self.stages.items():
+                histogram(f'{prefix}_stage_seconds', f'stage="{stage}"', hist)
+
+            header('opportunities_total', 'counter', 'Opportunities detected')
+            lines.append(f'{prefix}_opportunities_total {self.opportunities}')
+            header('quote_age_seconds', 'histogram', 'Age of the quotes behind each detected opportunity')
+            histogram(f'{prefix}_quote_age_seconds', '', self.quote_age)
+            header('first_opportunity_seconds', 'histogram', 'Time from scan start to its first opportunity')
+            histogram(f'{prefix}_first_opportunity_seconds', '', self.first_opportunity)
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """Write a snapshot to path: Prometheus text for .prom/.txt files, JSON otherwise"""
+        if path.endswith(('.prom', '.txt')):
+            content = self.prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=2)
+        # Replace atomically so a scraper never reads a half-written file
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as f:
+            f.write(content)
+        os.replace(temporary, path)
+
+    def start_dump(self, path, interval=30.0):
+        """Dump to path every interval seconds on a background thread until stop_dump()"""
+        self.stop_dump()
+        stop = self._dump_stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.dump(path)
+                except OSError as e:
+                    logger.error("Error writing metrics to %s: %s", path, e)
+
+        threading.Thread(target=run, name='metrics-dump', daemon=True).start()
+
+    def stop_dump(self):
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_stop = None
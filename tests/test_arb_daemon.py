@@ -0,0 +1,108 @@
+import io
+import json
+import sys
+
+import pytest
+
+import arb_daemon
+from arb_daemon import ScannerDaemon, load_credentials
+
+
+class FakeMetrics:
+    def snapshot(self):
+        return {'totals': {'requests': 7}}
+
+
+class FakeScanner:
+    metrics = FakeMetrics()
+
+
+def opportunity(market_id, margin, quote_age=0.5):
+    return {'market_key': (('smarkets', market_id), ('matchbook', market_id + '0')),
+            'event_name': f'Event {market_id}', 'market_name': 'Match Odds',
+            'profit_margin': margin, 'quote_age': quote_age}
+
+
+def written(output):
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    output.seek(0)
+    output.truncate()
+    return lines
+
+
+@pytest.fixture
+def daemon():
+    return ScannerDaemon(FakeScanner(), io.StringIO(), metrics_interval=0)
+
+
+def test_opportunities_are_written_when_new_or_changed(daemon):
+    daemon.on_cycle([opportunity('1', 2.0), opportunity('2', 3.0)], {})
+    lines = written(daemon.output)
+    assert [(line['type'], line['market_key'][0][1]) for line in lines] == [('opportunity', '1'), ('opportunity', '2')]
+    assert all(isinstance(line['ts'], float) for line in lines)
+    assert lines[0]['quote_age'] == 0.5
+
+    # Only the quote age moved for 1; 2's prices changed
+    daemon.on_cycle([opportunity('1', 2.0, quote_age=4.0), opportunity('2', 3.5)], {})
+    lines = written(daemon.output)
+    assert [(line['type'], line['market_key'][0][1], line['profit_margin']) for line in lines] == \
+        [('opportunity', '2', 3.5)]
+
+
+def test_opportunities_no_longer_reported_are_closed_once(daemon):
+    daemon.on_cycle([opportunity('1', 2.0), opportunity('2', 3.0)], {})
+    written(daemon.output)
+
+    daemon.on_cycle([opportunity('2', 3.0)], {})
+    lines = written(daemon.output)
+    assert isinstance(lines[0].pop('ts'), float)
+    assert lines == [{'type': 'closed', 'market_key': [['smarkets', '1'], ['matchbook', '10']],
+                      'event_name': 'Event 1', 'market_name': 'Match Odds'}]
+
+    daemon.on_cycle([opportunity('2', 3.0)], {})
+    assert written(daemon.output) == []
+
+    # A reopened opportunity is news again
+    daemon.on_cycle([opportunity('1', 2.0), opportunity('2', 3.0)], {})
+    assert [line['type'] for line in written(daemon.output)] == ['opportunity']
+
+
+def test_metrics_lines_follow_the_interval(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(arb_daemon.time, 'time', lambda: now[0])
+    daemon = ScannerDaemon(FakeScanner(), io.StringIO(), metrics_interval=60)
+
+    daemon.on_cycle([], {'polled': 3})
+    now[0] += 30
+    daemon.on_cycle([], {'polled': 4})
+    now[0] += 31
+    daemon.on_cycle([], {'polled': 5})
+
+    lines = written(daemon.output)
+    assert [(line['type'], line['cycle']['polled']) for line in lines] == [('metrics', 3), ('metrics', 5)]
+    assert lines[0]['totals'] == {'requests': 7} and lines[0]['ts'] == 1000.0
+
+
+def test_credentials_file_takes_precedence_over_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv('MATCHBOOK_USERNAME', 'env-user')
+    monkeypatch.setenv('MATCHBOOK_PASSWORD', 'env-pass')
+    path = tmp_path / 'credentials.json'
+    path.write_text(json.dumps({'username': 'file-user', 'password': 'file-pass'}))
+
+    assert load_credentials(str(path)) == ('file-user', 'file-pass')
+    assert load_credentials() == ('env-user', 'env-pass')
+
+    path.write_text(json.dumps({'username': 'file-user'}))
+    assert load_credentials(str(path)) == ('file-user', '')
+
+
+def test_missing_credentials_stop_before_scanning(monkeypatch, capsys):
+    monkeypatch.delenv('MATCHBOOK_USERNAME', raising=False)
+    monkeypatch.delenv('MATCHBOOK_PASSWORD', raising=False)
+    monkeypatch.setattr(sys, 'argv', ['arb_daemon.py', '--log-level', 'WARNING'])
+    monkeypatch.setattr(arb_daemon, 'SmarketsMatchbookScanner', None)
+
+    with pytest.raises(SystemExit) as exit_info:
+        arb_daemon.main()
+    assert exit_info.value.code == 2
+    assert 'Matchbook credentials are required' in capsys.readouterr().err
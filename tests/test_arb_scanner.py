@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from arb_scanner import SmarketsMatchbookScanner
+
+
+class ContractsResponse:
+    status_code = 200
+
+    def __init__(self, market_ids):
+        self.market_ids = market_ids
+
+    def json(self):
+        return {'contracts': [{'id': f'{market_id}-{side}', 'name': side, 'market_id': market_id}
+                              for market_id in self.market_ids for side in ('home', 'away')]}
+
+
+@pytest.fixture
+def scanner():
+    scanner = SmarketsMatchbookScanner(mappings_path=':memory:')
+    scanner.contract_requests = []
+
+    def get(url, **kwargs):
+        market_ids = url.rstrip('/').split('/')[-2].split(',')
+        scanner.contract_requests.append(market_ids)
+        return ContractsResponse(market_ids)
+
+    scanner.transport.get = get
+    yield scanner
+    scanner.close()
+
+
+def test_contracts_are_cached_per_market_across_batches(scanner):
+    contracts = scanner.get_smarkets_contracts(['1', '2'])
+    assert contracts['1'] == [('1-home', 'home'), ('1-away', 'away')]
+
+    scanner.get_smarkets_contracts(['2', '3'])
+    assert scanner.contract_requests == [['1', '2'], ['3']]
+
+
+def test_expired_contracts_are_fetched_again(scanner, monkeypatch):
+    scanner.get_smarkets_contracts(['1'])
+    ttl = scanner.response_cache.ttls['contracts']
+    later = time.monotonic() + ttl + 1
+    monkeypatch.setattr(time, 'monotonic', lambda: later)
+
+    scanner.get_smarkets_contracts(['1'])
+    assert scanner.contract_requests == [['1'], ['1']]
+
+
+def test_contract_cache_is_bounded_and_forgets_closed_markets(scanner):
+    scanner.max_contract_markets = 3
+    scanner.get_smarkets_contracts(['1', '2', '3'])
+    scanner.get_smarkets_contracts(['1'])
+    scanner.get_smarkets_contracts(['4'])
+    assert list(scanner._contract_cache) == ['3', '1', '4']
+
+    scanner.forget_contracts(['3', '4'])
+    assert list(scanner._contract_cache) == ['1']
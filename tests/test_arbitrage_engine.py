@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from arbitrage_engine import best_combination, size_stakes
+
+
+def stake_for_return(levels, rate, target):
+    """Stake needed to net target after commission, filling the best levels first (None if too deep)"""
+    stake = 0.0
+    for odds, available in levels:
+        net_odds = 1 + (odds - 1) * (1 - rate)
+        take = min(available, target / net_odds)
+        stake += take
+        target -= take * net_odds
+        if target <= 1e-12:
+            return stake
+    return None
+
+
+def brute_force_profit(ladders, rates, max_stake=None, steps=5000):
+    """Best guaranteed profit over a fine grid of net returns"""
+    best = 0.0
+    depth = min(sum(o * a for o, a in levels) for levels in ladders)
+    for target in np.linspace(0, depth, steps):
+        stakes = [stake_for_return(levels, rate, target) for levels, rate in zip(ladders, rates)]
+        if any(stake is None for stake in stakes):
+            continue
+        if max_stake is not None and sum(stakes) > max_stake:
+            continue
+        best = max(best, target - sum(stakes))
+    return best
+
+
+def random_ladders(rng, legs):
+    ladders = []
+    for _ in range(legs):
+        top = rng.uniform(1.9, 2.6) if legs == 2 else rng.uniform(2.8, 3.8)
+        odds = np.sort(top - np.cumsum(rng.uniform(0.0, 0.15, rng.integers(1, 6))))[::-1]
+        ladders.append(np.column_stack([odds, rng.uniform(10, 300, len(odds))]))
+    return ladders
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('max_stake', [None, 150.0])
+def test_size_stakes_matches_brute_force(seed, max_stake):
+    rng = np.random.default_rng(seed)
+    legs = 2 + seed % 2
+    ladders = random_ladders(rng, legs)
+    rates = rng.choice([0.0, 0.02, 0.04], legs)
+
+    stakes, gross, net_return = size_stakes(ladders, rates, max_stake)
+    profit = net_return - stakes.sum()
+
+    assert profit == pytest.approx(brute_force_profit(ladders, rates, max_stake), abs=0.05)
+    assert profit >= 0
+    if max_stake is not None:
+        assert stakes.sum() <= max_stake + 1e-9
+    if net_return:
+        # Every leg pays the same net return after commission
+        np.testing.assert_allclose(stakes + (gross - stakes) * (1 - rates), net_return)
+
+
+def test_unprofitable_ladders_stake_nothing():
+    ladders = [np.array([[1.8, 100.0]]), np.array([[1.9, 100.0]])]
+    stakes, gross, net_return = size_stakes(ladders, [0.0, 0.0])
+    assert net_return == 0.0 and not stakes.any()
+
+
+def test_best_combination_spans_two_exchanges():
+    odds = np.array([[2.2, 2.1], [2.1, 2.0]])
+    choice, implied = best_combination(odds)
+    # Moving outcome 0 to 2.1 costs less implied probability than moving outcome 1 to 2.0
+    assert choice.tolist() == [1, 0]
+    assert implied.sum() == pytest.approx(2 / 2.1)
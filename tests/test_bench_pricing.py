@@ -0,0 +1,38 @@
+import pytest
+
+from bench_pricing import compare_results
+
+
+def names(entries):
+    return [entry['metric'] for entry in entries]
+
+
+@pytest.mark.parametrize('group, worse, better', [
+    ('latency', 1.2, 0.8),      # lower is better
+    ('memory', 1.2, 0.8),
+    ('throughput', 0.8, 1.2),   # higher is better
+])
+def test_regressions_and_improvements_follow_direction(group, worse, better):
+    baseline = {'metrics': {f'{group}.a': 1.0, f'{group}.b': 1.0, f'{group}.c': 1.0, f'{group}.d': 1.0}}
+    current = {'metrics': {f'{group}.a': worse, f'{group}.b': better, f'{group}.c': 1.05, f'{group}.d': 0.95}}
+
+    regressions, improvements = compare_results(baseline, current, tolerance=0.10, accuracy_tolerance=0.01)
+
+    assert names(regressions) == [f'{group}.a']
+    assert names(improvements) == [f'{group}.b']
+    assert regressions[0]['change'] == pytest.approx(worse - 1.0)
+
+
+def test_error_metrics_use_accuracy_tolerance():
+    baseline = {'metrics': {'error.small': 1e-4, 'error.large': 1e-4, 'error.fixed': 1e-4}}
+    current = {'metrics': {'error.small': 1.005e-4, 'error.large': 1.5e-4, 'error.fixed': 0.5e-4}}
+
+    regressions, improvements = compare_results(baseline, current, tolerance=1.0, accuracy_tolerance=0.01)
+
+    assert names(regressions) == ['error.large']
+    assert names(improvements) == ['error.fixed']
+
+
+def test_metrics_missing_from_baseline_are_ignored():
+    regressions, improvements = compare_results({'metrics': {}}, {'metrics': {'latency.new': 5.0}}, 0.1, 0.01)
+    assert regressions == improvements == []
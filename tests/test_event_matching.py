@@ -0,0 +1,42 @@
+from event_matching import EventMatcher, group_events, tokenize, tokens_are_similar
+from records import Event
+
+
+def event(exchange, id, name):
+    return Event(exchange, id, name, 'football')
+
+
+def test_names_match_across_formats():
+    assert tokens_are_similar(tokenize('Novak Djokovic vs Carlos Alcaraz'), tokenize('N Djokovic v C Alcaraz'))
+    assert tokens_are_similar(tokenize('Arsenal v Chelsea (Live)'), tokenize('Arsenal vs. Chelsea'))
+    assert not tokens_are_similar(tokenize('Arsenal v Chelsea'), tokenize('Everton v Fulham'))
+    assert not tokens_are_similar(frozenset(), frozenset())
+
+
+def test_add_prefers_the_closest_candidate_over_insertion_order():
+    matcher = EventMatcher()
+    senior = event('matchbook', 1, 'Spain v Italy')
+    youth = event('matchbook', 2, 'Spain U21 v Italy U21')
+    assert matcher.add(senior) is None
+    assert matcher.add(youth) is None
+
+    streamed = event('smarkets', 10, 'Spain U21 vs Italy U21')
+    assert matcher.add(streamed) == [youth, streamed]
+    assert len(matcher) == 1
+
+
+def test_add_ignores_events_from_the_same_exchange():
+    matcher = EventMatcher()
+    assert matcher.add(event('smarkets', 1, 'Arsenal v Chelsea')) is None
+    assert matcher.add(event('smarkets', 2, 'Arsenal v Chelsea')) is None
+    assert len(matcher) == 2
+
+
+def test_group_events_pairs_across_exchanges_only():
+    events = [event('smarkets', 1, 'Arsenal v Chelsea'), event('smarkets', 2, 'Everton v Fulham'),
+              event('matchbook', 3, 'Fulham vs Everton'), event('matchbook', 4, 'Arsenal vs Chelsea'),
+              event('matchbook', 5, 'Leeds v Burnley')]
+
+    groups = group_events(events)
+
+    assert sorted(sorted(e.id for e in group) for group in groups) == [[1, 4], [2, 3]]
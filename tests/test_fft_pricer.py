@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from bs_pricer import black_scholes_vectorized
+from fft_pricer import BlackScholesCF, FFTPricer, HestonCF
+
+S0, R, Q = 100.0, 0.03, 0.01
+STRIKES = np.linspace(70, 130, 13)
+EXPIRIES = np.array([0.1, 0.5, 1.0, 2.0])
+
+
+@pytest.mark.parametrize('option_type', ['Call', 'Put'])
+def test_black_scholes_cf_matches_closed_form(option_type):
+    sigma = 0.25
+    prices = FFTPricer().price(BlackScholesCF(sigma), S0, STRIKES, EXPIRIES, R, Q, option_type)
+
+    K, T = np.meshgrid(STRIKES, EXPIRIES)
+    expected = black_scholes_vectorized(S0, K, R, sigma, T, Q, is_call=option_type == 'Call')
+    np.testing.assert_allclose(prices, expected, atol=1e-4)
+
+
+def test_calibration_reuses_expiry_factors():
+    pricer = FFTPricer()
+    quotes = [(T, K, float(black_scholes_vectorized(S0, K, R, 0.3, T, Q)), 'Call')
+              for T in (0.25, 1.0) for K in (90.0, 100.0, 110.0)]
+
+    result = pricer.calibrate('black_scholes', S0, quotes, R, Q)
+
+    assert result['params']['sigma'] == pytest.approx(0.3, abs=1e-4)
+    # Only the first objective evaluation computes the spot, rate and expiry factors
+    grid_evaluations = (result['cf_cache_hits'] + result['cf_cache_misses']) // 2
+    assert pricer.factor_misses == 1
+    assert result['factor_reuses'] == grid_evaluations - 1 > 0
+
+
+def test_cf_cache_reused_after_spot_move():
+    pricer = FFTPricer()
+    model = HestonCF(v0=0.04, kappa=2.0, theta=0.04, xi=0.6, rho=-0.7)
+    pricer.price(model, S0, STRIKES, EXPIRIES, R, Q)
+    pricer.price(model, S0 * 1.01, STRIKES, EXPIRIES, R, Q)
+
+    assert pricer.cache_misses == len(EXPIRIES)
+    assert pricer.cache_hits == len(EXPIRIES)
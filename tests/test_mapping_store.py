@@ -0,0 +1,122 @@
+import queue
+import time
+
+import pytest
+
+from arb_scanner import SmarketsMatchbookScanner
+from mapping_store import MappingStore
+from records import Event
+
+
+@pytest.fixture
+def store():
+    store = MappingStore(':memory:', ttl=60)
+    yield store
+    store.close()
+
+
+def test_links_resolve_from_both_sides(store):
+    store.link('selection', 's1', 'm1', 'home')
+
+    assert store.partner('selection', 'smarkets', 's1') == 'm1'
+    assert store.partner('selection', 'matchbook', 'm1') == 's1'
+    assert store.outcome_key('matchbook', 'm1') == 'home'
+
+
+def test_relink_replaces_both_previous_partners(store):
+    store.link('event', 's1', 'm1')
+    store.link('event', 's2', 'm1')
+
+    assert store.partner('event', 'smarkets', 's1') is None
+    assert store.partner('event', 'matchbook', 'm1') == 's2'
+    assert len(store) == 1
+
+
+def test_links_expire_after_ttl(store, monkeypatch):
+    now = time.time()
+    store.link('event', 's1', 'm1')
+
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert store.partner('event', 'smarkets', 's1') is None
+    assert store.purge_expired() == 1
+    assert len(store) == 0
+
+
+def test_touch_restarts_the_ttl_and_flush_persists_it(tmp_path, monkeypatch):
+    path = str(tmp_path / 'links.db')
+    now = time.time()
+    store = MappingStore(path, ttl=60)
+    store.link('event', 's1', 'm1')
+
+    monkeypatch.setattr(time, 'time', lambda: now + 50)
+    assert store.touch('event', 'matchbook', 'm1')
+    assert not store.touch('event', 'matchbook', 'unknown')
+    store.close()
+
+    monkeypatch.setattr(time, 'time', lambda: now + 100)
+    reopened = MappingStore(path, ttl=60)
+    assert reopened.partner('event', 'smarkets', 's1') == 'm1'
+    reopened.close()
+
+
+def test_links_are_written_on_flush_in_one_commit(tmp_path):
+    path = str(tmp_path / 'links.db')
+    store = MappingStore(path)
+    store.link('selection', 's1', 'm1', 'home')
+    store.link('selection', 's2', 'm2', 'away')
+    store.link('selection', 's3', 'm1', 'home')     # replaces s1 <-> m1
+    assert store.partner('selection', 'matchbook', 'm1') == 's3'
+
+    commits = []
+    store._conn.set_trace_callback(lambda sql: commits.append(sql) if sql == 'COMMIT' else None)
+    unsaved = MappingStore(path)
+    assert unsaved.partner('selection', 'smarkets', 's2') is None
+    unsaved.close()
+    store.flush()
+    store.flush()
+    assert len(commits) == 1
+    store.close()
+
+    reopened = MappingStore(path)
+    assert reopened.partner('selection', 'matchbook', 'm1') == 's3'
+    assert reopened.partner('selection', 'smarkets', 's1') is None
+    assert reopened.outcome_key('smarkets', 's2') == 'away'
+    assert len(reopened) == 2
+    reopened.close()
+
+
+def test_unlink_forgets_both_sides(tmp_path):
+    path = str(tmp_path / 'links.db')
+    store = MappingStore(path)
+    store.link('event', 's1', 'm1')
+    store.unlink('event', 'matchbook', 'm1')
+    assert store.partner('event', 'smarkets', 's1') is None
+    store.close()
+
+    reopened = MappingStore(path)
+    assert len(reopened) == 0
+    reopened.close()
+
+
+def test_streamed_event_with_missing_partner_is_fuzzy_matched():
+    scanner = SmarketsMatchbookScanner(mappings_path=':memory:')
+    started = []
+    scanner.fetch_event_markets = lambda event: started.append(event.id) or []
+    scanner.mappings.link('event', 's1', 'm1')
+    scanner.mappings.link('event', 's2', 'settled')
+
+    inbox = queue.Queue()
+    for event in (Event('smarkets', 's1', 'Arsenal v Chelsea', 'football'),
+                  Event('smarkets', 's2', 'Spain v Italy', 'football'),
+                  Event('matchbook', 'm2', 'Spain vs Italy', 'football'),
+                  Event('matchbook', 'm1', 'Arsenal vs Chelsea', 'football')):
+        inbox.put(('event', event))
+    inbox.put(('producer_done', None))
+    try:
+        scanner.run_scan_pipeline(inbox, producers=1)
+
+        assert sorted(started) == ['m1', 'm2', 's1', 's2']
+        assert scanner.mappings.partner('event', 'smarkets', 's2') == 'm2'
+        assert scanner.mappings.partner('event', 'matchbook', 'settled') is None
+    finally:
+        scanner.close()
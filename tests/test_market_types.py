@@ -0,0 +1,102 @@
+import pytest
+
+from market_types import classify_market, group_markets
+from records import Event, Market
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Match Odds', ('match_odds', None, 'full')),
+    ('Winner', ('match_odds', None, 'full')),
+    ('Moneyline', ('match_odds', None, 'full')),
+    ('Match Handicap Goals -1.5', ('handicap_goals', -1.5, 'full')),
+    ('Total Goals Over/Under 2.5', ('total_goals', 2.5, 'full')),
+    ('Over/Under 2.5 Goals', ('total_goals', 2.5, 'full')),
+    ('Total Corners 9.5', ('total_corners', 9.5, 'full')),
+    ('Over/under 4.5 cards', ('total_cards', 4.5, 'full')),
+    ('Total Bookings 4.5', ('total_cards', 4.5, 'full')),
+    ('Total Points 210.5', ('total_points', 210.5, 'full')),
+    ('Set Handicap -1.5', ('handicap_sets', -1.5, 'full')),
+    ('Correct Score', ('correct_score', None, 'full')),
+    ('Both Teams To Score', ('both_teams_to_score', None, 'full')),
+    ('Draw No Bet', ('draw_no_bet', None, 'full')),
+    ('Half Time/Full Time', ('half_time_full_time', None, 'full')),
+    ('HT/FT', ('half_time_full_time', None, 'full')),
+    ('Half Time Result', ('match_odds', None, 'half_1')),
+    ('2nd Half Total Goals 1.5', ('total_goals', 1.5, 'half_2')),
+    ('Set 1 Total Games 9.5', ('total_games', 9.5, 'set_1')),
+    ('Set 1 Winner', ('match_odds', None, 'set_1')),
+    ('Second Set Winner', ('match_odds', None, 'set_2')),
+    ('Q3 Total Points 45.5', ('total_points', 45.5, 'quarter_3')),
+    ('Quarter 2 Points Handicap +3.5', ('handicap_points', 3.5, 'quarter_2')),
+])
+def test_classify_market(name, expected):
+    assert classify_market(name) == expected
+
+
+@pytest.mark.parametrize('name, sport, expected', [
+    ('Over/under 2.5', 'football', ('total_goals', 2.5, 'full')),
+    ('Over/under 2.5', 11, ('total_goals', 2.5, 'full')),
+    ('Spread -4.5', 'basketball', ('handicap_points', -4.5, 'full')),
+    ('Q3 Total 45.5', 18, ('total_points', 45.5, 'quarter_3')),
+    ('Total 22.5', 'tennis', ('total_games', 22.5, 'full')),
+    ('Total Corners 9.5', 'football', ('total_corners', 9.5, 'full')),
+])
+def test_unstated_subject_comes_from_the_sport(name, sport, expected):
+    assert classify_market(name, sport) == expected
+
+
+def test_unknown_subject_keys_on_the_name():
+    assert classify_market('Over/under 2.5') == ('other:over/under 2.5', None, 'full')
+    assert classify_market('Handicap -1.5', 'darts') == ('other:handicap -1.5', None, 'full')
+
+
+def test_same_line_on_different_subjects_differs():
+    keys = {classify_market(name, 'football') for name in
+            ('Total Goals 2.5', 'Total Corners 2.5', 'Over/under 2.5 cards')}
+    assert len(keys) == 3
+    assert classify_market('Over/under 2.5', 'football') == classify_market('Total Goals 2.5')
+
+
+def test_whitespace_and_case_do_not_matter():
+    assert classify_market('  total   GOALS  over/under 2.5 ') == classify_market('Total Goals Over/Under 2.5')
+
+
+def test_lines_and_periods_keep_markets_apart():
+    assert classify_market('Over/Under 2.5 Goals') != classify_market('Over/Under 3.5 Goals')
+    assert classify_market('Set 1 Winner') != classify_market('Winner')
+
+
+def test_unknown_names_group_on_their_text():
+    assert classify_market('First Goalscorer') == ('other:first goalscorer', None, 'full')
+
+
+def market(exchange, id, name, sport='football'):
+    return Market(exchange, id, name, Event(exchange, 'e', 'A v B', sport))
+
+
+def test_group_markets_pairs_one_market_per_exchange():
+    markets = [market('smarkets', 1, 'Full-time result'), market('matchbook', 2, 'Match Odds'),
+               market('smarkets', 3, 'Over/under 2.5'), market('matchbook', 4, 'Total Goals 2.5'),
+               market('matchbook', 5, 'Total Goals 3.5'), market('smarkets', 6, 'Correct score')]
+
+    groups = group_markets(markets)
+
+    assert sorted(sorted(m.id for m in group) for group in groups) == [[1, 2], [3, 4]]
+
+
+def test_group_markets_keeps_subjects_apart():
+    markets = [market('smarkets', 1, 'Over/under 2.5'), market('smarkets', 2, 'Total Corners 2.5'),
+               market('matchbook', 3, 'Total Corners 2.5'), market('matchbook', 4, 'Over/under 2.5 cards'),
+               market('matchbook', 5, 'Total Goals 2.5')]
+
+    groups = group_markets(markets)
+
+    assert sorted(sorted(m.id for m in group) for group in groups) == [[1, 5], [2, 3]]
+
+
+def test_group_markets_leaves_unknown_subjects_to_matching_names():
+    markets = [market('smarkets', 1, 'Over/under 2.5', sport='darts'),
+               market('matchbook', 2, 'Total 180s 2.5', sport='darts'),
+               market('matchbook', 3, 'Over/Under 2.5', sport='darts')]
+
+    assert [[m.id for m in group] for group in group_markets(markets)] == [[1, 3]]
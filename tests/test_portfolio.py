@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from portfolio import Portfolio
+
+SPOT_SHOCKS = [-0.1, 0.0, 0.1]
+VOL_SHOCKS = [-0.05, 0.0, 0.05]
+TIME_SHIFTS = [0, 7, 30]
+
+
+def make_portfolio(count=40):
+    rng = np.random.default_rng(1)
+    portfolio = Portfolio({'AAA': 100.0, 'BBB': 50.0})
+    for i in range(count):
+        underlying = 'AAA' if i % 2 else 'BBB'
+        spot = portfolio.spots[underlying]
+        portfolio.add_position(f'p{i}', underlying, 'Call' if i % 3 else 'Put',
+                               strike=spot * rng.uniform(0.8, 1.2), expiry=rng.uniform(0.05, 1.0),
+                               volatility=rng.uniform(0.1, 0.5), quantity=rng.integers(-10, 10))
+    return portfolio
+
+
+def full_grid(portfolio):
+    return portfolio.scenario_grid(SPOT_SHOCKS, VOL_SHOCKS, TIME_SHIFTS, incremental=False)['pnl']
+
+
+def test_incremental_grid_matches_full_recompute_after_changes():
+    portfolio = make_portfolio()
+    portfolio.scenario_grid(SPOT_SHOCKS, VOL_SHOCKS, TIME_SHIFTS)
+
+    portfolio.update_quantity('p3', 25)
+    portfolio.remove_position('p4')
+    portfolio.add_position('new', 'AAA', 'Put', strike=95.0, expiry=0.5, volatility=0.3, quantity=4)
+    incremental = portfolio.scenario_grid(SPOT_SHOCKS, VOL_SHOCKS, TIME_SHIFTS)['pnl']
+
+    np.testing.assert_allclose(incremental, full_grid(portfolio), rtol=1e-9, atol=1e-6)
+
+
+def test_incremental_grid_follows_spot_moves(monkeypatch):
+    portfolio = make_portfolio()
+    portfolio.set_spot('CCC', 20.0)
+    portfolio.add_position('c1', 'CCC', 'Call', strike=21.0, expiry=0.3, volatility=0.4, quantity=5)
+    portfolio.add_position('c2', 'CCC', 'Put', strike=19.0, expiry=0.8, volatility=0.3, quantity=-3)
+    portfolio.scenario_grid(SPOT_SHOCKS, VOL_SHOCKS, TIME_SHIFTS)
+
+    evaluated = []
+    scenario_pnl = portfolio._scenario_pnl
+
+    def counting_scenario_pnl(rows, *args):
+        evaluated.append(len(rows))
+        return scenario_pnl(rows, *args)
+
+    monkeypatch.setattr(portfolio, '_scenario_pnl', counting_scenario_pnl)
+    portfolio.set_spot('CCC', 21.5)
+    incremental = portfolio.scenario_grid(SPOT_SHOCKS, VOL_SHOCKS, TIME_SHIFTS)['pnl']
+
+    # Only the two CCC positions are re-evaluated, at the old and new spot
+    assert evaluated == [2, 2]
+    np.testing.assert_allclose(incremental, full_grid(portfolio), rtol=1e-9, atol=1e-6)
+
+
+def test_unshocked_scenario_has_zero_pnl():
+    pnl = make_portfolio().scenario_grid(SPOT_SHOCKS, VOL_SHOCKS, TIME_SHIFTS)['pnl']
+    assert pnl[1, 1, 0] == pytest.approx(0.0, abs=1e-8)
+
+
+def test_greeks_are_quantity_weighted():
+    portfolio = Portfolio({'AAA': 100.0})
+    portfolio.add_position('a', 'AAA', 'Call', 100.0, 0.5, 0.2, 1)
+    single = portfolio.greeks()['total']['Delta']
+    portfolio.update_quantity('a', 3)
+    assert portfolio.greeks()['total']['Delta'] == pytest.approx(3 * single)
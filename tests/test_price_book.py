@@ -0,0 +1,95 @@
+import time
+
+from arb_scanner import SmarketsMatchbookScanner
+from price_book import PriceBook
+from records import WatchedGroup
+
+KEY = (('matchbook', '1'), ('smarkets', '2'))
+INFO = {'event_name': 'A v B', 'market_name': 'Match Odds'}
+
+
+def arbitrage_quotes(home=2.2, away=2.1):
+    """Two-outcome book with home best on Matchbook and away best on Smarkets"""
+    return [('home', 'matchbook', 'A', home, 500.0, None), ('home', 'smarkets', 'A', 1.9, 500.0, None),
+            ('away', 'matchbook', 'B', 1.9, 500.0, None), ('away', 'smarkets', 'B', away, 500.0, None)]
+
+
+def make_book(**settings):
+    fired = []
+    return PriceBook(on_opportunity=fired.append, **settings), fired
+
+
+def test_opportunity_fires_once_while_prices_are_unchanged():
+    book, fired = make_book()
+    first = book.update_market(KEY, arbitrage_quotes(), INFO, outcome_count=2)
+    second = book.update_market(KEY, arbitrage_quotes(), INFO, outcome_count=2)
+
+    assert first == second
+    assert first['market_key'] == KEY and first['event_name'] == 'A v B'
+    assert len(fired) == 1
+
+
+def test_price_change_fires_again():
+    book, fired = make_book()
+    book.update_market(KEY, arbitrage_quotes(), INFO, outcome_count=2)
+    book.update_market(KEY, arbitrage_quotes(home=2.3), INFO, outcome_count=2)
+
+    assert len(fired) == 2
+    assert fired[1]['legs'][0]['odds'] == 2.3
+
+
+def test_opportunity_that_closes_and_reopens_fires_again():
+    book, fired = make_book()
+    book.update_market(KEY, arbitrage_quotes(), INFO, outcome_count=2)
+    assert book.update_market(KEY, arbitrage_quotes(home=1.9, away=1.9), INFO, outcome_count=2) is None
+    assert book.opportunities() == []
+    book.update_market(KEY, arbitrage_quotes(), INFO, outcome_count=2)
+
+    assert len(fired) == 2
+
+
+def test_missing_outcome_or_thin_liquidity_is_not_reported():
+    book, fired = make_book(min_liquidity=600)
+    assert book.update_market(KEY, arbitrage_quotes(), INFO, outcome_count=2) is None
+
+    book, fired = make_book()
+    assert book.update_market(KEY, arbitrage_quotes()[:2], INFO, outcome_count=2) is None
+    assert fired == []
+
+
+def test_snapshot_clears_quotes_the_exchange_no_longer_lists():
+    book, fired = make_book()
+    book.update_market(KEY, arbitrage_quotes(), INFO, outcome_count=2)
+    smarkets_without_away = [quote for quote in arbitrage_quotes() if quote[1] == 'smarkets'][:1]
+
+    assert book.update_market(KEY, smarkets_without_away, snapshot_exchanges={'smarkets'}) is None
+    assert book.markets[KEY].quotes['odds'][book.markets[KEY].rows['away']].tolist() == [1.9, 0.0]
+
+
+def test_expire_drops_markets_not_updated():
+    book, fired = make_book()
+    book.update_market(KEY, arbitrage_quotes(), INFO, outcome_count=2)
+    book.markets[KEY].updated -= 120
+
+    assert book.expire(60) == 1
+    assert len(book) == 0
+
+
+def test_current_opportunities_leaves_the_book_unchanged():
+    fired = []
+    scanner = SmarketsMatchbookScanner(mappings_path=':memory:')
+    try:
+        scanner.price_book.on_opportunity = fired.append
+        opportunity = scanner.price_book.update_market(KEY, arbitrage_quotes(), INFO, outcome_count=2)
+        entry = WatchedGroup(KEY, [])
+        entry.polled = time.time()
+        entry.opportunities = [opportunity]
+
+        reported = scanner.current_opportunities({KEY: entry})
+        assert reported[0]['quote_age'] >= 0
+        assert 'quote_age' not in opportunity
+
+        scanner.price_book.update_market(KEY, arbitrage_quotes(), INFO, outcome_count=2)
+        assert len(fired) == 1
+    finally:
+        scanner.close()
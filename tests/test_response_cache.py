@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from response_cache import ResponseCache, endpoint_class
+
+EVENTS_URL = 'https://api.example/v3/events/'
+QUOTES_URL = 'https://api.example/v3/markets/1,2/quotes/'
+
+
+class Response:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+
+class BlockingSession:
+    """Session whose GETs wait until released, counting the requests that reach it"""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.error = error
+
+    def get(self, url, params=None, **kwargs):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        if self.error:
+            raise self.error
+        return Response()
+
+
+def fetch_concurrently(cache, session, url, callers=8):
+    """Start one caller, then the rest once its request is in flight, and collect every outcome"""
+    with ThreadPoolExecutor(callers) as pool:
+        futures = [pool.submit(cache.get, session, url)]
+        assert session.started.wait(5)
+        futures += [pool.submit(cache.get, session, url) for _ in range(callers - 1)]
+        while sum(stats['coalesced'] for stats in cache.stats.values()) < callers - 1:
+            time.sleep(0.001)
+        session.release.set()
+    return futures
+
+
+def test_endpoint_classes():
+    assert endpoint_class(EVENTS_URL + '?state=live') == 'events'
+    assert endpoint_class('https://api.example/v3/events/9/markets/') == 'markets'
+    assert endpoint_class(QUOTES_URL) == 'prices'
+    assert endpoint_class('https://api.example/bpapi/rest/security/session') is None
+
+
+def test_concurrent_requests_share_one_fetch():
+    cache, session = ResponseCache(), BlockingSession()
+    futures = fetch_concurrently(cache, session, QUOTES_URL)
+
+    responses = {id(future.result()) for future in futures}
+    assert session.calls == 1
+    assert len(responses) == 1
+    assert cache.stats['prices'] == {'hits': 0, 'misses': 1, 'coalesced': 7}
+
+
+def test_prices_are_not_cached_after_the_fetch():
+    cache, session = ResponseCache(), BlockingSession()
+    session.release.set()
+    cache.get(session, QUOTES_URL)
+    cache.get(session, QUOTES_URL)
+    assert session.calls == 2
+
+
+def test_waiters_see_the_leaders_error_and_the_next_call_retries():
+    cache, session = ResponseCache(), BlockingSession(error=ConnectionError('reset'))
+    futures = fetch_concurrently(cache, session, EVENTS_URL, callers=4)
+
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result()
+    assert session.calls == 1
+
+    session.error = None
+    cache.get(session, EVENTS_URL)
+    assert session.calls == 2
+
+
+def test_fresh_entries_are_hits_until_invalidated():
+    cache, session = ResponseCache(), BlockingSession()
+    session.release.set()
+    first = cache.get(session, EVENTS_URL, params={'state': 'live'})
+    assert cache.get(session, EVENTS_URL, params={'state': 'live'}) is first
+    assert session.calls == 1
+
+    cache.invalidate('events')
+    cache.get(session, EVENTS_URL, params={'state': 'live'})
+    assert session.calls == 2
+    assert cache.hit_rates()['events']['hit_rate'] == pytest.approx(1 / 3)
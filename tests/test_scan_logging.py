@@ -0,0 +1,68 @@
+import io
+import logging
+
+import pytest
+
+import scan_logging
+from scan_logging import MODULES, SampledDebugFilter, configure_logging
+
+
+@pytest.fixture(autouse=True)
+def restore_logging():
+    levels = {name: logging.getLogger(name).level for name in MODULES}
+    yield
+    if scan_logging._handler is not None:
+        logging.getLogger().removeHandler(scan_logging._handler)
+        scan_logging._handler = None
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+
+def record(level, lineno=10):
+    return logging.LogRecord('transport', level, 'transport.py', lineno, 'message', None, None)
+
+
+def test_debug_records_are_sampled_per_call_site():
+    sampler = SampledDebugFilter(4)
+    passed = [sampler.filter(record(logging.DEBUG)) for _ in range(12)]
+    assert passed == [True, False, False, False] * 3
+
+    # Another call site keeps its own count
+    assert sampler.filter(record(logging.DEBUG, lineno=20))
+
+
+def test_info_and_above_always_pass():
+    sampler = SampledDebugFilter(1000)
+    sampler.filter(record(logging.DEBUG))
+    for level in (logging.INFO, logging.WARNING, logging.ERROR):
+        assert all(sampler.filter(record(level)) for _ in range(5))
+
+
+def test_sampling_every_record_passes_everything():
+    assert all(SampledDebugFilter(1).filter(record(logging.DEBUG)) for _ in range(5))
+
+
+def test_configure_logging_replaces_its_handler():
+    root = logging.getLogger()
+    handlers = len(root.handlers)
+    first, second = io.StringIO(), io.StringIO()
+    configure_logging(stream=first)
+    configure_logging(stream=second)
+    assert len(root.handlers) == handlers + 1
+
+    logging.getLogger('transport').info("retrying %s", 'quotes')
+    assert first.getvalue() == ''
+    assert second.getvalue().count('retrying quotes') == 1
+    assert ' INFO    transport: ' in second.getvalue()
+
+
+def test_module_levels_and_debug_sampling():
+    stream = io.StringIO()
+    configure_logging('WARNING', module_levels={'transport': 'DEBUG'}, debug_sample_every=3, stream=stream)
+
+    logging.getLogger('arb_scanner').info("hidden")
+    for i in range(6):
+        logging.getLogger('transport').debug("attempt %d", i)
+
+    lines = stream.getvalue().splitlines()
+    assert [line.rsplit(': ', 1)[1] for line in lines] == ['attempt 0', 'attempt 3']
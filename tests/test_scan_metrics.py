@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from scan_metrics import Histogram, ScanMetrics
+
+
+def histogram(values, bounds=(1.0, 2.0, 4.0)):
+    hist = Histogram(bounds)
+    for value in values:
+        hist.observe(value)
+    return hist
+
+
+def test_percentiles_interpolate_inside_buckets():
+    # 4 values in (0, 1], 4 in (1, 2], 2 in (2, 4]
+    hist = histogram([0.5] * 4 + [1.5] * 4 + [3.0] * 2)
+
+    assert hist.counts == [4, 4, 2, 0]
+    assert hist.percentile(0.5) == pytest.approx(1.25)     # rank 5: 1 of 4 into (1, 2]
+    assert hist.percentile(0.95) == pytest.approx(3.5)     # rank 9.5: 1.5 of 2 into (2, 4]
+    assert hist.percentile(0.2) == pytest.approx(0.5)
+
+
+def test_bounds_are_inclusive_and_overflow_reports_the_top_bound():
+    hist = histogram([1.0, 2.0, 100.0])
+    assert hist.counts == [1, 1, 0, 1]
+    assert hist.percentile(0.99) == 4.0
+
+
+def test_empty_histogram_summary():
+    assert Histogram((1.0,)).summary() == {'count': 0, 'sum': 0.0, 'mean': None,
+                                           'p50': None, 'p95': None, 'p99': None}
+
+
+def test_summary_rounds_statistics():
+    summary = histogram([0.5] * 4 + [1.5] * 4 + [3.0] * 2).summary()
+    assert summary == {'count': 10, 'sum': 14.0, 'mean': 1.4, 'p50': 1.25, 'p95': 3.5, 'p99': 3.9}
+
+
+def make_metrics():
+    metrics = ScanMetrics()
+    metrics.observe_request('smarkets', 'prices', 200, 0.003, 1500)
+    metrics.observe_request('smarkets', 'prices', 503, 0.2, 100)
+    metrics.observe_request('matchbook', None, None, 1.5)
+    metrics.observe_stage('scan', 3.0)
+    metrics.observe_opportunity(0.4)
+    metrics.observe_first_opportunity(1.2)
+    return metrics
+
+
+def test_snapshot_totals_and_errors():
+    snapshot = make_metrics().snapshot()
+
+    assert snapshot['totals'] == {'requests': 3, 'errors': 2, 'bytes': 1600}
+    assert list(snapshot['requests']) == ['matchbook.other', 'smarkets.prices']
+    assert snapshot['requests']['smarkets.prices']['errors'] == 1
+    assert snapshot['requests']['smarkets.prices']['latency']['count'] == 2
+    assert snapshot['opportunities'] == 1
+    assert snapshot['stages']['scan']['count'] == 1
+
+
+def test_summary_line():
+    line = make_metrics().summary()
+    assert line.startswith('3 requests (2 errors) | 0.0 MB | worst endpoint p95 ')
+    assert 'scan p50 ' in line and 'first opportunity p50 ' in line and 'quote age p95 ' in line
+    assert ScanMetrics().summary() == '0 requests (0 errors) | 0.0 MB'
+
+
+def test_prometheus_exposition():
+    text = make_metrics().prometheus()
+    lines = text.splitlines()
+    assert text.endswith('\n')
+
+    families = [line.split()[2] for line in lines if line.startswith('# TYPE')]
+    assert families == ['arb_requests_total', 'arb_request_errors_total', 'arb_response_bytes_total',
+                        'arb_request_seconds', 'arb_stage_seconds', 'arb_opportunities_total',
+                        'arb_quote_age_seconds', 'arb_first_opportunity_seconds']
+    for family in families:
+        help_line = lines.index(next(line for line in lines if line.startswith(f'# HELP {family} ')))
+        assert lines[help_line + 1].startswith(f'# TYPE {family} ')
+
+    assert 'arb_requests_total{exchange="smarkets",endpoint="prices"} 2' in lines
+    assert 'arb_request_errors_total{exchange="matchbook",endpoint="other"} 1' in lines
+    assert 'arb_opportunities_total 1' in lines
+
+    # Buckets are cumulative and end with +Inf equal to the count
+    prefix = 'arb_request_seconds_bucket{exchange="smarkets",endpoint="prices",'
+    buckets = [line for line in lines if line.startswith(prefix)]
+    assert buckets[0] == prefix + 'le="0.0005"} 0'
+    assert prefix + 'le="0.005"} 1' in buckets
+    assert prefix + 'le="0.25"} 2' in buckets
+    assert buckets[-1] == prefix + 'le="+Inf"} 2'
+    assert 'arb_request_seconds_count{exchange="smarkets",endpoint="prices"} 2' in lines
+    assert 'arb_quote_age_seconds_bucket{le="0.5"} 1' in lines
+
+    # Every sample line is a name, optional labels and a number
+    for line in lines:
+        if not line.startswith('#'):
+            float(line.rsplit(' ', 1)[1])
+
+
+def test_dump_writes_prometheus_or_json(tmp_path):
+    metrics = make_metrics()
+    metrics.dump(str(tmp_path / 'metrics.prom'))
+    metrics.dump(str(tmp_path / 'metrics.json'))
+
+    assert (tmp_path / 'metrics.prom').read_text().startswith('# HELP arb_requests_total ')
+    assert json.loads((tmp_path / 'metrics.json').read_text())['totals']['requests'] == 3
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['metrics.json', 'metrics.prom']
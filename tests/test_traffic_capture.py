@@ -0,0 +1,130 @@
+import gzip
+import json
+
+import pytest
+
+import traffic_capture
+from traffic_capture import TrafficRecorder, TrafficReplayer
+
+BASE = 'https://api.example/v3'
+PASSWORD = 'hunter2-password'
+TOKEN = 'tok-9f8e7d'
+
+
+class Response:
+    def __init__(self, status_code=200, body=None, text=None, headers=None):
+        self.status_code = status_code
+        self._body = body
+        self.text = text if text is not None else json.dumps(body)
+        self.headers = headers or {}
+
+    def json(self):
+        if self._body is None:
+            raise ValueError('not JSON')
+        return self._body
+
+
+class ScriptedSession:
+    """Answers each URL from its own list of responses, in order"""
+
+    def __init__(self, script):
+        self.script = script
+        self.closed = False
+
+    def get(self, url, params=None, **kwargs):
+        return self.script[url].pop(0)
+
+    post = get
+
+    def close(self):
+        self.closed = True
+
+
+def quotes(*market_ids):
+    return {'quotes': [{'market_id': market_id, 'price': 5000} for market_id in market_ids]}
+
+
+@pytest.fixture
+def capture(tmp_path):
+    path = str(tmp_path / 'capture.jsonl.gz')
+    session = ScriptedSession({
+        BASE + '/security/session': [Response(200, {'session-token': TOKEN, 'user-id': 7},
+                                              headers={'Set-Cookie': f'session={TOKEN}',
+                                                       'Content-Type': 'application/json'})],
+        BASE + '/events/': [Response(200, {'events': [1]}), Response(429, {}, headers={'Retry-After': '2'})],
+        BASE + '/markets/1,2/quotes/': [Response(200, quotes('1', '2'))],
+        BASE + '/markets/3/quotes/': [Response(200, quotes('3'))],
+        BASE + '/status': [Response(503, text='<html>down</html>')],
+    })
+    recorder = TrafficRecorder(session, path)
+    recorder.post(BASE + '/security/session', json={'username': 'alice', 'password': PASSWORD})
+    recorder.get(BASE + '/events/', params={'state': 'live'}, headers={'session-token': TOKEN})
+    recorder.get(BASE + '/events/', params={'state': 'live'}, headers={'session-token': TOKEN})
+    recorder.get(BASE + '/markets/1,2/quotes/')
+    recorder.get(BASE + '/markets/3/quotes/')
+    recorder.get(BASE + '/status')
+    assert recorder.records == 6
+    recorder.close()
+    assert session.closed
+    return path
+
+
+def test_secrets_never_reach_the_capture(capture):
+    with gzip.open(capture, 'rt', encoding='utf-8') as f:
+        raw = f.read()
+    assert PASSWORD not in raw
+    assert TOKEN not in raw
+    assert 'Set-Cookie' not in raw
+
+    login = json.loads(raw.splitlines()[0])
+    assert login['payload'] == {'username': 'alice', 'password': 'redacted'}
+    assert login['body'] == {'session-token': 'redacted', 'user-id': 7}
+    assert login['headers'] == {'Content-Type': 'application/json'}
+
+
+def test_replay_serves_the_recorded_responses(capture):
+    replayer = TrafficReplayer(capture, speed=0)
+    assert len(replayer) == 6
+
+    login = replayer.post(BASE + '/security/session', json={'username': 'alice', 'password': 'anything'})
+    assert login.json()['session-token'] == 'redacted'
+
+    # Repeats come back in recorded order, then the last one again
+    statuses = [replayer.get(BASE + '/events/', params={'state': 'live'}).status_code for _ in range(3)]
+    assert statuses == [200, 429, 429]
+    assert replayer.get(BASE + '/events/', params={'state': 'live'}).headers['retry-after'] == '2'
+
+    status = replayer.get(BASE + '/status')
+    assert (status.status_code, status.text) == (503, '<html>down</html>')
+
+    assert replayer.get(BASE + '/events/', params={'state': 'upcoming'}).status_code == 404
+    assert replayer.misses == 1
+
+
+def test_replay_assembles_batches_that_were_never_recorded(capture):
+    replayer = TrafficReplayer(capture, speed=0)
+
+    assert replayer.get(BASE + '/markets/1,2/quotes/').json() == quotes('1', '2')
+    merged = replayer.get(BASE + '/markets/2,3/quotes/')
+    assert merged.status_code == 200
+    assert sorted(quote['market_id'] for quote in merged.json()['quotes']) == ['1', '2', '3']
+
+    assert replayer.get(BASE + '/markets/3,4/quotes/').status_code == 404
+
+
+def test_replay_speed_scales_the_recorded_timing(tmp_path, monkeypatch):
+    path = str(tmp_path / 'timed.jsonl.gz')
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for offset, elapsed, url in ((0.0, 0.2, '/a'), (1.0, 0.1, '/b')):
+            f.write(json.dumps({'ts': 0, 'offset': offset, 'elapsed': elapsed, 'method': 'GET', 'url': BASE + url,
+                                'params': {}, 'payload': None, 'status': 200, 'headers': {}, 'body': {}}) + '\n')
+    slept = []
+    monkeypatch.setattr(traffic_capture.time, 'monotonic', lambda: 100.0)
+    monkeypatch.setattr(traffic_capture.time, 'sleep', slept.append)
+
+    replayer = TrafficReplayer(path, speed=10.0)
+    replayer.get(BASE + '/a')
+    replayer.get(BASE + '/b')
+
+    # Each response waits out its response time, and /b is not served before its offset
+    assert slept == pytest.approx([0.02, 0.11])
@@ -0,0 +1,138 @@
+import pytest
+import requests
+
+import transport as transport_module
+from arb_scanner import SmarketsMatchbookScanner
+from transport import Transport
+
+BASE = 'https://api.matchbook.example/edge/rest'
+URL = BASE + '/events/'
+
+
+class Response:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b'{}'
+
+
+class ScriptedSession:
+    """Session that answers GETs from a script of responses or exceptions"""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append(kwargs.get('headers', {}))
+        outcome = self.script.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(transport_module.time, 'sleep', slept.append)
+    return slept
+
+
+def make_transport(session, **kwargs):
+    transport = Transport(lambda: session, {'matchbook': BASE}, **kwargs)
+    transport.disable_rate_limits()
+    return transport
+
+
+def test_transient_errors_are_retried(sleeps):
+    session = ScriptedSession(Response(503), requests.ConnectionError(), Response(200))
+    transport = make_transport(session)
+
+    assert transport.get(URL).status_code == 200
+    assert transport.retries == 2
+    assert len(sleeps) == 2
+
+
+def test_gives_up_after_max_retries(sleeps):
+    transport = make_transport(ScriptedSession(*[Response(502)] * 3), max_retries=2)
+    assert transport.get(URL).status_code == 502
+
+    transport = make_transport(ScriptedSession(*[requests.Timeout()] * 3), max_retries=2)
+    with pytest.raises(requests.Timeout):
+        transport.get(URL)
+
+
+def test_client_errors_are_not_retried(sleeps):
+    transport = make_transport(ScriptedSession(Response(404)))
+    assert transport.get(URL).status_code == 404
+    assert transport.retries == 0
+
+
+def test_retry_after_sets_the_minimum_delay(sleeps):
+    session = ScriptedSession(Response(429, {'Retry-After': '4'}), Response(200))
+    transport = make_transport(session, backoff_base=0.01)
+
+    assert transport.get(URL).status_code == 200
+    assert sleeps == [4.0]
+
+
+def test_retry_after_is_capped_and_tolerates_garbage():
+    transport = make_transport(ScriptedSession(), backoff_base=0.01, backoff_cap=5.0)
+    assert transport.backoff_delay(0, Response(429, {'Retry-After': '120'})) == 5.0
+    assert transport.backoff_delay(0, Response(429, {'Retry-After': 'soon'})) <= 0.01
+
+
+def test_429_pauses_the_bucket(sleeps):
+    session = ScriptedSession(Response(429, {'Retry-After': '3'}), Response(200))
+    transport = Transport(lambda: session, {'matchbook': BASE}, limits={('matchbook', None): (1000.0, 10)})
+    paused = []
+    bucket = transport.bucket('matchbook', 'events')
+    bucket.pause = paused.append
+
+    transport.get(URL)
+    assert paused == [3.0]
+
+
+def test_401_reauthenticates_once_and_retries_with_the_new_token(sleeps):
+    session = ScriptedSession(Response(401), Response(200))
+    transport = make_transport(session)
+    transport.headers['matchbook'] = {'session-token': 'old'}
+    calls = []
+
+    def authenticate(force):
+        calls.append(force)
+        if force:
+            transport.headers['matchbook'] = {'session-token': 'new'}
+        return True
+
+    transport.authenticate['matchbook'] = authenticate
+
+    assert transport.get(URL).status_code == 200
+    assert calls == [False, True]
+    assert [headers['session-token'] for headers in session.requests] == ['old', 'new']
+    assert not sleeps
+
+
+def test_second_401_is_returned(sleeps):
+    session = ScriptedSession(Response(401), Response(401))
+    transport = make_transport(session)
+    transport.authenticate['matchbook'] = lambda force: True
+
+    assert transport.get(URL).status_code == 401
+    assert len(session.requests) == 2
+
+
+def test_pool_fits_workers_and_event_streams():
+    scanner = SmarketsMatchbookScanner(mappings_path=':memory:')
+    try:
+        scanner.configure_connection_pool(stream_threads=3)
+        adapter = scanner.session.get_adapter(scanner.smarkets_base_url)
+        assert adapter._pool_maxsize == scanner.max_concurrency['smarkets'] + 3
+        assert scanner.session.get_adapter(scanner.matchbook_base_url)._pool_maxsize == \
+            scanner.max_concurrency['matchbook'] + 3
+
+        # An unchanged size keeps the mounted pool and its connections
+        scanner.configure_connection_pool(stream_threads=3)
+        assert scanner.session.get_adapter(scanner.smarkets_base_url) is adapter
+    finally:
+        scanner.close()
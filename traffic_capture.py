@@ -0,0 +1,216 @@
+import gzip
+import json
+import re
+import threading
+import time
+from collections import deque
+
+from requests.structures import CaseInsensitiveDict
+
+# Values never written to a capture; replays get a placeholder instead
+SECRET_FIELDS = {'password', 'session-token'}
+REDACTED = 'redacted'
+
+# Response headers kept in a capture; the rest (cookies, tracing) are dropped
+KEPT_HEADERS = ('Content-Type', 'Retry-After', 'Date', 'ETag')
+
+# Smarkets calls taking comma-separated market IDs. The scanner batches
+# whichever markets are ready, so batches differ from run to run and are
+# replayed per market ID rather than per URL.
+BATCHED_URL = re.compile(r'^(.*/markets/)([^/]+)(/(?:contracts|quotes)/?)$')
+
+
+def _redact(value):
+    if isinstance(value, dict):
+        return {key: REDACTED if key in SECRET_FIELDS else _redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+def _request_key(method, url, params):
+    return method, url, json.dumps(params or {}, sort_keys=True)
+
+
+def _merge_bodies(bodies):
+    """One response body from several: lists are concatenated, dicts merged"""
+    merged = {}
+    for body in bodies:
+        for key, value in body.items():
+            if isinstance(value, list) and isinstance(merged.get(key), list):
+                merged[key] = merged[key] + value
+            else:
+                merged[key] = value
+    return merged
+
+
+class RecordedResponse:
+    """The parts of requests.Response the scanner uses, rebuilt from a capture"""
+
+    def __init__(self, url, status_code, headers=None, body=None, text=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self._body = body
+        self.text = text if text is not None else json.dumps(body) if body is not None else ''
+        self.content = self.text.encode()
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return self._body if self._body is not None else json.loads(self.text)
+
+
+class TrafficRecorder:
+    """Session wrapper that writes every request and response to gzipped JSONL.
+
+    Each line holds the wall-clock timestamp, the offset in seconds since
+    recording started, the request (method, url, params, JSON payload), the
+    response status, selected headers and body, and the response time.
+    Passwords and session tokens are redacted and request headers are not
+    kept. Anything else (mount, headers, close) goes to the wrapped session.
+    """
+
+    def __init__(self, session, path):
+        self.session = session
+        self.path = path
+        self.records = 0
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, params=None, **kwargs):
+        sent = time.monotonic()
+        response = getattr(self.session, method.lower())(url, params=params, **kwargs)
+        elapsed = time.monotonic() - sent
+
+        record = {
+            'ts': time.time(),
+            'offset': round(sent - self._started, 6),
+            'elapsed': round(elapsed, 6),
+            'method': method,
+            'url': url,
+            'params': params or {},
+            'payload': _redact(kwargs.get('json')),
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+        }
+        try:
+            record['body'] = _redact(response.json())
+        except ValueError:
+            record['text'] = response.text
+
+        line = json.dumps(record, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self.records += 1
+        return response
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+        self.session.close()
+
+
+class TrafficReplayer:
+    """Session stand-in that serves responses from a TrafficRecorder capture.
+
+    Requests are matched on method, URL and params; repeated requests get
+    the recorded responses in order, and the last one again once they run
+    out. A batched Smarkets request that was never recorded with the same
+    IDs is answered by merging the recorded responses covering each ID.
+    speed scales the recorded timing: 1.0 replays at recorded speed
+    (each response waits out its recorded response time and is never served
+    before its recorded offset), 10.0 ten times faster, and 0 serves
+    everything immediately. Unrecorded requests get a 404 and are counted
+    in misses.
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed
+        self.headers = {}
+        self.served = 0
+        self.misses = 0
+        self._responses = {}
+        self._batched = {}      # (method, URL template, params) -> market ID -> records
+        self._lock = threading.Lock()
+        self._started = None
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    key = _request_key(record['method'], record['url'], record['params'])
+                    self._responses.setdefault(key, deque()).append(record)
+                    match = BATCHED_URL.match(record['url'])
+                    if match and record['status'] == 200 and 'body' in record:
+                        template = _request_key(record['method'], match.group(1) + match.group(3), record['params'])
+                        by_id = self._batched.setdefault(template, {})
+                        for market_id in match.group(2).split(','):
+                            by_id.setdefault(market_id, deque()).append(record)
+
+    def __len__(self):
+        return sum(len(records) for records in self._responses.values())
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, params=None, **kwargs):
+        now = time.monotonic()
+        with self._lock:
+            if self._started is None:
+                self._started = now
+            records = self._responses.get(_request_key(method, url, params))
+            if records:
+                record = records.popleft() if len(records) > 1 else records[0]
+            else:
+                record = self._assemble_batch(method, url, params)
+            if record is None:
+                self.misses += 1
+                return RecordedResponse(url, 404, body={})
+            self.served += 1
+
+        if self.speed:
+            due = max(self._started + record['offset'] / self.speed, now) + record['elapsed'] / self.speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return RecordedResponse(url, record['status'], record['headers'], record.get('body'), record.get('text'))
+
+    def _assemble_batch(self, method, url, params):
+        """Record for a batched URL built from per-ID recordings, or None"""
+        match = BATCHED_URL.match(url)
+        if not match:
+            return None
+        by_id = self._batched.get(_request_key(method, match.group(1) + match.group(3), params), {})
+        parts = []
+        for market_id in match.group(2).split(','):
+            records = by_id.get(market_id)
+            if not records:
+                return None
+            record = records.popleft() if len(records) > 1 else records[0]
+            if all(part is not record for part in parts):
+                parts.append(record)
+        return dict(parts[0], body=_merge_bodies(part['body'] for part in parts),
+                    elapsed=max(part['elapsed'] for part in parts))
+
+    def close(self):
+        pass
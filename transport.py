@@ -0,0 +1,175 @@
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from response_cache import endpoint_class
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+# Requests per second and burst size per (exchange, endpoint class); the
+# (exchange, None) entry covers everything else on that exchange
+DEFAULT_LIMITS = {
+    ('smarkets', None): (10.0, 20),
+    ('smarkets', 'prices'): (8.0, 16),
+    ('matchbook', None): (8.0, 16),
+    ('matchbook', 'prices'): (6.0, 12),
+    ('matchbook', 'login'): (0.2, 2),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, holding at most burst"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+                self.waited += wait
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every caller back for seconds, e.g. after a 429"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class Transport:
+    """Rate-limited, retrying HTTP access to the exchanges.
+
+    Requests are routed to an exchange by base URL and classified by
+    endpoint (see response_cache.endpoint_class). Every request takes a token
+    from its (exchange, endpoint) bucket. 429s, transient 5xx and
+    connection errors are retried with jittered exponential backoff,
+    honouring Retry-After, and a 429 also pauses the bucket so concurrent
+    workers back off together. Before each request the exchange's
+    authenticate hook may refresh its session; a 401 forces one refresh and
+    a single retry.
+    """
+
+    def __init__(self, session_provider, base_urls, limits=None, max_retries=3,
+                 backoff_base=0.5, backoff_cap=30.0):
+        self.session_provider = session_provider
+        self.base_urls = base_urls
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.headers = {}           # exchange -> extra headers, e.g. session tokens
+        self.authenticate = {}      # exchange -> hook(force) returning True if authenticated
+        self.metrics = None         # ScanMetrics recording every attempt, if set
+        self.retries = 0
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+
+    def route(self, url):
+        """(exchange, endpoint class) for a URL"""
+        exchange = next((name for name, base in self.base_urls.items() if url.startswith(base)), None)
+        endpoint = 'login' if url.endswith('/security/session') else endpoint_class(url)
+        return exchange, endpoint
+
+    def bucket(self, exchange, endpoint):
+        key = (exchange, endpoint) if (exchange, endpoint) in self.limits else (exchange, None)
+        with self._buckets_lock:
+            bucket = self._buckets.get(key)
+            if bucket is None and key in self.limits:
+                bucket = self._buckets[key] = TokenBucket(*self.limits[key])
+            return bucket
+
+    def disable_rate_limits(self):
+        """Send requests without waiting for tokens, e.g. when replaying a capture"""
+        with self._buckets_lock:
+            self.limits = {}
+            self._buckets.clear()
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        exchange, endpoint = self.route(url)
+        bucket = self.bucket(exchange, endpoint)
+        authenticate = self.authenticate.get(exchange) if endpoint != 'login' else None
+        if authenticate:
+            authenticate(False)
+
+        extra_headers = kwargs.pop('headers', None) or {}
+        reauthenticated = False
+        attempt = 0
+        while True:
+            if bucket:
+                bucket.acquire()
+            headers = dict(extra_headers, **self.headers.get(exchange, {}))
+            if headers:
+                kwargs['headers'] = headers
+            sent = time.perf_counter()
+            try:
+                response = getattr(self.session_provider(), method.lower())(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if self.metrics:
+                    self.metrics.observe_request(exchange, endpoint, None, time.perf_counter() - sent)
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            else:
+                if self.metrics:
+                    self.metrics.observe_request(exchange, endpoint, response.status_code,
+                                                 time.perf_counter() - sent, len(response.content))
+
+            if response is not None:
+                if response.status_code == 401 and authenticate and not reauthenticated:
+                    reauthenticated = True
+                    logger.info("%s returned 401, re-authenticating", exchange)
+                    if authenticate(True):
+                        continue
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+
+            delay = self.backoff_delay(attempt, response)
+            if response is not None and response.status_code == 429 and bucket:
+                bucket.pause(delay)
+            attempt += 1
+            self.retries += 1
+            logger.debug("Retrying %s %s after %s in %.2fs (attempt %d)", method, url,
+                         response.status_code if response is not None else 'connection error', delay, attempt)
+            time.sleep(delay)
+
+    def backoff_delay(self, attempt, response=None):
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                wait = float(retry_after)
+            except ValueError:
+                try:
+                    wait = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    wait = 0.0
+            delay = max(delay, min(wait, self.backoff_cap))
+        return delay